@@ -4,7 +4,8 @@ from amino import List, Just
 from ribosome.components.internal.prog import (program_log, set_log_level, update_state, update_component_state,
                                                state_data, rpc_triggers, poll, append_python_path, show_python_path,
                                                enable_components, mapping, internal_init, component_state_data,
-                                               rpc_job_stderr)
+                                               rpc_job_stderr, enable_request_stats, disable_request_stats,
+                                               request_stats, enable_ui_mirror, disable_ui_mirror)
 from ribosome.config.component import Component
 from ribosome.rpc.data.prefix_style import Full
 from ribosome.rpc.api import rpc
@@ -26,6 +27,11 @@ internal: Component = Component.cons(
         rpc.write(mapping).conf(name=Just('map'), prefix=Full()),
         rpc.write(internal_init).conf(prefix=Full()),
         rpc.read(rpc_job_stderr).conf(prefix=Full()),
+        rpc.write(enable_request_stats).conf(prefix=Full()),
+        rpc.write(disable_request_stats).conf(prefix=Full()),
+        rpc.read(request_stats).conf(prefix=Full(), sync=true),
+        rpc.write(enable_ui_mirror).conf(prefix=Full()),
+        rpc.write(disable_ui_mirror).conf(prefix=Full()),
     ),
 )
 
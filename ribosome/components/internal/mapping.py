@@ -7,6 +7,7 @@ from amino.logging import module_log
 from ribosome.nvim.io.state import NS
 from ribosome.data.plugin_state import PluginState
 from ribosome.nvim.io.compute import NvimIO
+from ribosome.nvim.io.api import N
 from ribosome.compute.program import Program
 from ribosome.config.component import Components
 from ribosome.nvim.api.command import nvim_command
@@ -39,7 +40,7 @@ def activate_mapping(mapping: Mapping) -> Do:
     handler = yield NS.inspect_either(mapping_handler(mapping)).zoom(lens.components)
     yield NS.modify(__.append.active_mappings((mapping.ident, handler)))
     plugin = yield NS.inspect(_.camelcase_name)
-    yield NS.lift(mapping.modes.traverse(curried(mapping_cmd)(plugin, mapping), NvimIO))
+    yield NS.lift(N.traverse(mapping.modes, curried(mapping_cmd)(plugin, mapping)))
 
 
 __all__ = ('activate_mapping',)
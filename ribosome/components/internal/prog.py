@@ -17,7 +17,7 @@ from ribosome.nvim.io.state import NS
 from ribosome.config.component import ComponentData
 from ribosome.compute.prog import Prog
 from ribosome.config.basic_config import NoData
-from ribosome.components.internal.update import undef_triggers, def_triggers
+from ribosome.components.internal.update import undef_triggers, def_triggers, programs
 from ribosome.compute.program import Program, bind_nullary_program
 from ribosome.config.settings import run_internal_init
 from ribosome.compute.ribosome_api import Ribo
@@ -25,6 +25,8 @@ from ribosome.rpc.data.rpc_method import RpcMethod
 from ribosome.rpc.define import ActiveRpcTrigger
 from ribosome.compute.output import Echo
 from ribosome.nvim.api.rpc import plugin_name
+from ribosome.nvim.io.hooks import start_request_stats, stop_request_stats, call_stats
+from ribosome.nvim.api.ui import start_ui_mirror, stop_ui_mirror
 
 log = module_log()
 D = TypeVar('D')
@@ -34,7 +36,7 @@ CC = TypeVar('CC')
 @prog
 @do(NS[ComponentData[PluginState[D, CC], NoData], str])
 def program_log() -> Do:
-    yield NS.inspect_either(lambda s: dump_json(s.main.program_log))
+    yield NS.inspect_either(lambda s: dump_json(s.main.program_log.entries))
 
 
 @prog.unit
@@ -153,8 +155,8 @@ def enable_components(*names: str) -> Do:
     )
     yield undef_triggers()
     yield NS.modify(lens.components.all.modify(__.add(comps)))
+    yield NS.modify(lambda s: s.set_programs(programs(s)))
     yield def_triggers()
-    print
 
 
 class MapOptions(Dat['MapOptions']):
@@ -214,6 +216,32 @@ def rpc_job_stderr(id: int, data: list, event: str) -> Do:
     yield NS.pure(Echo.error(f'fatal error in plugin {name}{msg}'))
 
 
+@prog.unit
+def enable_request_stats(slow: float=0.) -> NS[D, None]:
+    return NS.simple(start_request_stats, slow / 1e3)
+
+
+@prog.unit
+def disable_request_stats() -> NS[D, None]:
+    return NS.simple(stop_request_stats)
+
+
+@prog
+def request_stats(count: int=20) -> NS[D, str]:
+    return NS.e(dump_json(call_stats.top(count)))
+
+
+@prog.unit
+def enable_ui_mirror() -> NS[D, None]:
+    return NS.lift(start_ui_mirror())
+
+
+@prog.unit
+def disable_ui_mirror() -> NS[D, None]:
+    return NS.lift(stop_ui_mirror())
+
+
 __all__ = ('internal_init', 'mapping', 'MapOptions', 'enable_components', 'show_python_path', 'append_python_path',
            'poll', 'program_log', 'set_log_level', 'state_data', 'rpc_triggers', 'update_state',
-           'update_component_state', 'component_state_data',)
+           'update_component_state', 'component_state_data', 'enable_request_stats', 'disable_request_stats',
+           'request_stats', 'enable_ui_mirror', 'disable_ui_mirror',)
@@ -11,6 +11,7 @@ from ribosome.config.resolve import ComponentResolver
 from ribosome.config.component import Components
 from ribosome.nvim.api.command import nvim_command
 from ribosome.nvim.io.compute import NvimIO
+from ribosome.nvim.io.api import N
 from ribosome.config import settings
 from ribosome.rpc.define import define_rpc, ActiveRpcTrigger, undef_command
 from ribosome.rpc.api import RpcProgram
@@ -37,7 +38,7 @@ def update_components(requested: Either[str, List[str]]) -> Do:
     components = yield EitherState.lift(resolver.run())
     yield EitherState.modify(__.copy(components=Components.cons(components)))
     progs = yield EitherState.inspect(programs)
-    yield EitherState.modify(lens.programs.set(progs))
+    yield EitherState.modify(lambda s: s.set_programs(progs))
 
 
 @do(NvimIO[None])
@@ -48,7 +49,7 @@ def undef_trigger(trigger: ActiveRpcTrigger) -> Do:
 @do(NS[PluginState[D, CC], None])
 def undef_triggers() -> Do:
     handlers = yield NS.inspect(_.rpc_triggers)
-    yield NS.lift(handlers.traverse(undef_trigger, NvimIO))
+    yield NS.lift(N.traverse(handlers, undef_trigger))
 
 
 @do(NS[PluginState[D, CC], None])
@@ -0,0 +1,189 @@
+'''programs whose body is a coroutine, created with `prog.aio`.
+The coroutine is executed on the event loop of the rpc connection if there is one, otherwise on a temporary loop in the
+current thread.
+The thunks of the programs it awaits are evaluated in a separate thread, so they may block.
+It accesses nvim and the plugin state with the awaitable methods of `AioRibo`, which are evaluated by the asyncio
+interpreter, so that concurrent requests can be issued with `asyncio.gather`.
+The state is stored in a context variable for the duration of the coroutine.
+Since the updates of concurrently running `NS` programs couldn't be merged, starting a state program while another
+one is running fails with an `AioError`.
+'''
+import asyncio
+from asyncio import AbstractEventLoop, run_coroutine_threadsafe
+from contextvars import ContextVar
+from typing import TypeVar, Callable, Awaitable, Any, Tuple, Coroutine
+
+from amino import Either, Maybe, Just, Nothing
+from amino.logging import module_log
+
+from ribosome.nvim.api.data import NvimApi
+from ribosome.nvim.io.compute import NvimIO, NvimIOSuspend, NvimIOPure, NvimIOError, flush_writes
+from ribosome.nvim.io.data import Thunk, NResult, NSuccess, NError, NFatal
+from ribosome.nvim.io.aio import interpret_nvim_io_aio
+from ribosome.nvim.io.write_buffer import write_buffer
+from ribosome.nvim.io.state import NS
+from ribosome.nvim.request import nvim_request
+from ribosome.compute.ribosome import Ribosome
+from ribosome.compute.ribosome_api import Ribo
+from ribosome.config.setting import Setting
+from ribosome.tracing import request_context
+
+log = module_log()
+A = TypeVar('A')
+D = TypeVar('D')
+CC = TypeVar('CC')
+C = TypeVar('C')
+
+
+class AioError(Exception):
+    '''raised when a program executed in a coroutine fails with an error message.
+    If it propagates out of the coroutine, the program fails with the message.
+    '''
+
+    def __init__(self, error: str) -> None:
+        super().__init__(error)
+        self.error = error
+
+
+class AioContext:
+
+    def __init__(self, ribosome: Ribosome, vim: NvimApi) -> None:
+        self.ribosome = ribosome
+        self.vim = vim
+        self.state_running = False
+
+
+aio_context: ContextVar[AioContext] = ContextVar('aio_context')
+
+
+def nresult_value(result: NResult[A]) -> A:
+    if isinstance(result, NSuccess):
+        return result.value
+    elif isinstance(result, NError):
+        raise AioError(result.error)
+    elif isinstance(result, NFatal):
+        raise result.exception
+    raise Exception(f'invalid NResult: {result}')
+
+
+class AioRibo:
+    '''awaitable versions of the `Ribo` api, as well as of arbitrary `NvimIO` and `NS` programs.
+    '''
+
+    @classmethod
+    def context(self) -> AioContext:
+        return aio_context.get()
+
+    @classmethod
+    async def nvim(self, io: NvimIO[A]) -> A:
+        context = AioRibo.context()
+        vim, result = await interpret_nvim_io_aio(io, context.vim)
+        context.vim = vim
+        return nresult_value(result)
+
+    @classmethod
+    async def ns(self, fa: NS[Ribosome[D, CC, C], A]) -> A:
+        context = AioRibo.context()
+        if context.state_running:
+            raise AioError('state programs cannot run concurrently in a coroutine')
+        context.state_running = True
+        try:
+            state, a = await AioRibo.nvim(fa.run(context.ribosome))
+        finally:
+            context.state_running = False
+        context.ribosome = state
+        return a
+
+    @classmethod
+    async def request(self, method: str, *args: Any) -> Any:
+        return await AioRibo.nvim(nvim_request(method, *args))
+
+    @classmethod
+    async def setting_e(self, setting: Setting[A]) -> Either[str, A]:
+        return await AioRibo.ns(Ribo.setting_e(setting))
+
+    @classmethod
+    async def setting(self, setting: Setting[A]) -> A:
+        return await AioRibo.ns(Ribo.setting(setting))
+
+    @classmethod
+    async def setting_raw(self, setting: Setting[A]) -> Either[str, A]:
+        return await AioRibo.ns(Ribo.setting_raw(setting))
+
+    @classmethod
+    async def comp(self) -> C:
+        return await AioRibo.ns(Ribo.comp())
+
+    @classmethod
+    async def inspect_comp(self, f: Callable[[C], A]) -> A:
+        return await AioRibo.ns(Ribo.inspect_comp(f))
+
+    @classmethod
+    async def modify_comp(self, f: Callable[[C], C]) -> None:
+        return await AioRibo.ns(Ribo.modify_comp(f))
+
+    @classmethod
+    async def main(self) -> D:
+        return await AioRibo.ns(Ribo.main())
+
+    @classmethod
+    async def inspect_main(self, f: Callable[[D], A]) -> A:
+        return await AioRibo.ns(Ribo.inspect_main(f))
+
+    @classmethod
+    async def modify_main(self, f: Callable[[D], D]) -> None:
+        return await AioRibo.ns(Ribo.modify_main(f))
+
+    @classmethod
+    async def autocmd(self, name: str, verbose: bool=False) -> None:
+        return await AioRibo.ns(Ribo.autocmd(name, verbose))
+
+
+def running_loop() -> Maybe[AbstractEventLoop]:
+    try:
+        return Just(asyncio.get_running_loop())
+    except RuntimeError:
+        return Nothing
+
+
+def run_coroutine(vim: NvimApi, coro: Coroutine[Any, Any, A]) -> A:
+    '''blocks the current thread until the coroutine is done, which is the same behaviour as for synchronous programs.
+    Since this would deadlock when called from a coroutine on the same loop, nesting is rejected.
+    '''
+    if running_loop().present:
+        coro.close()
+        raise AioError('coroutine programs cannot be run from within a coroutine')
+    return (
+        vim.loop
+        .filter(lambda a: a.is_running())
+        .map(lambda loop: run_coroutine_threadsafe(coro, loop).result())
+        .get_or(asyncio.run, coro)
+    )
+
+
+def run_aio(func: Callable[..., Awaitable[A]], args: tuple, ribosome: Ribosome[D, CC, C], vim: NvimApi
+            ) -> Tuple[NvimApi, NvimIO[Tuple[Ribosome[D, CC, C], A]]]:
+    '''buffered writes are flushed first, since the coroutine's requests are sent from another thread.
+    The coroutine runs in the loop's thread, so the id of the current request is passed along.
+    '''
+    vim1 = flush_writes(vim) if write_buffer.writes else vim
+    context = AioContext(ribosome, vim1)
+    request = request_context.id
+    async def run() -> A:
+        aio_context.set(context)
+        request_context.id = request
+        return await func(*args)
+    try:
+        result = run_coroutine(vim1, run())
+    except AioError as e:
+        return context.vim, NvimIOError(e.error)
+    return context.vim, NvimIOPure((context.ribosome, result))
+
+
+def aio_ns(func: Callable[..., Awaitable[A]], *args: Any) -> NS[Ribosome[D, CC, C], A]:
+    def run(ribosome: Ribosome[D, CC, C]) -> NvimIO[Tuple[Ribosome[D, CC, C], A]]:
+        return NvimIOSuspend(Thunk.cons(lambda vim: run_aio(func, args, ribosome, vim)))
+    return NS.apply(run)
+
+
+__all__ = ('AioError', 'AioRibo', 'aio_ns',)
@@ -1,24 +1,25 @@
-from typing import Callable, TypeVar, Tuple, Any, Type
+from typing import Callable, TypeVar, Tuple, Type, Awaitable
 
-from amino import Either, do, Do, _, IO, List
+from amino import Either, do, Do, _, IO, List, Lists
 from amino.logging import module_log
 
 from ribosome.compute.tpe import prog_type
 from ribosome.compute.wrap import prog_wrappers
 from ribosome.compute.output import (ProgOutput, ProgOutputUnit, ProgOutputResult, ProgOutputIO, ProgScalarIO,
                                      ProgGatherIOs, ProgScalarSubprocess, ProgGatherSubprocesses, Echo, ProgIOEcho,
-                                     GatherSubprocesses, GatherIOs, Gather, ProgGather)
+                                     GatherSubprocesses, GatherIOs, Gather, ProgGather, GatherIOsEach,
+                                     ProgGatherIOsEach, ProgOutputStream, Stream, ProgCpu, Cpu)
 from ribosome.nvim.io.state import NS
 from ribosome.compute.wrap_data import ProgWrappers
 from ribosome.config.basic_config import NoData
 from ribosome.compute.ribosome import Ribosome
 from ribosome.compute.tpe_data import ribo_state_prog
+from ribosome.compute.aio import aio_ns
 from ribosome.compute.prog import Prog
 from ribosome.compute.program import Program, ProgramBlock, ProgramCompose
 from ribosome.process import Subprocess
 from ribosome.rpc.args import ParamsSpec
-from ribosome.rpc.api import RpcProgram
-from ribosome.rpc.arg_parser import ArgParser, JsonArgParser, TokenArgParser
+from ribosome.compute.cache import ProgramCache, cached_program, default_cache_size, default_wait_timeout
 
 log = module_log()
 A = TypeVar('A')
@@ -30,15 +31,6 @@ CC = TypeVar('CC')
 C = TypeVar('C')
 
 
-def arg_parser(rpc_program: RpcProgram, params_spec: ParamsSpec) -> ArgParser:
-    tpe = JsonArgParser if rpc_program.options.json else TokenArgParser
-    return tpe(params_spec)
-
-
-def parse_args(rpc_program: RpcProgram, args: List[Any]) -> NS[D, List[Any]]:
-    return arg_parser(rpc_program, rpc_program.program.params_spec).parse(args)
-
-
 def prog_type_error(func: Callable[[P], NS[R, A]], error: str) -> None:
     raise Exception(f'program `{func.__name__}` has invalid type: {error}')
 
@@ -98,6 +90,10 @@ class prog_io:
     def gather(func: Callable[[P], NS[D, GatherIOs[A]]]) -> Program[List[Either[str, A]]]:
         return prog_state(func, ProgOutputIO(ProgGatherIOs()))
 
+    @staticmethod
+    def gather_each(func: Callable[[P], NS[D, GatherIOsEach[A]]]) -> Program[List[Either[str, A]]]:
+        return prog_state(func, ProgOutputIO(ProgGatherIOsEach()))
+
 
 class prog_subproc:
 
@@ -149,6 +145,36 @@ class ProgApi:
     def gather(self, func: Callable[[P], NS[D, Gather[A]]]) -> Program[List[Either[str, A]]]:
         return prog_state(func, ProgOutputIO(ProgGather()))
 
+    def stream(self, func: Callable[[P], NS[D, Stream[A]]]) -> Program[List[A]]:
+        return prog_state(func, ProgOutputStream())
+
+    def cpu(self, func: Callable[[P], NS[D, Cpu[A]]]) -> Program[A]:
+        return prog_state(func, ProgOutputIO(ProgCpu()))
+
+    def aio(self, comp: Type[C]=None) -> Callable[[Callable[..., Awaitable[A]]], Program[A]]:
+        '''creates a program from a coroutine function that uses `AioRibo` to access nvim and the state of the
+        component `comp`.
+        '''
+        def aio_wrap(func: Callable[..., Awaitable[A]]) -> Program[A]:
+            wrappers = prog_wrappers.match(ribo_state_prog(comp)).value_or(lambda err: prog_type_error(func, err))
+            def run(*p: P) -> NS[Ribosome[D, CC, C], A]:
+                return aio_ns(func, *p)
+            params_spec = ParamsSpec.from_function(func)
+            return program_from_data(run, params_spec, wrappers, ProgOutputResult(), func.__module__, func.__name__)
+        return aio_wrap
+
+    def cached(self, *components: type, size: int=default_cache_size, timeout: float=default_wait_timeout
+               ) -> Callable[[Callable[[P], NS[D, A]]], Program[A]]:
+        '''memoizes a read-only program, which may also be a `Program` created by another decorator.
+        The results are invalidated when the data of one of the components with the state types `components` changes,
+        or any data if none are given.
+        Concurrent identical calls wait for the first one's result for at most `timeout` seconds.
+        '''
+        def cached_wrap(func: Callable[[P], NS[D, A]]) -> Program[A]:
+            program = func if isinstance(func, Program) else prog_state(func, ProgOutputResult())
+            return cached_program(program, ProgramCache.cons(Lists.wrap(components), size, timeout))
+        return cached_wrap
+
 
 prog = ProgApi()
 
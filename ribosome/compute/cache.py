@@ -0,0 +1,167 @@
+'''memoization of read-only programs created with `prog.cached`.
+The results are stored in a bounded LRU cache keyed on the program's arguments. The program depends on the data of
+the components declared in the decorator, or the main and all component data if none are declared. Since the state is
+only ever updated by copying, the cache increments its version whenever these aren't the identical objects as in the
+previous call, so a component invalidates the entries depending on it by updating its data. The entries only store the
+version number, and the cache only keeps the most recent dependencies alive.
+Concurrent calls with the same arguments and version share a single execution: the first one runs the program, the
+others block until its result is available or `timeout` expires.
+The state changes of a cached program are discarded when the result is taken from the cache, so only programs that
+don't modify the state should be cached.
+'''
+from threading import Lock
+from collections import OrderedDict
+from concurrent.futures import Future, TimeoutError
+from typing import TypeVar, Any, Tuple, Optional, Hashable
+
+from amino import Dat, List, Lists
+from amino.logging import module_log
+
+from ribosome.nvim.io.state import NS
+from ribosome.nvim.io.compute import NvimIO, lift_n_result, NRParams
+from ribosome.nvim.io.api import N
+from ribosome.nvim.io.data import NResult, NSuccess
+from ribosome.data.plugin_state import PluginState
+from ribosome.compute.program import Program, ProgramBlock, program_module, program_name
+from ribosome.compute.wrap_data import ProgWrappers
+from ribosome.compute.output import ProgOutputResult
+from ribosome.compute.run import run_prog
+
+log = module_log()
+A = TypeVar('A')
+default_cache_size = 128
+default_wait_timeout = NRParams.cons().timeout
+
+
+def cache_key(args: List[Any]) -> Optional[Hashable]:
+    key = tuple(args)
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+def same_objects(a: tuple, b: tuple) -> bool:
+    return len(a) == len(b) and all(x is y for x, y in zip(a, b))
+
+
+class ProgramCache(Dat['ProgramCache']):
+    '''mutable cache shared by all copies of the plugin state.
+    '''
+
+    @staticmethod
+    def cons(
+            dependencies: List[type]=List(),
+            size: int=default_cache_size,
+            timeout: float=default_wait_timeout,
+    ) -> 'ProgramCache':
+        return ProgramCache(dependencies, size, timeout, Lock())
+
+    def __init__(self, dependencies: List[type], size: int, timeout: float, lock: Lock) -> None:
+        self.dependencies = dependencies
+        self.size = size
+        self.timeout = timeout
+        self.lock = lock
+        self.entries: OrderedDict = OrderedDict()
+        self.running: dict = dict()
+        self.current: tuple = ()
+        self.current_version = 0
+
+    def dependency_data(self, state: PluginState) -> tuple:
+        return (
+            (state.data, state.component_data)
+            if self.dependencies.empty else
+            tuple(self.dependencies.map(state.data_by_type))
+        )
+
+    def version(self, state: PluginState) -> int:
+        '''a program running on an older snapshot than the previous call also increments the version, which only causes
+        a cache miss.
+        '''
+        data = self.dependency_data(state)
+        with self.lock:
+            if not same_objects(self.current, data):
+                self.current = data
+                self.current_version += 1
+            return self.current_version
+
+    def lookup(self, key: Hashable, version: int) -> Tuple[bool, Any]:
+        '''returns a cached value or the future of the running execution, which is created if this call has to execute
+        the program, indicated by the first element of the result.
+        '''
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] == version:
+                self.entries.move_to_end(key)
+                return False, NSuccess(entry[1])
+            future = self.running.get((key, version))
+            if future is not None:
+                return False, future
+            future = self.running[(key, version)] = Future()
+            return True, future
+
+    def complete(self, key: Hashable, version: int, future: Future, result: NResult[Tuple[PluginState, A]]) -> None:
+        with self.lock:
+            self.running.pop((key, version), None)
+            if isinstance(result, NSuccess):
+                self.entries[key] = version, result.value[1]
+                self.entries.move_to_end(key)
+                while len(self.entries) > self.size:
+                    self.entries.popitem(last=False)
+        future.set_result(NSuccess(result.value[1]) if isinstance(result, NSuccess) else result)
+
+    @property
+    def keys(self) -> List[Hashable]:
+        with self.lock:
+            return Lists.wrap(list(self.entries))
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+
+
+def shared_result(vim: Any, state: PluginState, result: Any, timeout: float) -> NvimIO[Tuple[PluginState, A]]:
+    '''waits for the execution of a concurrent call if `result` is a future.
+    '''
+    if isinstance(result, Future):
+        try:
+            value = result.result(timeout)
+        except TimeoutError:
+            return N.error(f'concurrent execution of cached program timed out after {timeout}s')
+    else:
+        value = result
+    return lift_n_result.match(value).map(lambda a: (state, a))
+
+
+def run_cached(cache: ProgramCache, program: Program[A], args: List[Any]) -> NS[PluginState, A]:
+    def run(state: PluginState) -> NvimIO[Tuple[PluginState, A]]:
+        key = cache_key(args)
+        if key is None:
+            return run_prog(program, args).run(state)
+        version = cache.version(state)
+        execute, result = cache.lookup(key, version)
+        def store(r: NResult[Tuple[PluginState, A]]) -> NvimIO[None]:
+            return N.simple(cache.complete, key, version, result, r)
+        return (
+            N.ensure(run_prog(program, args).run(state), store)
+            if execute else
+            N.suspend(shared_result, state, result, cache.timeout)
+        )
+    return NS.apply(run)
+
+
+def cached_program(program: Program[A], cache: ProgramCache) -> Program[A]:
+    name = program.name
+    def cached(*args: Any) -> NS[PluginState, A]:
+        return run_cached(cache, program, Lists.wrap(args))
+    return Program.cons(
+        name,
+        ProgramBlock(name, cached, ProgWrappers.id(), ProgOutputResult()),
+        program.params_spec,
+        program_module(program),
+        program_name(program),
+    )
+
+
+__all__ = ('ProgramCache', 'cached_program', 'default_cache_size', 'default_wait_timeout',)
@@ -0,0 +1,163 @@
+'''the process pool that runs the functions of `prog.cpu` programs, so that CPU-bound work neither competes for the
+GIL with the rpc threads nor blocks them.
+The pool is created on first use, shared by all copies of the plugin state and shut down when the host terminates,
+which also terminates the functions that are still running.
+Its processes are spawned rather than forked, since the host process runs several threads.
+Arguments wrapped in `Shared` must support the buffer protocol. Their bytes are copied into a shared memory segment
+instead of being sent through the pool's pipe along with the call, and the function receives a read-only `memoryview`
+of the segment, so the worker doesn't copy them again. The view is released when the function has returned, so the
+function must copy the data it wants to keep.
+Shared memory is only available from python 3.8; on earlier versions, the bytes are sent along with the call and the
+function receives a `memoryview` of them.
+A function that exceeds the timeout of its `Cpu` is not stopped, only its result is discarded, and it occupies its
+worker until it returns.
+'''
+import sys
+import multiprocessing
+from threading import Lock
+from typing import TypeVar, Any, Optional, Callable
+from concurrent.futures import ProcessPoolExecutor
+
+from amino import Dat, Either, Maybe, Try
+from amino.logging import module_log
+
+from ribosome.compute.output import Cpu, Shared
+
+if sys.version_info >= (3, 8):
+    from multiprocessing.shared_memory import SharedMemory
+else:
+    SharedMemory = None
+
+log = module_log()
+A = TypeVar('A')
+
+
+class SharedRef(Dat['SharedRef']):
+    '''the location of a `Shared` argument in shared memory, which replaces it in the pickled call.
+    '''
+
+    def __init__(self, name: str, size: int) -> None:
+        self.name = name
+        self.size = size
+
+
+class SharedBytes(Dat['SharedBytes']):
+    '''replaces a `Shared` argument in the pickled call if shared memory isn't available.
+    '''
+
+    def __init__(self, data: bytes) -> None:
+        self.data = data
+
+
+def shared_view(value: Any) -> memoryview:
+    '''the bytes of a contiguous buffer, without copying them.
+    '''
+    try:
+        return memoryview(value).cast('B')
+    except TypeError as e:
+        raise TypeError(f'`Shared` value must be a contiguous buffer, like `bytes`: {type(value).__name__}') from e
+
+
+def share(arg: Any, segments: list) -> Any:
+    if not isinstance(arg, Shared):
+        return arg
+    view = shared_view(arg.value)
+    if SharedMemory is None:
+        return SharedBytes(view.tobytes())
+    segment = SharedMemory(create=True, size=max(view.nbytes, 1))
+    segments.append(segment)
+    segment.buf[:view.nbytes] = view
+    return SharedRef(segment.name, view.nbytes)
+
+
+def release_segments(segments: list) -> None:
+    for segment in segments:
+        Try(segment.close)
+        Try(segment.unlink)
+
+
+def attach(arg: Any, segments: list, views: list) -> Any:
+    if isinstance(arg, SharedBytes):
+        return memoryview(arg.data)
+    if not isinstance(arg, SharedRef):
+        return arg
+    segment = SharedMemory(name=arg.name)
+    segments.append(segment)
+    view = segment.buf[:arg.size]
+    readonly = view.toreadonly()
+    views.extend((readonly, view))
+    return readonly
+
+
+def run_cpu_function(function: Callable[..., A], args: tuple) -> A:
+    '''executed in the worker process.
+    The segments stay mapped if the function kept a reference to a view, since they can't be closed then.
+    '''
+    segments: list = []
+    views: list = []
+    try:
+        return function(*[attach(a, segments, views) for a in args])
+    finally:
+        for view in views:
+            Try(view.release)
+        for segment in segments:
+            Try(segment.close)
+
+
+class CpuExecutor(Dat['CpuExecutor']):
+
+    @staticmethod
+    def cons(max_workers: int=None) -> 'CpuExecutor':
+        return CpuExecutor(Maybe.optional(max_workers), Lock())
+
+    def __init__(self, max_workers: Maybe[int], lock: Lock) -> None:
+        self.max_workers = max_workers
+        self.lock = lock
+        self.pool: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        with self.lock:
+            if self.pool is None:
+                self.pool = ProcessPoolExecutor(
+                    self.max_workers.get_or_strict(None),
+                    mp_context=multiprocessing.get_context('spawn'),
+                )
+            return self.pool
+
+    def execute(self, cpu: Cpu[A], segments: list) -> Either[Exception, A]:
+        args = tuple(share(a, segments) for a in cpu.args)
+        log.debug(f'executing {cpu.function} in process pool')
+        future = self.executor.submit(run_cpu_function, cpu.function, args)
+        result = Try(future.result, cpu.timeout.get_or_strict(None))
+        if result.is_left:
+            future.cancel()
+        return result
+
+    def run(self, cpu: Cpu[A]) -> Either[Exception, A]:
+        '''the result of the function, or the exception it raised, if it returns within the timeout.
+        A function that exceeds the timeout cannot be interrupted and keeps its process until it returns.
+        '''
+        segments: list = []
+        try:
+            return Try(self.execute, cpu, segments).join
+        finally:
+            release_segments(segments)
+
+    def shutdown(self) -> None:
+        '''terminates the worker processes instead of waiting for the functions that are still running, so that a
+        function that exceeded its timeout doesn't block the termination of the host.
+        `shutdown(wait=False)` alone would leave the workers running, and on python 3.7 the pool's management thread
+        fails when its wakeup pipe is closed, so that the workers never receive the exit signal and the interpreter
+        hangs while joining them at exit.
+        Once the workers are gone, the management thread terminates immediately, so waiting for it doesn't block.
+        '''
+        with self.lock:
+            if self.pool is not None:
+                for process in list((self.pool._processes or {}).values()):
+                    Try(process.terminate)
+                self.pool.shutdown()
+                self.pool = None
+
+
+__all__ = ('CpuExecutor', 'SharedRef', 'SharedBytes',)
@@ -0,0 +1,80 @@
+'''the thread pool that runs the IOs of gathering programs.
+It is created on first use and shared by all copies of the plugin state, so that a gather only submits its items
+instead of starting and joining a new pool.
+When the timeout of a gather expires, the items that haven't started yet are cancelled. Running items cannot be
+interrupted; they keep their thread until they terminate, but the program resumes without their results.
+'''
+from threading import Lock
+from typing import TypeVar, Iterator, Optional, Iterable
+from concurrent.futures import ThreadPoolExecutor, Future, wait, as_completed, TimeoutError
+
+from amino import Dat, List, Either, Maybe, IO
+from amino.io import IOException
+from amino.logging import module_log
+
+from ribosome.tracing import carry_request
+
+log = module_log()
+A = TypeVar('A')
+
+
+def cancel_futures(futures: Iterable[Future]) -> None:
+    for future in futures:
+        future.cancel()
+
+
+class IoExecutor(Dat['IoExecutor']):
+
+    @staticmethod
+    def cons(max_workers: int=None) -> 'IoExecutor':
+        return IoExecutor(Maybe.optional(max_workers), Lock())
+
+    def __init__(self, max_workers: Maybe[int], lock: Lock) -> None:
+        self.max_workers = max_workers
+        self.lock = lock
+        self.pool: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        with self.lock:
+            if self.pool is None:
+                self.pool = ThreadPoolExecutor(self.max_workers.get_or_strict(None), thread_name_prefix='ribosome_dio')
+            return self.pool
+
+    def submit(self, ios: List[IO[A]]) -> List[Future]:
+        executor = self.executor
+        log.debug(f'executing ios {ios}')
+        return ios.map(lambda a: executor.submit(carry_request(a.attempt_run)))
+
+    def gather(self, ios: List[IO[A]], timeout: float) -> List[Either[IOException, A]]:
+        '''the results of the items that completed within `timeout`, in the order of `ios`.
+        '''
+        futures = self.submit(ios)
+        completed, timed_out = wait(futures, timeout=timeout)
+        if timed_out:
+            log.debug(f'ios timed out: {timed_out}')
+            cancel_futures(timed_out)
+        return futures.filter(lambda a: a in completed).map(lambda a: a.result())
+
+    def completed(self, ios: List[IO[A]], timeout: float) -> Iterator[Either[IOException, A]]:
+        '''the results of the items in the order of completion, until `timeout` expires.
+        The pending items are cancelled when the generator terminates, so it must be closed explicitly if the results
+        are abandoned.
+        '''
+        futures = self.submit(ios)
+        try:
+            for future in as_completed(futures, timeout=timeout):
+                yield future.result()
+        except TimeoutError:
+            log.debug(f'ios timed out: {futures.filter(lambda a: not a.done())}')
+        finally:
+            cancel_futures(futures)
+
+    def shutdown(self) -> None:
+        with self.lock:
+            if self.pool is not None:
+                self.pool.shutdown(wait=False)
+                self.pool = None
+
+
+__all__ = ('IoExecutor',)
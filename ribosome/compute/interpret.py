@@ -1,8 +1,7 @@
-from typing import TypeVar, Callable, Any
-from concurrent.futures import wait, ThreadPoolExecutor
+from typing import TypeVar, Callable, Any, Iterator
 
 from amino.case import Case
-from amino import IO, List, Either, Lists, __, Maybe, Nothing, do, Do
+from amino import IO, List, Either, Maybe, Nothing, do, Do, Nil
 from amino.io import IOException
 
 from ribosome import ribo_log
@@ -10,46 +9,83 @@ from ribosome.compute.output import (ProgOutput, ProgIO, ProgOutputIO, ProgScala
                                      ProgScalarSubprocess, ProgGatherSubprocesses, GatherIOs, GatherSubprocesses,
                                      ProgIOCustom, ProgOutputUnit, ProgOutputResult, ProgIOEcho, Echo, GatherItem,
                                      GatherIO, GatherSubprocess, GatherResult, GatherIOResult, GatherSubprocessResult,
-                                     Gather, ProgGather)
+                                     Gather, ProgGather, ProgGatherIOsEach, GatherIOsEach, ProgOutputStream, Stream,
+                                     ProgCpu, Cpu)
 from ribosome.compute.prog import Prog
 from ribosome.compute.program import Program
-from ribosome.process import Subprocess
+from ribosome.process import Subprocess, SubprocessResult
 from ribosome.nvim.io.state import NS
+from ribosome.nvim.io.api import N
+from ribosome.compute.executor import IoExecutor
+from ribosome.compute.subprocess_pool import SubprocessPool
+from ribosome.compute.cpu import CpuExecutor
+from ribosome.compute.stream import interpret_stream
 
 A = TypeVar('A')
 B = TypeVar('B')
 D = TypeVar('D')
 
 
-def gather_ios(gio: GatherIOs[A]) -> List[Either[IOException, A]]:
-    with ThreadPoolExecutor(thread_name_prefix='ribosome_dio') as executor:
-        ribo_log.debug(f'executing ios {gio.ios}')
-        futures = gio.ios.map(lambda i: executor.submit(i.attempt_run))
-        completed, timed_out = wait(futures, timeout=gio.timeout)
-        ribo_log.debug(f'completed ios {completed}')
-        if timed_out:
-            ribo_log.debug(f'ios timed out: {timed_out}')
-        return Lists.wrap(completed).map(lambda a: a.result(timeout=gio.timeout))
+def gather_ios(executor: IoExecutor, gio: GatherIOs[A]) -> List[Either[IOException, A]]:
+    return executor.gather(gio.ios, gio.timeout)
 
 
-def gather_subprocesses(gio: GatherSubprocesses[A]) -> List[Either[IOException, A]]:
+def gather_ios_each(
+        results: Iterator[Either[IOException, A]],
+        handler: Callable[[Either[IOException, A]], Prog[Any]],
+        done: List[Either[IOException, A]],
+) -> Prog[List[Either[IOException, A]]]:
+    result = next(results, None)
+    return (
+        Prog.pure(done)
+        if result is None else
+        handler(result).flat_map(lambda a: gather_ios_each(results, handler, done.cat(result)))
+    )
+
+
+def execute_subprocess(pool: SubprocessPool, subprocess: Subprocess[A]
+                       ) -> NS[D, Either[Exception, SubprocessResult[A]]]:
+    return NS.lift(N.delay(lambda v: pool.execute(v.loop, subprocess)))
+
+
+execute_subprocess_program = Program.lift(execute_subprocess)
+
+
+def gather_subprocesses(pool: SubprocessPool, gio: GatherSubprocesses[A]
+                        ) -> NS[D, List[Either[Exception, SubprocessResult[A]]]]:
     ribo_log.debug(f'gathering {gio}')
-    popens = gio.subprocs.map(__.execute())
-    return gather_ios(GatherIOs(popens, gio.timeout))
+    return NS.lift(N.delay(lambda v: pool.execute_gather(v.loop, gio.subprocs, gio.timeout)))
+
+
+gather_subprocesses_program = Program.lift(gather_subprocesses)
+
+
+def execute_cpu(executor: CpuExecutor, cpu: Cpu[A]) -> NS[D, Either[Exception, A]]:
+    return NS.lift(N.simple(executor.run, cpu))
+
+
+execute_cpu_program = Program.lift(execute_cpu)
 
 
 class gather_item(Case[GatherItem[A], IO[GatherResult[A]]], alg=GatherItem):
+    '''subprocesses are executed on a temporary loop in the executor thread, but are still subject to the limit of the
+    subprocess pool.
+    '''
+
+    def __init__(self, pool: SubprocessPool) -> None:
+        self.pool = pool
 
     def io(self, a: GatherIO[A]) -> IO[GatherResult[A]]:
         return a.io.map(GatherIOResult)
 
     def subproc(self, a: GatherSubprocess[A]) -> IO[GatherResult[A]]:
-        return a.subprocess.execute().map(GatherSubprocessResult)
+        return IO.delay(self.pool.execute, Nothing, a.subprocess).flat_map(IO.from_either).map(GatherSubprocessResult)
 
 
-def gather_mixed(gio: Gather[A]) -> List[Either[IOException, GatherSubprocessResult[A]]]:
-    ios = gio.items.map(gather_item.match)
-    return gather_ios(GatherIOs(ios, gio.timeout))
+def gather_mixed(executor: IoExecutor, pool: SubprocessPool, gio: Gather[A]
+                 ) -> List[Either[IOException, GatherSubprocessResult[A]]]:
+    ios = gio.items.map(gather_item(pool))
+    return gather_ios(executor, GatherIOs(ios, gio.timeout))
 
 
 ProgIOInterpreter = Callable[[ProgIO, Any], Prog[A]]
@@ -65,22 +101,40 @@ default_logger_program = Program.lift(default_logger)
 
 class interpret_io(Case[ProgIO, Prog[A]], alg=ProgIO):
 
-    def __init__(self, custom: Callable[[Any], Prog[A]], logger: Maybe[Program]=Nothing) -> None:
+    def __init__(
+            self,
+            custom: Callable[[Any], Prog[A]],
+            logger: Maybe[Program]=Nothing,
+            executor: IoExecutor=None,
+            subprocess_pool: SubprocessPool=None,
+            cpu_executor: CpuExecutor=None,
+    ) -> None:
         self.custom = custom
         self.logger = logger
+        self.executor = executor or IoExecutor.cons()
+        self.subprocess_pool = subprocess_pool or SubprocessPool.cons()
+        self.cpu_executor = cpu_executor or CpuExecutor.cons()
 
     def prog_scalar_io(self, po: ProgScalarIO, output: IO[A]) -> Prog[A]:
         return Prog.from_either(output.attempt)
 
     def prog_gather_ios(self, po: ProgGatherIOs, output: GatherIOs[A]) -> Prog[Prog[List[Either[IOException, A]]]]:
-        return Prog.pure(gather_ios(output))
+        return Prog.pure(gather_ios(self.executor, output))
+
+    def prog_gather_ios_each(self, po: ProgGatherIOsEach, output: GatherIOsEach[A]
+                             ) -> Prog[List[Either[IOException, A]]]:
+        results = self.executor.completed(output.ios, output.timeout)
+        return Prog.ensure(gather_ios_each(results, output.handler, Nil), results.close)
 
     def prog_scalar_subprocess(self, po: ProgScalarSubprocess, output: Subprocess[A]) -> Prog[A]:
-        return Prog.from_either(output.execute().attempt)
+        return execute_subprocess_program(self.subprocess_pool, output).flat_map(Prog.from_either)
 
     def prog_gather_subprocesses(self, po: ProgGatherSubprocesses, output: GatherSubprocesses[A]
                                  ) -> Prog[List[Either[IOException, A]]]:
-        return Prog.pure(gather_subprocesses(output))
+        return gather_subprocesses_program(self.subprocess_pool, output)
+
+    def prog_cpu(self, po: ProgCpu, output: Cpu[A]) -> Prog[A]:
+        return execute_cpu_program(self.cpu_executor, output).flat_map(Prog.from_either)
 
     @do(Prog[None])
     def prog_io_echo(self, po: ProgIOEcho, output: Echo) -> Do:
@@ -91,7 +145,7 @@ class interpret_io(Case[ProgIO, Prog[A]], alg=ProgIO):
         return self.custom(output)
 
     def prog_gather(self, po: ProgGather, output: Gather[A]) -> Prog[List[Either[IOException, A]]]:
-        return Prog.pure(gather_mixed(output))
+        return Prog.pure(gather_mixed(self.executor, self.subprocess_pool, output))
 
 
 class interpret(Case[ProgOutput, Prog[B]], alg=ProgOutput):
@@ -108,6 +162,9 @@ class interpret(Case[ProgOutput, Prog[B]], alg=ProgOutput):
     def prog_output_result(self, po: ProgOutputResult, output: B) -> Prog[B]:
         return Prog.pure(output)
 
+    def prog_output_stream(self, po: ProgOutputStream, output: Stream[A]) -> Prog[List[A]]:
+        return interpret_stream(output)
+
 
 def no_interpreter(po: ProgOutputIO, a: Any) -> Prog[A]:
     return Prog.error(f'no custom interpreter ({a})')
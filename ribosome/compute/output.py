@@ -1,7 +1,7 @@
-from typing import TypeVar, Generic, Any
+from typing import TypeVar, Generic, Any, Callable, Iterable
 import logging
 
-from amino import ADT, IO, List, Dat, Nil
+from amino import ADT, IO, List, Dat, Nil, Maybe, Lists
 from amino.dat import DatMeta
 from ribosome.process import Subprocess, SubprocessResult
 
@@ -36,6 +36,10 @@ class ProgGatherIOs(ProgIO[List[IO]]):
     pass
 
 
+class ProgGatherIOsEach(ProgIO[List[IO]]):
+    pass
+
+
 class ProgScalarSubprocess(ProgIO[Subprocess]):
     pass
 
@@ -44,6 +48,10 @@ class ProgGatherSubprocesses(ProgIO[List[Subprocess]]):
     pass
 
 
+class ProgCpu(ProgIO['Cpu']):
+    pass
+
+
 class GatherItem(Generic[A], ADT['GatherItem[A]']):
     pass
 
@@ -125,6 +133,64 @@ class ProgIOCustom(ProgIO[Any]):
     pass
 
 
+class StreamSink(ADT['StreamSink']):
+    pass
+
+
+class StreamDiscard(StreamSink):
+    pass
+
+
+class StreamCallback(StreamSink):
+    '''calls the vim function `function` with each chunk.
+    '''
+
+    def __init__(self, function: str) -> None:
+        self.function = function
+
+
+class StreamBuffer(StreamSink):
+    '''appends each chunk, which must be a string or a list of strings, to the buffer with the number `buffer`.
+    '''
+
+    def __init__(self, buffer: int) -> None:
+        self.buffer = buffer
+
+
+class StreamProgress(StreamSink):
+    '''echoes the number of chunks received so far, at most once per `interval` seconds.
+    '''
+
+    def __init__(self, message: str, interval: float) -> None:
+        self.message = message
+        self.interval = interval
+
+
+class Stream(Generic[A], Dat['Stream[A]']):
+    '''the output of `prog.stream`.
+    `chunks` is consumed lazily, each chunk being sent to `sink` as soon as it is produced and passed to `handler`,
+    which returns a `Prog` that can store it in the state.
+    The program's result is the list of all chunks.
+    '''
+
+    @staticmethod
+    def cons(
+            chunks: Iterable[A],
+            sink: StreamSink=None,
+            handler: Callable[[A], Any]=None,
+    ) -> 'Stream[A]':
+        return Stream(chunks, sink or StreamDiscard(), Maybe.optional(handler))
+
+    def __init__(self, chunks: Iterable[A], sink: StreamSink, handler: Maybe[Callable[[A], Any]]) -> None:
+        self.chunks = chunks
+        self.sink = sink
+        self.handler = handler
+
+
+class ProgOutputStream(Generic[A], ProgOutput[Stream[A], List[A]]):
+    pass
+
+
 class ProgOutputIO(Generic[PIO, A], ProgOutput[PIO, A]):
 
     def __init__(self, io: ProgIO[PIO]) -> None:
@@ -138,6 +204,17 @@ class GatherIOs(Generic[A], Dat['GatherIOs[A]']):
         self.timeout = timeout
 
 
+class GatherIOsEach(Generic[A], Dat['GatherIOsEach[A]']):
+    '''`handler` is called with the result of each item as soon as it completes and returns a `Prog` that is executed
+    before the next result is processed, allowing the results to be stored in the state incrementally.
+    '''
+
+    def __init__(self, ios: List[IO[A]], timeout: float, handler: Callable[[Any], Any]) -> None:
+        self.ios = ios
+        self.timeout = timeout
+        self.handler = handler
+
+
 class GatherSubprocesses(Generic[A], Dat['GatherSubprocess[A]']):
 
     def __init__(self, subprocs: List[Subprocess[A]], timeout: float) -> None:
@@ -152,7 +229,38 @@ class Gather(Generic[A], Dat['Gather[A]']):
         self.timeout = timeout
 
 
+class Shared(Dat['Shared']):
+    '''an argument of a `Cpu` function that is passed through shared memory.
+    `value` must be a contiguous buffer, like `bytes`, `bytearray` or a numpy array, and the function receives a
+    read-only `memoryview` of its bytes that is only valid until it returns.
+    '''
+
+    def __init__(self, value: Any) -> None:
+        self.value = value
+
+
+class Cpu(Generic[A], Dat['Cpu[A]']):
+    '''the output of `prog.cpu`.
+    `function` is called with `args` in a separate process and its return value is the program's result, so all of
+    them must be picklable, which means that the function has to be defined at module level.
+    `timeout` only limits how long the program waits for the result; the function isn't stopped and occupies its
+    worker process until it returns.
+    '''
+
+    @staticmethod
+    def cons(function: Callable[..., A], *args: Any, timeout: float=None) -> 'Cpu[A]':
+        return Cpu(function, Lists.wrap(args), Maybe.optional(timeout))
+
+    def __init__(self, function: Callable[..., A], args: List[Any], timeout: Maybe[float]) -> None:
+        self.function = function
+        self.args = args
+        self.timeout = timeout
+
+
 __all__ = ('ProgOutput', 'ProgOutputUnit', 'ProgOutputResult', 'ProgOutputIO', 'ProgResult', 'ProgReturn',
-           'ProgIO', 'ProgScalarIO', 'ProgGatherIOs', 'ProgScalarSubprocess', 'ProgGatherSubprocesses',
-           'ProgIOCustom', 'ProgOutputIO', 'GatherIOs', 'GatherSubprocesses', 'GatherItem', 'GatherIO',
-           'GatherSubprocess', 'ProgGather', 'Gather', 'GatherResult', 'GatherIOResult', 'GatherSubprocessResult',)
+           'ProgOutputStream', 'StreamSink', 'StreamDiscard', 'StreamCallback', 'StreamBuffer', 'StreamProgress',
+           'Stream',
+           'ProgIO', 'ProgScalarIO', 'ProgGatherIOs', 'ProgGatherIOsEach', 'ProgScalarSubprocess',
+           'ProgGatherSubprocesses', 'ProgIOCustom', 'ProgOutputIO', 'GatherIOs', 'GatherIOsEach', 'GatherSubprocesses',
+           'GatherItem', 'GatherIO', 'GatherSubprocess', 'ProgGather', 'Gather', 'GatherResult', 'GatherIOResult',
+           'GatherSubprocessResult', 'ProgCpu', 'Cpu', 'Shared',)
@@ -52,6 +52,12 @@ class Prog(Generic[A], ADT['Prog[A]'], Implicits, implicits=True, auto=True, met
     def error(error: CallByName) -> 'Prog[A]':
         return ProgError(call_by_name(error))
 
+    @staticmethod
+    def ensure(fa: 'Prog[A]', effect: Callable[[], None]) -> 'Prog[A]':
+        '''executes `effect` when `fa` has terminated, regardless of whether it failed.
+        '''
+        return ProgEnsure(fa, effect)
+
 
 class ProgExec(Generic[A, B, S, R], Prog[B]):
 
@@ -87,6 +93,13 @@ class ProgError(Generic[A], Prog[A]):
         self.msg = msg
 
 
+class ProgEnsure(Generic[A], Prog[A]):
+
+    def __init__(self, fa: Prog[A], effect: Callable[[], None]) -> None:
+        self.fa = fa
+        self.effect = effect
+
+
 class Monad_Prog(Monad, tpe=Prog):
 
     def pure(self, a: A) -> Prog[A]:
@@ -96,4 +109,4 @@ class Monad_Prog(Monad, tpe=Prog):
         return ProgBind(fa, f)
 
 
-__all__ = ('Prog', 'ProgBind', 'ProgPure', 'ProgPure', 'ProgError')
+__all__ = ('Prog', 'ProgBind', 'ProgPure', 'ProgPure', 'ProgError', 'ProgEnsure')
@@ -1,8 +1,7 @@
 import abc
 from typing import TypeVar, Callable, Type
 
-from amino.lenses.lens import lens
-from amino import do, Do, _, Either
+from amino import do, Do, Either
 
 from ribosome.nvim.io.state import NS
 from ribosome.compute.ribosome import Ribosome
@@ -11,8 +10,8 @@ from ribosome.nvim.io.compute import NvimIO, NRParams
 from ribosome.compute.prog import Prog, ProgExec
 from ribosome.compute.output import ProgOutputResult
 from ribosome.compute.tpe_data import StateProg, trivial_state_prog, ribo_state_prog
-from ribosome.compute.wrap import prog_wrappers
-from ribosome.data.plugin_state import PS
+from ribosome.compute.wrap import prog_wrappers, comp_get, comp_set
+from ribosome.compute.wrap_data import ProgWrappers
 from ribosome.nvim.api.command import doautocmd
 
 A = TypeVar('A')
@@ -21,7 +20,27 @@ M = TypeVar('M')
 CC = TypeVar('CC')
 C = TypeVar('C')
 R = TypeVar('R')
-main_lens = lens.state.data
+
+
+def main_get(ribo: Ribosome[D, CC, C]) -> D:
+    return ribo.state.data
+
+
+def main_set(ribo: Ribosome[D, CC, C], data: D) -> Ribosome[D, CC, C]:
+    return ribo.set.state(ribo.state.set.data(data))
+
+
+ribo_wrappers: dict = dict()
+
+
+def ribo_prog_wrappers(comp: Type[C]) -> Either[str, ProgWrappers]:
+    '''the state wrappers for ribosome programs of the component with the state type `comp`, which are identical for
+    each program and therefore only created once.
+    '''
+    wrappers = ribo_wrappers.get(comp)
+    if wrappers is None:
+        wrappers = ribo_wrappers.setdefault(comp, prog_wrappers.match(ribo_state_prog(comp)))
+    return wrappers
 
 
 class RMeta(abc.ABCMeta):
@@ -52,42 +71,39 @@ class Ribo(metaclass=RMeta):
 
     @classmethod
     def comp(self) -> NS[Ribosome[D, CC, C], C]:
-        return NS.inspect(lambda a: a.comp_lens.get()(a))
+        return NS.inspect(comp_get)
 
     @classmethod
     def inspect_comp(self, f: Callable[[C], A]) -> NS[Ribosome[D, CC, C], A]:
-        return NS.inspect(lambda a: f(a.comp_lens.get()(a)))
+        return NS.inspect(lambda a: f(comp_get(a)))
 
     @classmethod
     def inspect_comp_e(self, f: Callable[[C], A]) -> NS[Ribosome[D, CC, C], A]:
-        return NS.inspect_either(lambda a: f(a.comp_lens.get()(a)))
+        return NS.inspect_either(lambda a: f(comp_get(a)))
 
     @classmethod
     def modify_comp(self, f: Callable[[C], C]) -> NS[Ribosome[D, CC, C], None]:
-        return NS.modify(lambda a: a.comp_lens.modify(f)(a))
+        return NS.modify(lambda a: comp_set(a, f(comp_get(a))))
 
     @classmethod
     def main(self) -> NS[Ribosome[D, CC, C], C]:
-        return NS.inspect(lambda a: main_lens.get()(a))
+        return NS.inspect(main_get)
 
     @classmethod
     def inspect_main(self, f: Callable[[D], A]) -> NS[Ribosome[D, CC, C], A]:
-        return NS.inspect(lambda a: f(main_lens.get()(a)))
+        return NS.inspect(lambda a: f(main_get(a)))
 
     @classmethod
     def modify_main(self, f: Callable[[D], D]) -> NS[Ribosome[D, CC, C], None]:
-        return NS.modify(lambda a: main_lens.modify(f)(a))
+        return NS.modify(lambda a: main_set(a, f(main_get(a))))
 
     @classmethod
-    @do(NS[Ribosome[D, CC, C], A])
-    def zoom_main(self, fa: NS[D, A]) -> Do:
-        yield fa.zoom(main_lens)
+    def zoom_main(self, fa: NS[D, A]) -> NS[Ribosome[D, CC, C], A]:
+        return fa.transform_s(main_get, main_set)
 
     @classmethod
-    @do(NS[Ribosome[D, CC, C], A])
-    def zoom_comp(self, fa: NS[C, A]) -> Do:
-        lens = yield NS.inspect(_.comp_lens)
-        yield fa.zoom(lens)
+    def zoom_comp(self, fa: NS[C, A]) -> NS[Ribosome[D, CC, C], A]:
+        return fa.transform_s(comp_get, comp_set)
 
     @classmethod
     @do(Prog[A])
@@ -98,8 +114,8 @@ class Ribo(metaclass=RMeta):
     @classmethod
     @do(Prog[A])
     def lift(self, fa: NS[Ribosome[D, CC, C], A], comp: Type[C]) -> Do:
-        state_type: StateProg[PS[D, CC], C, Ribosome[D, CC, C]] = ribo_state_prog(comp)
-        yield Ribo.lift_state_prog(fa, state_type)
+        wrappers = yield Prog.from_either(ribo_prog_wrappers(comp))
+        yield ProgExec('lift', fa, wrappers, ProgOutputResult())
 
     @classmethod
     def lift_comp(self, fa: NS[C, A], comp: Type[C]) -> Prog[A]:
@@ -1,15 +1,19 @@
-from typing import TypeVar, Any, Generic
+from typing import TypeVar, Any, Generic, Callable, Tuple
 
-from amino import List, _, __
+from amino import List, _
 from amino.do import do, Do
 from amino.case import Case
 
 from ribosome.nvim.io.state import NS
-from ribosome.compute.prog import Prog, ProgBind, ProgPure, ProgError, ProgExec
+from ribosome.nvim.io.compute import NvimIO
+from ribosome.nvim.io.data import NResult
+from ribosome.nvim.io.api import N
+from ribosome.compute.prog import Prog, ProgBind, ProgPure, ProgError, ProgExec, ProgEnsure
 from ribosome.compute.wrap_data import ProgWrappers
 from ribosome.data.plugin_state import PluginState
 from ribosome.compute.program import bind_program, Program
 from ribosome.compute.interpret import interpret
+from ribosome.nvim.io.tracing import trace_ns, attach_program
 
 A = TypeVar('A')
 B = TypeVar('B')
@@ -23,23 +27,31 @@ def transform_prog_state(st: NS[R, A], wrappers: ProgWrappers[PluginState[D, CC]
     yield st.transform_s(wrappers.get, wrappers.put)
 
 
-def log_prog(prog: ProgExec) -> NS[PluginState[D, CC], None]:
-    return NS.pure(None) if prog.name in ('program_log', 'pure', 'lift') else NS.modify(__.log_prog(prog.name))
+def log_prog(name: str, st: NS[PluginState[D, CC], A]) -> NS[PluginState[D, CC], A]:
+    '''records the duration and outcome of `st` in the program log of the state it is started with.
+    The times are taken from the api's clock.
+    '''
+    def run(s: PluginState[D, CC]) -> NvimIO[Tuple[PluginState[D, CC], A]]:
+        def record(start: float, result: NResult) -> NvimIO[None]:
+            return N.now().map(lambda now: s.program_log.record(name, start, now - start, result))
+        return N.now().flat_map(lambda start: N.ensure(st.run(s), lambda r: record(start, r)))
+    return st if name in ('program_log', 'pure', 'lift') else NS.apply(run)
+
+
+@do(NS[PluginState[D, CC], A])
+def eval_prog_exec(run: Callable[[Prog[A]], NS[PluginState[D, CC], A]], prog: ProgExec[B, A, R, Any]) -> Do:
+    io_interpreter = yield NS.inspect(_.io_interpreter)
+    output = yield transform_prog_state(prog.code, prog.wrappers)
+    yield run(interpret(io_interpreter)(prog.output_type, output))
 
 
 class eval_prog(Generic[A, B, R, D, CC], Case[Prog[A], NS[PluginState[D, CC], A]], alg=Prog):
 
-    @do(NS[PluginState[D, CC], A])
-    def prog_exec(self, prog: ProgExec[B, A, R, Any]) -> Do:
-        yield log_prog(prog)
-        io_interpreter = yield NS.inspect(_.io_interpreter)
-        output = yield transform_prog_state(prog.code, prog.wrappers)
-        yield self(interpret(io_interpreter)(prog.output_type, output))
+    def prog_exec(self, prog: ProgExec[B, A, R, Any]) -> NS[PluginState[D, CC], A]:
+        return trace_ns(prog.name, 'prog', attach_program(prog.name, log_prog(prog.name, eval_prog_exec(self, prog))))
 
-    @do(NS[PluginState[D, CC], A])
-    def prog_bind(self, prog: ProgBind[Any, A]) -> Do:
-        result = yield self(prog.fa)
-        yield self(prog.f(result))
+    def prog_bind(self, prog: ProgBind[Any, A]) -> NS[PluginState[D, CC], A]:
+        return NS.unit.flat_map(lambda a: self(prog.fa)).flat_map(lambda a: self(prog.f(a)))
 
     @do(NS[PluginState[D, CC], A])
     def prog_pure(self, prog: ProgPure[A]) -> Do:
@@ -49,6 +61,10 @@ class eval_prog(Generic[A, B, R, D, CC], Case[Prog[A], NS[PluginState[D, CC], A]
     def prog_error(self, prog: ProgError[A]) -> Do:
         yield NS.error(prog.msg)
 
+    def prog_ensure(self, prog: ProgEnsure[A]) -> NS[PluginState[D, CC], A]:
+        st = self(prog.fa)
+        return NS.apply(lambda s: N.ensure(st.run(s), lambda r: N.simple(prog.effect)))
+
 
 @do(NS[PluginState[D, CC], A])
 def run_prog(program: Program[A], args: List[Any]) -> Do:
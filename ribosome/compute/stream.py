@@ -0,0 +1,127 @@
+'''the interpreter of `prog.stream` programs.
+Each chunk is sent to the sink and the write buffer is flushed right away, so that nvim displays partial results while
+the program is still producing chunks, then the handler's `Prog` is executed before the next chunk is requested.
+The chunks are pulled from the iterator without holding the state lock, so that a slow producer doesn't block other
+programs; state updates of the handlers are committed before each chunk is pulled.
+Streams without a handler are delivered by a single program that iterates over all chunks.
+'''
+import math
+from typing import TypeVar, Any, Iterator
+
+from amino import List, Lists, Try, Either, Maybe, Just, Nothing, Right, Left
+from amino.case import Case
+
+from ribosome.nvim.io.compute import NvimIO
+from ribosome.nvim.io.api import N
+from ribosome.nvim.io.state import NS
+from ribosome.nvim.api.ui import echo
+from ribosome.compute.output import Stream, StreamSink, StreamDiscard, StreamCallback, StreamBuffer, StreamProgress
+from ribosome.compute.prog import Prog
+from ribosome.compute.program import Program
+from ribosome.rpc.comm import unlocked
+
+A = TypeVar('A')
+D = TypeVar('D')
+stream_end = object()
+
+
+def chunk_lines(chunk: Any) -> List[str]:
+    return List(chunk) if isinstance(chunk, str) else Lists.wrap(chunk)
+
+
+class send_chunk(Case[StreamSink, NvimIO[None]], alg=StreamSink):
+
+    def __init__(self, chunk: Any) -> None:
+        self.chunk = chunk
+
+    def stream_discard(self, sink: StreamDiscard) -> NvimIO[None]:
+        return N.pure(None)
+
+    def stream_callback(self, sink: StreamCallback) -> NvimIO[None]:
+        return N.write('nvim_call_function', sink.function, [self.chunk])
+
+    def stream_buffer(self, sink: StreamBuffer) -> NvimIO[None]:
+        return N.write('nvim_buf_set_lines', sink.buffer, -1, -1, False, chunk_lines(self.chunk))
+
+    def stream_progress(self, sink: StreamProgress) -> NvimIO[None]:
+        return N.pure(None)
+
+
+def progress(sink: StreamSink, count: int) -> NvimIO[None]:
+    return echo(f'{sink.message}: {count}') if isinstance(sink, StreamProgress) else N.pure(None)
+
+
+class StreamCursor:
+    '''the mutable position in a stream.
+    The chunks are accumulated in `done`, which is only wrapped in a `List` when the stream is exhausted.
+    `reported` is the time of the last progress report.
+    '''
+
+    def __init__(self, chunks: Iterator[A]) -> None:
+        self.chunks = chunks
+        self.done: list = []
+        self.reported = -math.inf
+
+
+def deliver_chunk(sink: StreamSink, chunk: Any, count: int, report: bool) -> NS[D, None]:
+    io = send_chunk(chunk)(sink)
+    reported = io.flat_map(lambda a: progress(sink, count)) if report else io
+    return NS.lift(reported.flat_map(lambda a: N.flush()))
+
+
+def finish_stream(sink: StreamSink, count: int) -> NS[D, None]:
+    return NS.lift(progress(sink, count).flat_map(lambda a: N.flush()))
+
+
+def next_chunk(chunks: Iterator[A]) -> Either[Exception, Any]:
+    return Try(next, chunks, stream_end)
+
+
+def pull_chunk(cursor: StreamCursor) -> NS[D, Either[Exception, Any]]:
+    return NS.apply(lambda s: N.delay(lambda v: unlocked(s, next_chunk, cursor.chunks)))
+
+
+def stream_step(stream: Stream[A], cursor: StreamCursor) -> NS[D, Either[Exception, Maybe[Any]]]:
+    '''delivers chunks until the stream is exhausted or, if the stream has a handler, until a chunk was delivered,
+    which is returned to be handled.
+    Progress is reported when at least `interval` seconds have passed since the last report.
+    '''
+    def deliver(chunk: Any, now: float) -> NS[D, Either[Exception, Maybe[Any]]]:
+        report = isinstance(stream.sink, StreamProgress) and now - cursor.reported >= stream.sink.interval
+        if report:
+            cursor.reported = now
+        cursor.done.append(chunk)
+        return deliver_chunk(stream.sink, chunk, len(cursor.done), report).flat_map(
+            lambda a: NS.pure(Right(Just(chunk))) if stream.handler.present else stream_step(stream, cursor)
+        )
+    def step(chunk: Any) -> NS[D, Either[Exception, Maybe[Any]]]:
+        return (
+            finish_stream(stream.sink, len(cursor.done)).replace(Right(Nothing))
+            if chunk is stream_end else
+            NS.lift(N.now()).flat_map(lambda now: deliver(chunk, now))
+            if isinstance(stream.sink, StreamProgress) else
+            deliver(chunk, cursor.reported)
+        )
+    return pull_chunk(cursor).flat_map(lambda a: a.cata(lambda e: NS.pure(Left(e)), step))
+
+
+stream_step_program = Program.lift(stream_step)
+
+
+def handle_chunk(stream: Stream[A], chunk: A) -> Prog[Any]:
+    return stream.handler.map(lambda f: f(chunk)).get_or_strict(Prog.unit)
+
+
+def stream_chunks(stream: Stream[A], cursor: StreamCursor) -> Prog[List[A]]:
+    def handle(chunk: Maybe[Any]) -> Prog[List[A]]:
+        return chunk.map(
+            lambda a: handle_chunk(stream, a).flat_map(lambda b: stream_chunks(stream, cursor))
+        ).get_or(lambda: Prog.pure(Lists.wrap(cursor.done)))
+    return stream_step_program(stream, cursor).flat_map(lambda a: a.cata(lambda e: Prog.error(str(e)), handle))
+
+
+def interpret_stream(stream: Stream[A]) -> Prog[List[A]]:
+    return stream_chunks(stream, StreamCursor(iter(stream.chunks)))
+
+
+__all__ = ('interpret_stream',)
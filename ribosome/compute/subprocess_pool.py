@@ -0,0 +1,220 @@
+'''executes the subprocesses of `prog.subproc` programs with asyncio, on the event loop of the rpc connection if there
+is one, otherwise on a temporary loop in the calling thread.
+The number of concurrently running processes is limited by the pool, which is shared by all copies of the plugin
+state; waiting processes are started in round-robin order over the requests that queued them, so that a program
+gathering hundreds of processes doesn't delay a single process of another program until all of them have terminated.
+The pool's bookkeeping is thread-safe and doesn't depend on a particular loop, since programs may run on different
+loops concurrently.
+'''
+import os
+import sys
+import asyncio
+import threading
+from itertools import count
+from collections import OrderedDict, deque
+from asyncio import AbstractEventLoop, run_coroutine_threadsafe
+from typing import TypeVar, Any, Coroutine, Optional, Tuple
+
+from amino import Dat, List, Either, Maybe, Lists, Right, Left, Try
+from amino.logging import module_log
+
+from ribosome.process import Subprocess, SubprocessResult
+
+log = module_log()
+A = TypeVar('A')
+
+
+class ThreadedChildWatcher(asyncio.AbstractChildWatcher):
+    '''backport of the child watcher of python 3.8, which waits for each process in a separate thread.
+    The watcher that python 3.7 uses by default only works if it is attached to a loop in the main thread.
+    '''
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self) -> 'ThreadedChildWatcher':
+        return self
+
+    def __exit__(self, *a: Any) -> None:
+        pass
+
+    def attach_loop(self, loop: AbstractEventLoop) -> None:
+        pass
+
+    def add_child_handler(self, pid: int, callback: Any, *args: Any) -> None:
+        loop = asyncio.get_event_loop()
+        thread = threading.Thread(target=self.wait, args=(loop, pid, callback, args), daemon=True)
+        thread.start()
+
+    def remove_child_handler(self, pid: int) -> bool:
+        return True
+
+    def wait(self, loop: AbstractEventLoop, pid: int, callback: Any, args: tuple) -> None:
+        try:
+            pid, status = os.waitpid(pid, 0)
+        except ChildProcessError:
+            returncode = 255
+        else:
+            returncode = -os.WTERMSIG(status) if os.WIFSIGNALED(status) else os.WEXITSTATUS(status)
+        if loop.is_closed():
+            log.debug(f'loop closed before process {pid} terminated')
+        else:
+            loop.call_soon_threadsafe(callback, pid, returncode, *args)
+
+
+child_watcher_lock = threading.Lock()
+
+
+def ensure_child_watcher() -> None:
+    if sys.version_info < (3, 8):
+        with child_watcher_lock:
+            watcher = asyncio.get_child_watcher()
+            if not isinstance(watcher, ThreadedChildWatcher) and getattr(watcher, '_loop', None) is None:
+                asyncio.set_child_watcher(ThreadedChildWatcher())
+
+
+def run_on_loop(loop: Maybe[AbstractEventLoop], coro: Coroutine[Any, Any, A]) -> A:
+    return (
+        loop
+        .filter(lambda a: a.is_running())
+        .map(lambda a: run_coroutine_threadsafe(coro, a).result())
+        .get_or(asyncio.run, coro)
+    )
+
+
+def grant(pool: 'SubprocessPool', future: asyncio.Future) -> None:
+    if future.done():
+        pool.release()
+    else:
+        future.set_result(None)
+
+
+async def create_process(subprocess: Subprocess[A]) -> asyncio.subprocess.Process:
+    kw = dict(subprocess.kw)
+    shell = kw.pop('shell', False)
+    kw.pop('universal_newlines', None)
+    options = dict(stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+                   env=dict())
+    options.update(kw)
+    return await (
+        asyncio.create_subprocess_shell(Lists.wrap(subprocess.args_tuple).join_tokens, **options)
+        if shell else
+        asyncio.create_subprocess_exec(*subprocess.args_tuple, **options)
+    )
+
+
+async def communicate(subprocess: Subprocess[A]) -> SubprocessResult[A]:
+    '''kills the process if it doesn't terminate within the subprocess's timeout or the coroutine is cancelled.
+    '''
+    log.debug(f'executing subprocess `{subprocess.args_tuple}`')
+    proc = await create_process(subprocess)
+    try:
+        out, err = await asyncio.wait_for(proc.communicate(), subprocess.timeout)
+    except BaseException:
+        if proc.returncode is None:
+            proc.kill()
+            await proc.wait()
+        raise
+    return SubprocessResult(
+        -1 if proc.returncode is None else proc.returncode,
+        Lists.lines(out.decode(errors='replace')),
+        Lists.lines(err.decode(errors='replace')),
+        subprocess.data,
+    )
+
+
+def task_result(task: asyncio.Task) -> Either[Exception, A]:
+    error = task.exception()
+    return Right(task.result()) if error is None else Left(error)
+
+
+class SubprocessPool(Dat['SubprocessPool']):
+
+    @staticmethod
+    def cons(limit: int=None) -> 'SubprocessPool':
+        return SubprocessPool(limit or os.cpu_count() or 1, threading.Lock())
+
+    def __init__(self, limit: int, lock: threading.Lock) -> None:
+        self.limit = limit
+        self.lock = lock
+        self.running = 0
+        self.queues: OrderedDict = OrderedDict()
+        self.owners = count()
+
+    def owner(self) -> int:
+        return next(self.owners)
+
+    def next_waiter(self) -> Optional[Tuple[AbstractEventLoop, asyncio.Future]]:
+        if not self.queues:
+            return None
+        owner, queue = self.queues.popitem(last=False)
+        waiter = queue.popleft()
+        if queue:
+            self.queues[owner] = queue
+        return waiter
+
+    async def acquire(self, owner: int) -> None:
+        loop = asyncio.get_running_loop()
+        with self.lock:
+            if self.running < self.limit and not self.queues:
+                self.running += 1
+                return
+            future = loop.create_future()
+            self.queues.setdefault(owner, deque()).append((loop, future))
+        try:
+            await future
+        except BaseException:
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+
+    def release(self) -> None:
+        '''passes the slot on to the next waiter, which is notified on its own loop.
+        '''
+        with self.lock:
+            waiter = self.next_waiter()
+            if waiter is None:
+                self.running -= 1
+                return
+        loop, future = waiter
+        if loop.is_closed():
+            self.release()
+        else:
+            loop.call_soon_threadsafe(grant, self, future)
+
+    async def run(self, subprocess: Subprocess[A], owner: int=None) -> SubprocessResult[A]:
+        await self.acquire(self.owner() if owner is None else owner)
+        try:
+            return await communicate(subprocess)
+        finally:
+            self.release()
+
+    async def gather(self, subprocs: List[Subprocess[A]], timeout: float
+                     ) -> List[Either[Exception, SubprocessResult[A]]]:
+        '''the results of the processes that terminated within `timeout`, in the order of `subprocs`.
+        Processes that are still queued or running when the timeout expires are cancelled and killed.
+        '''
+        owner = self.owner()
+        tasks = subprocs.map(lambda a: asyncio.ensure_future(self.run(a, owner)))
+        if tasks.empty:
+            return List()
+        done, pending = await asyncio.wait(tasks, timeout=timeout)
+        for task in pending:
+            task.cancel()
+        if pending:
+            log.debug(f'subprocesses timed out: {len(pending)}')
+            await asyncio.wait(pending)
+        return tasks.filter(lambda a: a in done).map(task_result)
+
+    def execute(self, loop: Maybe[AbstractEventLoop], subprocess: Subprocess[A]
+                ) -> Either[Exception, SubprocessResult[A]]:
+        ensure_child_watcher()
+        return Try(run_on_loop, loop, self.run(subprocess))
+
+    def execute_gather(self, loop: Maybe[AbstractEventLoop], subprocs: List[Subprocess[A]], timeout: float
+                       ) -> List[Either[Exception, SubprocessResult[A]]]:
+        ensure_child_watcher()
+        return run_on_loop(loop, self.gather(subprocs, timeout))
+
+
+__all__ = ('SubprocessPool', 'ThreadedChildWatcher',)
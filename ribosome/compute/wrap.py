@@ -51,7 +51,6 @@ class pick_main_data(
         return lambda ps, data: data
 
 
-# TODO optimize
 def data_for_type(ps: PluginState[D, CC], tpe: Type[C]) -> C:
     return ps.data_by_type(tpe)
 
@@ -2,6 +2,8 @@ from typing import Callable, TypeVar, Generic
 
 from amino import Dat, List, Nil, Maybe
 
+from ribosome.data.program_log import default_program_log_size
+
 D = TypeVar('D')
 
 
@@ -20,6 +22,10 @@ class BasicConfig(Generic[D], Dat['BasicConfig[D]']):
             default_components: List[str]=Nil,
             internal_component: bool=True,
             settings_module: str=None,
+            program_log_size: int=default_program_log_size,
+            io_workers: int=None,
+            subprocess_limit: int=None,
+            cpu_workers: int=None,
     ) -> 'BasicConfig':
         return BasicConfig(
             name,
@@ -28,6 +34,10 @@ class BasicConfig(Generic[D], Dat['BasicConfig[D]']):
             core_components.cons('internal') if internal_component else core_components,
             default_components,
             Maybe.optional(settings_module),
+            program_log_size,
+            Maybe.optional(io_workers),
+            Maybe.optional(subprocess_limit),
+            Maybe.optional(cpu_workers),
         )
 
     def __init__(
@@ -38,6 +48,10 @@ class BasicConfig(Generic[D], Dat['BasicConfig[D]']):
             core_components: List[str],
             default_components: List[str],
             settings_module: Maybe[str],
+            program_log_size: int,
+            io_workers: Maybe[int],
+            subprocess_limit: Maybe[int],
+            cpu_workers: Maybe[int],
     ) -> None:
         self.name = name
         self.prefix = prefix
@@ -45,6 +59,10 @@ class BasicConfig(Generic[D], Dat['BasicConfig[D]']):
         self.core_components = core_components
         self.default_components = default_components
         self.settings_module = settings_module
+        self.program_log_size = program_log_size
+        self.io_workers = io_workers
+        self.subprocess_limit = subprocess_limit
+        self.cpu_workers = cpu_workers
 
 
 __all__ = ('NoData', 'BasicConfig')
@@ -46,6 +46,7 @@ class Component(Generic[CD, CC], Dat['Component[CD, CC]']):
             config: CC=None,
             mappings: Mappings=None,
             help: DocBlock=None,
+            worker: bool=False,
     ) -> 'Component[CD, CC]':
         return Component(
             name,
@@ -55,6 +56,7 @@ class Component(Generic[CD, CC], Dat['Component[CD, CC]']):
             Maybe.optional(config),
             mappings or Mappings.cons(),
             Maybe.optional(help),
+            worker,
         )
 
     def __init__(
@@ -66,6 +68,7 @@ class Component(Generic[CD, CC], Dat['Component[CD, CC]']):
             config: Maybe[CC],
             mappings: Mappings,
             help: Maybe[DocBlock],
+            worker: bool,
     ) -> None:
         self.name = name
         self.rpc = rpc
@@ -74,12 +77,13 @@ class Component(Generic[CD, CC], Dat['Component[CD, CC]']):
         self.config = config
         self.mappings = mappings
         self.help = help
+        self.worker = worker
 
     def handler_by_name(self, name: str) -> Either[str, Program]:
         return self.handlers.find(_.name == name).to_either(f'component `{self.name}` has no program `{name}`')
 
     def contains(self, prog: Program) -> Boolean:
-        return self.rpc.contains(lambda a: a.program == prog)
+        return self.rpc.exists(lambda a: a.program == prog)
 
 
 class Components(Generic[CC], Dat['Components']):
@@ -92,12 +96,25 @@ class Components(Generic[CC], Dat['Components']):
 
     def __init__(self, all: List[Component[Any, CC]]) -> None:
         self.all = all
+        self.types = {comp.state_type: comp for comp in reversed(all)}
+        self.defaults: dict = dict()
 
     def by_name(self, name: str) -> Either[str, Component[CD, CC]]:
         return self.all.find(_.name == name).to_either(f'no component named {name}')
 
     def by_type(self, tpe: type) -> Either[str, Component[CD, CC]]:
-        return self.all.find(_.state_type == tpe).to_either(f'no component with state type {tpe}')
+        return Maybe.optional(self.types.get(tpe)).to_either(f'no component with state type {tpe}')
+
+    def default_data(self, tpe: Type[CD]) -> CD:
+        '''the initial data of the component with the state type `tpe`, which is created only once and therefore must
+        not be mutated.
+        '''
+        data = self.defaults.get(tpe)
+        if data is None:
+            comp = self.types.get(tpe)
+            ctor = NoComponentData if comp is None else comp.state_ctor.get_or_strict(NoComponentData)
+            data = self.defaults.setdefault(tpe, ctor())
+        return data
 
     @property
     def config(self) -> List[CC]:
@@ -8,6 +8,8 @@ from ribosome.compute.program import Program
 from ribosome.config.basic_config import NoData, BasicConfig
 from ribosome.components.internal.config import internal
 from ribosome.rpc.api import RpcProgram
+from ribosome.data.program_log import default_program_log_size
+from ribosome.data.scheduler import Periodic
 
 A = TypeVar('A')
 D = TypeVar('D')
@@ -32,6 +34,11 @@ class Config(Generic[D, CC], Dat['Config[D, CC]']):
             default_components: List[str]=Nil,
             init: Program=None,
             internal_component: bool=True,
+            program_log_size: int=default_program_log_size,
+            io_workers: int=None,
+            subprocess_limit: int=None,
+            cpu_workers: int=None,
+            schedule: List[Periodic]=Nil,
     ) -> 'Config[D, CC]':
         basic = BasicConfig.cons(
             name,
@@ -40,12 +47,17 @@ class Config(Generic[D, CC], Dat['Config[D, CC]']):
             core_components,
             default_components,
             internal_component,
+            program_log_size=program_log_size,
+            io_workers=io_workers,
+            subprocess_limit=subprocess_limit,
+            cpu_workers=cpu_workers,
         )
         return Config(
             basic,
             components + ('internal', internal) if internal_component else components,
             rpc,
             Maybe.optional(init),
+            schedule,
         )
 
     def __init__(
@@ -54,11 +66,13 @@ class Config(Generic[D, CC], Dat['Config[D, CC]']):
             components: Map[str, Component[Any, CC]],
             rpc: List[RpcProgram],
             init: Maybe[Program],
+            schedule: List[Periodic],
     ) -> None:
         self.basic = basic
         self.components = components
         self.rpc = rpc
         self.init = init
+        self.schedule = schedule
 
 
 __all__ = ('Config', 'NoData')
@@ -17,13 +17,19 @@ from ribosome.compute.prog import Prog
 from ribosome.compute.interpret import interpret_io, no_interpreter
 from ribosome.rpc.define import ActiveRpcTrigger
 from ribosome.rpc.api import RpcProgram
+from ribosome.worker.data import Workers
+from ribosome.rpc.dispatch import DispatchIndex
+from ribosome.data.program_log import ProgramLog
+from ribosome.compute.executor import IoExecutor
+from ribosome.compute.subprocess_pool import SubprocessPool
+from ribosome.compute.cpu import CpuExecutor
+from ribosome.data.scheduler import Scheduler
 
 A = TypeVar('A')
 C = TypeVar('C')
 CC = TypeVar('CC')
 CD = TypeVar('CD')
 D = TypeVar('D')
-DIO = TypeVar('DIO')
 log = module_log()
 
 
@@ -47,17 +53,24 @@ class PluginState(Generic[D, CC], Dat['PluginState[D, CC]']):
             data: D,
             components: List[Component],
             init: Program,
-            program_log: List[str]=Nil,
+            program_log: ProgramLog=None,
             logger: Program[None]=None,
             log_handler: logging.Handler=None,
             component_data: Map[type, Any]=Map(),
             active_mappings: Map[str, Program]=Map(),
-            io_executor: Callable[[DIO], NS['PluginState[D, CC]', Any]]=None,
+            io_executor: IoExecutor=None,
             rpc_triggers: List[ActiveRpcTrigger]=Nil,
             programs: List[Program]=Nil,
             io_interpreter: Callable[[ProgIO], Prog]=None,
             custom_io: Callable[[Any], Prog[A]]=None,
+            workers: Workers=None,
+            subprocess_pool: SubprocessPool=None,
+            cpu_executor: CpuExecutor=None,
+            scheduler: Scheduler=None,
     ) -> 'PluginState':
+        executor = io_executor or IoExecutor.cons()
+        pool = subprocess_pool or SubprocessPool.cons()
+        cpu = cpu_executor or CpuExecutor.cons()
         return PluginState(
             basic,
             comp,
@@ -65,14 +78,19 @@ class PluginState(Generic[D, CC], Dat['PluginState[D, CC]']):
             data,
             Components.cons(components),
             init,
-            program_log,
+            program_log or ProgramLog.cons(),
             Maybe.optional(log_handler),
             component_data,
             active_mappings,
+            executor,
             rpc_triggers,
-            Maybe.optional(io_executor),
             programs,
-            io_interpreter or interpret_io(custom_io or no_interpreter, Maybe.optional(logger)),
+            DispatchIndex.cons(programs),
+            io_interpreter or interpret_io(custom_io or no_interpreter, Maybe.optional(logger), executor, pool, cpu),
+            workers or Workers.cons(),
+            pool,
+            cpu,
+            scheduler or Scheduler.cons(),
         )
 
     def __init__(
@@ -83,14 +101,19 @@ class PluginState(Generic[D, CC], Dat['PluginState[D, CC]']):
             data: D,
             components: Components,
             init: Program,
-            program_log: List[str],
+            program_log: ProgramLog,
             log_handler: Maybe[logging.Handler],
             component_data: Map[type, Any],
             active_mappings: Map[str, Program],
-            io_executor: Maybe[Callable[[DIO], NS['PluginState[D, CC]', Any]]],
+            io_executor: IoExecutor,
             rpc_triggers: List[ActiveRpcTrigger],
-            programs: List[Program],
+            programs: List[RpcProgram],
+            dispatch: DispatchIndex,
             io_interpreter: Callable[[ProgIO], Prog],
+            workers: Workers,
+            subprocess_pool: SubprocessPool,
+            cpu_executor: CpuExecutor,
+            scheduler: Scheduler,
     ) -> None:
         self.basic = basic
         self.comp = comp
@@ -104,15 +127,17 @@ class PluginState(Generic[D, CC], Dat['PluginState[D, CC]']):
         self.io_executor = io_executor
         self.rpc_triggers = rpc_triggers
         self.programs = programs
+        self.dispatch = dispatch
         self.rpc = rpc
         self.io_interpreter = io_interpreter
+        self.workers = workers
+        self.subprocess_pool = subprocess_pool
+        self.cpu_executor = cpu_executor
+        self.scheduler = scheduler
 
     def update(self, data: D) -> 'PluginState[D, CC]':
         return self.copy(data=data)
 
-    def log_prog(self, prog: str) -> 'PluginState[D, CC]':
-        return self.append1.program_log(prog)
-
     def component(self, name: str) -> Either[str, Component]:
         return self.components.by_name(name)
 
@@ -120,10 +145,11 @@ class PluginState(Generic[D, CC], Dat['PluginState[D, CC]']):
         return component_ctor_m(self.components.by_type(tpe))
 
     def data_by_type(self, tpe: Type[C]) -> C:
-        return self.component_data.lift(tpe) | (lambda: self.ctor_by_type(tpe)())
+        data = self.component_data.get(tpe)
+        return self.components.default_data(tpe) if data is None else data
 
     def data_for(self, component: Component) -> Any:
-        return self.component_data.lift(component.state_type).get_or(component_ctor(component))
+        return self.data_by_type(component.state_type)
 
     def data_by_name(self, name: str) -> Either[str, Any]:
         return self.component(name) / self.data_for
@@ -146,12 +172,18 @@ class PluginState(Generic[D, CC], Dat['PluginState[D, CC]']):
     def camelcase_name(self) -> str:
         return camelcase(self.basic.name)
 
+    def set_programs(self, programs: List[RpcProgram]) -> 'PluginState[D, CC]':
+        return self.copy(programs=programs, dispatch=DispatchIndex.cons(programs))
+
     def programs_by_name(self, name: str) -> List[RpcProgram]:
-        return self.programs.filter(_.rpc_name == name)
+        return self.dispatch.programs(name)
 
     def program_by_name(self, name: str) -> Either[str, RpcProgram]:
         return self.programs_by_name(name).head.to_either(f'no program named `{name}`')
 
+    def worker_component(self, program: RpcProgram) -> Maybe[Component]:
+        return self.components.for_program(program.program).filter(_.worker)
+
 
 PS = PluginState[D, CC]
 
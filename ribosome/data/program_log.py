@@ -0,0 +1,62 @@
+'''a record of the most recently executed programs, used for introspection and by tests.
+The entries are stored in a ring buffer of fixed capacity as plain tuples that are only converted to
+`ProgramLogEntry` when the log is read, so that recording a program costs a single append.
+'''
+from collections import deque
+
+from amino import Dat, List, Lists, Maybe
+
+from ribosome.nvim.io.data import NResult, NSuccess, NError
+from ribosome.tracing import request_context
+
+default_program_log_size = 1000
+
+
+class ProgramLogEntry(Dat['ProgramLogEntry']):
+
+    def __init__(self, name: str, start: float, duration: float, outcome: str, request: Maybe[int]) -> None:
+        self.name = name
+        self.start = start
+        self.duration = duration
+        self.outcome = outcome
+        self.request = request
+
+
+def result_outcome(result: NResult) -> str:
+    return 'success' if isinstance(result, NSuccess) else 'error' if isinstance(result, NError) else 'fatal'
+
+
+class ProgramLog(Dat['ProgramLog']):
+    '''mutable log shared by all copies of the plugin state.
+    Entries are added when a program terminates, so nested programs precede their caller.
+    '''
+
+    @staticmethod
+    def cons(size: int=default_program_log_size) -> 'ProgramLog':
+        return ProgramLog(deque(maxlen=size))
+
+    def __init__(self, records: deque) -> None:
+        self.records = records
+
+    @property
+    def size(self) -> int:
+        return self.records.maxlen
+
+    def record(self, name: str, start: float, duration: float, result: NResult) -> None:
+        self.records.append((name, start, duration, result_outcome(result), request_context.id))
+
+    @property
+    def entries(self) -> List[ProgramLogEntry]:
+        return Lists.wrap(list(self.records)).map(
+            lambda a: ProgramLogEntry(a[0], a[1], a[2], a[3], Maybe.optional(a[4]))
+        )
+
+    @property
+    def names(self) -> List[str]:
+        return Lists.wrap([a[0] for a in list(self.records)])
+
+    def clear(self) -> None:
+        self.records.clear()
+
+
+__all__ = ('ProgramLogEntry', 'ProgramLog', 'default_program_log_size',)
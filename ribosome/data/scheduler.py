@@ -0,0 +1,80 @@
+'''the registry of the host's scheduler, which runs programs periodically and when the plugin is idle, without nvim
+timers that send requests to the host.
+'''
+from collections import deque
+from threading import Condition, Thread
+from typing import Any, Optional, Tuple
+
+from amino import Dat, List, Nil
+
+from ribosome.compute.program import Program
+
+
+class Periodic(Dat['Periodic']):
+    '''a program that is run with `args` every `interval` seconds, delayed by a random amount of up to `jitter` seconds
+    on each tick.
+    If the scheduler falls behind, e.g. because a program took longer than its interval, the missed ticks are run only
+    once if `coalesce` is set, otherwise one after another.
+    '''
+
+    @staticmethod
+    def cons(
+            program: Program,
+            interval: float,
+            args: List[Any]=Nil,
+            jitter: float=0.,
+            coalesce: bool=True,
+    ) -> 'Periodic':
+        return Periodic(program, interval, args, jitter, coalesce)
+
+    def __init__(self, program: Program, interval: float, args: List[Any], jitter: float, coalesce: bool) -> None:
+        self.program = program
+        self.interval = interval
+        self.args = args
+        self.jitter = jitter
+        self.coalesce = coalesce
+
+
+class Scheduler(Dat['Scheduler']):
+    '''mutable scheduler state shared by all copies of the plugin state.
+    `idle` contains the deferred programs with their args, which are only run when no request from nvim is being
+    processed.
+    '''
+
+    @staticmethod
+    def cons(periodic: List[Periodic]=Nil) -> 'Scheduler':
+        return Scheduler(periodic, Condition())
+
+    def __init__(self, periodic: List[Periodic], condition: Condition) -> None:
+        self.periodic = periodic
+        self.condition = condition
+        self.idle: deque = deque()
+        self.requests = 0
+        self.thread: Optional[Thread] = None
+        self.running = False
+
+    @property
+    def busy(self) -> bool:
+        return self.requests > 0
+
+    def enter_request(self) -> None:
+        with self.condition:
+            self.requests += 1
+
+    def leave_request(self) -> None:
+        with self.condition:
+            self.requests -= 1
+            self.condition.notify_all()
+
+    def defer(self, program: Program, args: List[Any]) -> None:
+        with self.condition:
+            self.idle.append((program, args))
+            self.condition.notify_all()
+
+    def next_idle(self) -> Optional[Tuple[Program, List[Any]]]:
+        '''must be called while holding the condition's lock.
+        '''
+        return None if self.busy or not self.idle else self.idle.popleft()
+
+
+__all__ = ('Periodic', 'Scheduler',)
@@ -0,0 +1,63 @@
+'''the slots of the plugin state that are versioned separately by the `StateGuard`, so that optimistic programs of
+different components can commit concurrently.
+The main data and each component's data are separate slots, the remaining fields of the plugin state are combined in
+the slot `plugin`.
+A program has written a slot if the value in its result is not the identical object as in its snapshot, since the
+state is only ever updated by copying.
+'''
+from typing import Any, Hashable, FrozenSet
+
+from amino import Map
+
+from ribosome.rpc.comm import StateSlots
+from ribosome.data.plugin_state import PS
+
+data_slot = 'data'
+plugin_slot = 'plugin'
+merged_fields = frozenset(['data', 'component_data'])
+
+
+def component_slot(tpe: type) -> Hashable:
+    return 'component', tpe
+
+
+def changed(a: Any, b: Any) -> bool:
+    return a is not b
+
+
+class PluginStateSlots(StateSlots[PS]):
+
+    def written(self, snapshot: PS, result: PS) -> FrozenSet[Hashable]:
+        if result is snapshot:
+            return frozenset()
+        data = [data_slot] if changed(snapshot.data, result.data) else []
+        old, new = snapshot.component_data, result.component_data
+        components = [
+            component_slot(tpe)
+            for tpe in set(old) | set(new)
+            if changed(old.get(tpe), new.get(tpe))
+        ]
+        plugin = [
+            plugin_slot
+            for name in result._dat__names
+            if name not in merged_fields and changed(getattr(snapshot, name), getattr(result, name))
+        ][:1]
+        return frozenset(data + components + plugin)
+
+    def merge(self, current: PS, result: PS, slots: FrozenSet[Hashable]) -> PS:
+        plugin = (
+            dict((name, getattr(result, name)) for name in result._dat__names if name not in merged_fields)
+            if plugin_slot in slots else
+            dict()
+        )
+        data = result.data if data_slot in slots else current.data
+        component_data = dict(current.component_data)
+        for tpe in set(current.component_data) | set(result.component_data):
+            if component_slot(tpe) in slots:
+                component_data.pop(tpe, None)
+                if tpe in result.component_data:
+                    component_data[tpe] = result.component_data[tpe]
+        return current.copy(data=data, component_data=Map(component_data), **plugin)
+
+
+__all__ = ('PluginStateSlots',)
@@ -0,0 +1,115 @@
+'''batches of arbitrary api calls that are sent to nvim in a single `nvim_call_atomic`.
+Every call has its own decoder; the batch produces a tuple of the decoded results in the order of the calls.
+nvim aborts a batch at the first failing call, which is reported with the description of the offending call.
+'''
+from typing import Any, TypeVar, Callable, Generic, Type
+
+from amino import List, do, Do, Either, Lists, Right, Left, Dat
+
+from ribosome.nvim.io.compute import NvimIO
+from ribosome.nvim.io.api import N
+from ribosome.nvim.api.util import cons_checked_e
+
+A = TypeVar('A')
+
+
+class AtomicCall(Generic[A], Dat['AtomicCall[A]']):
+
+    @staticmethod
+    def cons(method: str, *args: Any, decode: Callable[[Any], Either[str, A]]=Right) -> 'AtomicCall[A]':
+        return AtomicCall(method, Lists.wrap(args), decode)
+
+    def __init__(self, method: str, args: List[Any], decode: Callable[[Any], Either[str, A]]) -> None:
+        self.method = method
+        self.args = args
+        self.decode = decode
+
+    @property
+    def desc(self) -> str:
+        args = ', '.join(map(str, self.args))
+        return f'{self.method}({args})'
+
+    @property
+    def request(self) -> list:
+        return [self.method, list(self.args)]
+
+
+class AtomicBatch(Dat['AtomicBatch']):
+    '''immutable builder; every method returns a new batch with the call appended.
+    '''
+
+    @staticmethod
+    def cons(*calls: AtomicCall) -> 'AtomicBatch':
+        return AtomicBatch(Lists.wrap(calls))
+
+    def __init__(self, calls: List[AtomicCall]) -> None:
+        self.calls = calls
+
+    def add(self, call: AtomicCall) -> 'AtomicBatch':
+        return self.append1.calls(call)
+
+    def call(self, method: str, *args: Any) -> 'AtomicBatch':
+        return self.add(AtomicCall.cons(method, *args))
+
+    def read_cons(self, method: str, cons: Callable[[Any], Either[str, A]], *args: Any) -> 'AtomicBatch':
+        return self.add(AtomicCall.cons(method, *args, decode=cons))
+
+    def read_tpe(self, method: str, tpe: Type[A], *args: Any) -> 'AtomicBatch':
+        return self.read_cons(method, cons_checked_e(tpe, Right), *args)
+
+    def write(self, method: str, *args: Any) -> 'AtomicBatch':
+        return self.read_cons(method, lambda a: Right(None), *args)
+
+    @property
+    def io(self) -> NvimIO[tuple]:
+        return nvim_atomic(self)
+
+
+@do(Either[str, None])
+def atomic_error(calls: List[AtomicCall], error_raw: Any) -> Do:
+    error = yield (
+        Right(error_raw)
+        if isinstance(error_raw, list) else
+        Left(f'invalid error structure for atomic call: {error_raw}')
+    )
+    index, tpe, message = yield (
+        Lists.wrap(error)
+        .lift_all(0, 1, 2)
+        .to_either(f'too few elements in error structure for atomic call: {error}')
+    )
+    offender = yield calls.lift(index).to_either(f'invalid index in atomic call error: {error}')
+    yield Left(f'error of type `{tpe}` in atomic call `{offender.desc}`: {message}')
+
+
+def decode_atomic_result(call: AtomicCall[A], raw: Any) -> Either[str, A]:
+    return call.decode(raw).lmap(lambda err: f'invalid result of atomic call `{call.desc}`: {err}')
+
+
+def cons_atomic_result(calls: List[AtomicCall]) -> Callable[[list], Either[str, tuple]]:
+    @do(Either[str, tuple])
+    def cons(raw: list) -> Do:
+        result = Lists.wrap(raw)
+        results, error = yield result.lift_all(0, 1).to_either_f(lambda: f'too few elements in atomic result: {result}')
+        yield atomic_error(calls, error) if error is not None else Right(None)
+        decoded = yield (
+            calls.zip(Lists.wrap(results)).traverse(lambda a: decode_atomic_result(*a), Either)
+            if isinstance(results, list) and len(results) == calls.length else
+            Left(f'invalid results for atomic call of {calls.length} requests: {results}')
+        )
+        return tuple(decoded)
+    return cons
+
+
+def nvim_atomic(batch: AtomicBatch) -> NvimIO[tuple]:
+    '''executes the calls of `batch` in one round trip and decodes their results.
+    '''
+    calls = batch.calls
+    requests = calls.map(lambda a: a.request)
+    return (
+        N.pure(())
+        if calls.empty else
+        N.read_cons_strict('nvim_call_atomic', cons_checked_e(list, cons_atomic_result(calls)), requests)
+    )
+
+
+__all__ = ('AtomicCall', 'AtomicBatch', 'nvim_atomic',)
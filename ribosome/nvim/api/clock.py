@@ -0,0 +1,88 @@
+'''the source of time for `N.sleep` and the timeouts of the waiting helpers.
+Apis use the `RealClock` unless a different one is configured, like the `VirtualClock` that unit tests can pass to
+`TestConfig` so that timeouts expire without waiting.
+'''
+import abc
+import time
+from threading import Condition
+from typing import Callable
+
+
+class Clock(abc.ABC):
+
+    @abc.abstractmethod
+    def now(self) -> float:
+        ...
+
+    @abc.abstractmethod
+    def sleep(self, duration: float) -> None:
+        ...
+
+    def wait(self, block: Callable[[float], bool], timeout: float) -> bool:
+        '''waits with `block`, which blocks on some event for at most the given number of seconds and returns whether
+        it has occurred.
+        '''
+        return block(timeout)
+
+
+class RealClock(Clock):
+
+    def now(self) -> float:
+        return time.time()
+
+    def sleep(self, duration: float) -> None:
+        time.sleep(duration)
+
+
+class VirtualClock(Clock):
+    '''time advances only while `participants` threads are sleeping, jumping to the earliest deadline instead of
+    waiting for it.
+    Threads that block on anything else than the clock must not be counted as participants, and a participant that
+    terminates has to `leave`.
+    '''
+
+    @staticmethod
+    def cons(participants: int=1, start: float=0.) -> 'VirtualClock':
+        return VirtualClock(participants, start)
+
+    def __init__(self, participants: int, start: float) -> None:
+        self.participants = participants
+        self.time = start
+        self.deadlines: list = []
+        self.condition = Condition()
+
+    def now(self) -> float:
+        return self.time
+
+    def sleep(self, duration: float) -> None:
+        with self.condition:
+            deadline = self.time + max(duration, 0.)
+            self.deadlines.append(deadline)
+            while self.time < deadline:
+                if len(self.deadlines) >= self.participants:
+                    self.time = min(self.deadlines)
+                    self.condition.notify_all()
+                else:
+                    self.condition.wait()
+            self.deadlines.remove(deadline)
+
+    def wait(self, block: Callable[[float], bool], timeout: float) -> bool:
+        '''sleeps for `timeout` unless the event has already occurred, since blocking on it wouldn't advance the time.
+        '''
+        if block(0.):
+            return True
+        self.sleep(timeout)
+        return block(0.)
+
+    def leave(self) -> None:
+        with self.condition:
+            self.participants -= 1
+            if self.deadlines and len(self.deadlines) >= self.participants:
+                self.time = max(self.time, min(self.deadlines))
+                self.condition.notify_all()
+
+
+real_clock = RealClock()
+
+
+__all__ = ('Clock', 'RealClock', 'VirtualClock', 'real_clock',)
@@ -1,21 +1,26 @@
-from typing import Any, TypeVar, Callable
+from typing import Any, TypeVar
 
 from ribosome.nvim.io.compute import NvimIO, NRParams
 
-from amino import List, do, Do, Either, Lists, Right, Left
+from amino import List, do, Do, Lists
 from amino.logging import module_log
-from ribosome.nvim.api.util import cons_split_lines, cons_checked_e
+from ribosome.nvim.api.util import cons_split_lines
+from ribosome.nvim.api.atomic import AtomicBatch, AtomicCall, nvim_atomic
 from ribosome.nvim.io.api import N
 
 log = module_log()
 A = TypeVar('A')
 
 
-def nvim_command(cmd: str, *args: Any, params: NRParams=NRParams.cons(verbose=False, sync=False)) -> NvimIO[None]:
+def nvim_command_line(cmd: str, *args: Any, verbose: bool=False) -> str:
     arg_string = ' '.join(map(str, args))
     arg_suffix = '' if len(args) == 0 else f' {arg_string}'
-    silent = '' if params.verbose else 'silent! '
-    cmdline = f'{silent}{cmd}{arg_suffix}'
+    silent = '' if verbose else 'silent! '
+    return f'{silent}{cmd}{arg_suffix}'
+
+
+def nvim_command(cmd: str, *args: Any, params: NRParams=NRParams.cons(verbose=False, sync=False)) -> NvimIO[None]:
+    cmdline = nvim_command_line(cmd, *args, verbose=params.verbose)
     log.debug1(lambda: f'nvim command `{cmdline}`')
     return N.write('nvim_command', cmdline, params=params)
 
@@ -47,39 +52,10 @@ def defined_commands_str() -> Do:
     return lines.join_lines
 
 
-@do(Either[str, None])
-def atomic_error(cmdlines: List[str], error_raw: Any) -> Do:
-    error = yield (
-        Right(error_raw)
-        if isinstance(error_raw, list) else
-        Left(f'invalid error structure for atomic call: {error_raw}')
-    )
-    index, tpe, message = yield (
-        Lists.wrap(error)
-        .lift_all(0, 1, 2)
-        .to_either(f'too few elements in error structure for atomic call: {error}')
-    )
-    offender = yield cmdlines.lift(index).to_either(f'invalid index in atomic call error: {error}')
-    yield Left(f'error of type `{tpe}` in atomic call `{offender}`: {message}')
-
-
-def cons_atomic_result(cmdlines: List[str]) -> Callable[[list], Either[str, Any]]:
-    @do(Either[str, Any])
-    def cons(raw: list) -> Do:
-        result = Lists.wrap(raw)
-        results, error = yield result.lift_all(0, 1).to_either_f(lambda: f'too few elements in atomic result: {result}')
-        yield (
-            Right(results)
-            if error is None
-            else atomic_error(cmdlines, error)
-        )
-    return cons
-
-
 def nvim_atomic_commands(cmdlines: List[str]) -> NvimIO[List[Any]]:
-    cmds = cmdlines.map(lambda a: ['nvim_command', [a]])
-    return N.read_cons_strict('nvim_call_atomic', cons_checked_e(list, cons_atomic_result(cmdlines)), cmds)
+    batch = AtomicBatch(cmdlines.map(lambda a: AtomicCall.cons('nvim_command', a)))
+    return nvim_atomic(batch).map(Lists.wrap)
 
 
 __all__ = ('nvim_command', 'nvim_command_output', 'doautocmd', 'runtime', 'nvim_sync_command', 'defined_commands',
-           'defined_commands_str', 'nvim_atomic_commands',)
+           'defined_commands_str', 'nvim_atomic_commands', 'nvim_command_line',)
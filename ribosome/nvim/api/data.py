@@ -1,16 +1,23 @@
 from __future__ import annotations
 import abc
+from asyncio import AbstractEventLoop
 from typing import Any, Callable, Tuple
 
 from msgpack import ExtType
 
-from amino import List, Either, Map, Left, Dat, Nil, do, Do
+from amino import List, Either, Map, Left, Dat, Nil, do, Do, Maybe, Nothing
 from amino.logging import module_log
 
+from ribosome.nvim.api.session import SessionCache
+from ribosome.nvim.api.mirror import UiMirror, query_request
+from ribosome.nvim.api.signal import Signals
+from ribosome.nvim.api.clock import Clock, real_clock
+
 log = module_log()
 
 
 class NvimApi(Dat['NvimApi']):
+    clock: Clock = real_clock
 
     def __init__(self, name: str) -> None:
         self.name = name
@@ -19,6 +26,37 @@ class NvimApi(Dat['NvimApi']):
     def request(self, method: str, args: List[Any], sync: bool, timeout: float) -> Either[str, Tuple['NvimApi', Any]]:
         ...
 
+    async def request_aio(self, method: str, args: List[Any], sync: bool, timeout: float
+                          ) -> Either[str, Tuple['NvimApi', Any]]:
+        '''awaitable variant of `request`.
+        The default executes the request synchronously, which is sufficient for apis that don't perform io.
+        '''
+        return self.request(method, args, sync, timeout)
+
+    @property
+    def loop(self) -> Maybe[AbstractEventLoop]:
+        '''the event loop that processes the responses for this api, if any.
+        '''
+        return Nothing
+
+    @property
+    def session_cache(self) -> Maybe[SessionCache]:
+        '''storage for values that are constant for the lifetime of the connection, if the api has one.
+        '''
+        return Nothing
+
+    @property
+    def ui_mirror(self) -> Maybe[UiMirror]:
+        '''the event-invalidated mirror of the editor state, if the api has one.
+        '''
+        return Nothing
+
+    @property
+    def signals(self) -> Maybe[Signals]:
+        '''the notifications sent by nvim to wake up waiters, if the api can receive them.
+        '''
+        return Nothing
+
 
 StrictNvimHandler = Callable[['StrictNvimApi', str, List[Any], bool], Either[List[str], Tuple[NvimApi, Any]]]
 
@@ -36,8 +74,9 @@ class StrictNvimApi(NvimApi):
             vars: Map[str, Any]=Map(),
             request_handler: StrictNvimHandler=no_request_handler,
             request_log: List[Tuple[str, List[Any]]]=Nil,
+            clock: Clock=real_clock,
     ) -> 'StrictNvimApi':
-        return StrictNvimApi(name, vars, request_handler, request_log)
+        return StrictNvimApi(name, vars, request_handler, request_log, clock)
 
     def __init__(
             self,
@@ -45,11 +84,13 @@ class StrictNvimApi(NvimApi):
             vars: Map[str, Any],
             request_handler: StrictNvimHandler,
             request_log: List[Tuple[str, List[Any]]],
+            clock: Clock,
     ) -> None:
         self.name = name
         self.vars = vars
         self.request_handler = request_handler
         self.request_log = request_log
+        self.clock = clock
 
     def request(self, method: str, args: List[Any], sync: bool, timeout: float) -> Either[str, Tuple[NvimApi, Any]]:
         vim = self.append1.request_log((method, args))
@@ -87,6 +128,60 @@ def variable_request(vim: StrictNvimApi, method: str, args: List[Any]) -> Do:
     yield manipulate_vars(vim, method, name, rest)
 
 
+def query_call(method: str, args: List[Any]) -> bool:
+    return (
+        all(query_request(call[0]) for call in args.head.get_or_strict([]))
+        if method == 'nvim_call_atomic' else
+        query_request(method)
+    )
+
+
+class ReadOnlyNvimApi(NvimApi):
+    '''only sends requests that query the editor state, rejecting others and recording their methods in `rejected`.
+    '''
+
+    def __init__(self, name: str, vim: NvimApi, rejected: list) -> None:
+        self.name = name
+        self.vim = vim
+        self.rejected = rejected
+
+    def reject(self, method: str) -> Either[str, Tuple[NvimApi, Any]]:
+        self.rejected.append(method)
+        return Left(f'`{method}` is not a query and not allowed in a read-only program')
+
+    def request(self, method: str, args: List[Any], sync: bool, timeout: float) -> Either[str, Tuple[NvimApi, Any]]:
+        if not query_call(method, args):
+            return self.reject(method)
+        return self.vim.request(method, args, sync, timeout).map2(lambda v, a: (self.copy(vim=v), a))
+
+    async def request_aio(self, method: str, args: List[Any], sync: bool, timeout: float
+                          ) -> Either[str, Tuple[NvimApi, Any]]:
+        if not query_call(method, args):
+            return self.reject(method)
+        response = await self.vim.request_aio(method, args, sync, timeout)
+        return response.map2(lambda v, a: (self.copy(vim=v), a))
+
+    @property
+    def clock(self) -> Clock:
+        return self.vim.clock
+
+    @property
+    def loop(self) -> Maybe[AbstractEventLoop]:
+        return self.vim.loop
+
+    @property
+    def session_cache(self) -> Maybe[SessionCache]:
+        return self.vim.session_cache
+
+    @property
+    def ui_mirror(self) -> Maybe[UiMirror]:
+        return self.vim.ui_mirror
+
+    @property
+    def signals(self) -> Maybe[Signals]:
+        return self.vim.signals
+
+
 class Tabpage(Dat['Tabpage']):
 
     def __init__(self, data: ExtType) -> None:
@@ -105,4 +200,4 @@ class Buffer(Dat['Buffer']):
         self.data = data
 
 
-__all__ = ('NvimApi', 'StrictNvimApi', 'Tabpage', 'Window', 'StrictNvimHandler')
+__all__ = ('NvimApi', 'StrictNvimApi', 'Tabpage', 'Window', 'StrictNvimHandler', 'ReadOnlyNvimApi')
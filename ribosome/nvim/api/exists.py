@@ -1,14 +1,17 @@
 from typing import Callable, TypeVar, Any
 
-from amino import do, Do, Either, Right, Left
+from amino import do, Do, Either, Right, Left, List
 
 from ribosome.nvim.io.compute import NvimIO, NRParams
 from ribosome.nvim.api.function import nvim_call_cons_strict, nvim_call_function
 from ribosome.nvim.api.util import nvimio_repeat_timeout, cons_checked_e
-from ribosome.nvim.api.command import nvim_command
+from ribosome.nvim.api.command import nvim_command, nvim_atomic_commands
 from ribosome.nvim.io.api import N
+from ribosome.nvim.api.signal import Signals, signal_method, rpc_defined_event
+from ribosome.nvim.api.rpc import channel_id
 
 A = TypeVar('A')
+signal_recheck_interval = .5
 
 
 def check_exists_bool(a: Any) -> Either[str, bool]:
@@ -38,6 +41,100 @@ def wait_until_valid(
     )
 
 
+@do(NvimIO[None])
+def await_signal(
+        signals: Signals,
+        key: str,
+        check: Callable[[], NvimIO[bool]],
+        error: str,
+        timeout: float,
+        interval: float,
+) -> Do:
+    start = yield N.now()
+    @do(NvimIO[None])
+    def recurse() -> Do:
+        generation = yield N.simple(signals.generation, key)
+        done = yield check()
+        now = yield N.now()
+        remaining = timeout - (now - start)
+        def wait(duration: float) -> bool:
+            return signals.wait(key, generation, duration)
+        if not done:
+            yield (
+                N.error(error)
+                if remaining <= 0 else
+                N.flush().flat_map(lambda a: N.delay(lambda v: v.clock.wait(wait, min(remaining, interval))))
+            )
+            yield recurse()
+    yield recurse()
+
+
+def wait_for_signal(
+        key: str,
+        check: Callable[[], NvimIO[bool]],
+        arm: NvimIO[None],
+        disarm: NvimIO[None],
+        error: str,
+        timeout: float,
+        interval: float=None,
+) -> NvimIO[None]:
+    '''waits until `check` succeeds, blocking on the signal `key` between checks.
+    `arm` makes nvim send the signal and is undone by `disarm`.
+    Since not every change may be signalled, the condition is also checked after `interval` seconds without a signal.
+    Apis that can't receive signals poll instead.
+    '''
+    def wait(signals: Signals) -> NvimIO[None]:
+        recheck = signal_recheck_interval if interval is None else interval
+        return N.ensure(
+            arm.flat_map(lambda a: await_signal(signals, key, check, error, timeout, recheck)),
+            lambda r: disarm,
+        )
+    def poll() -> NvimIO[None]:
+        return nvimio_repeat_timeout(check, lambda a: a, error, timeout, interval).replace(None)
+    return N.suspend(lambda vim: vim.signals.map(wait).get_or(poll))
+
+
+def signal_augroup(channel: int) -> str:
+    return f'ribosome_signal_{channel}'
+
+
+@do(NvimIO[None])
+def arm_rpc_defined() -> Do:
+    channel = yield channel_id()
+    yield nvim_atomic_commands(List(
+        f'augroup {signal_augroup(channel)}',
+        f'autocmd! User {rpc_defined_event}',
+        f"autocmd User {rpc_defined_event} call rpcnotify({channel}, '{signal_method}', '{rpc_defined_event}')",
+        'augroup END',
+    ))
+
+
+@do(NvimIO[None])
+def disarm_rpc_defined() -> Do:
+    channel = yield channel_id()
+    yield nvim_command(f'autocmd! {signal_augroup(channel)} User {rpc_defined_event}')
+
+
+def wait_until_rpc_defined(
+        name: str,
+        check: Callable[[str], NvimIO[bool]],
+        timeout: float=30.,
+        interval: float=None,
+        desc: str='appear',
+) -> NvimIO[None]:
+    '''waits for `check` to succeed, checking again whenever a ribosome plugin has defined its rpc triggers.
+    '''
+    return wait_for_signal(
+        rpc_defined_event,
+        lambda: check(name),
+        arm_rpc_defined(),
+        disarm_rpc_defined(),
+        f'{name} did not {desc} within {timeout} seconds',
+        timeout,
+        interval,
+    )
+
+
 def function_exists(name: str) -> NvimIO[bool]:
     return nvim_exists(f'*{name}')
 
@@ -59,7 +156,7 @@ def command_exists_not(name: str) -> Do:
 
 
 def wait_for_function(name: str, timeout: int=30, **kw: Any) -> NvimIO[None]:
-    return wait_until_valid(name, function_exists, timeout=timeout, desc='appear', **kw)
+    return wait_until_rpc_defined(name, function_exists, timeout=timeout, **kw)
 
 
 def wait_for_function_undef(name: str, timeout: int=30) -> NvimIO[None]:
@@ -67,7 +164,7 @@ def wait_for_function_undef(name: str, timeout: int=30) -> NvimIO[None]:
 
 
 def wait_for_command(name: str, timeout: int=30) -> NvimIO[None]:
-    return wait_until_valid(name, command_exists, timeout=timeout, desc='appear')
+    return wait_until_rpc_defined(name, command_exists, timeout=timeout)
 
 
 @do(NvimIO[A])
@@ -100,4 +197,5 @@ def wait_until_function_produces(
 
 __all__ = ('nvim_exists', 'wait_until_valid', 'function_exists', 'command_exists', 'wait_for_function',
            'wait_for_command', 'command_once_defined', 'call_once_defined', 'function_exists_not',
-           'wait_for_function_undef', 'command_exists_not', 'wait_until_function_produces',)
+           'wait_for_function_undef', 'command_exists_not', 'wait_until_function_produces', 'wait_for_signal',
+           'wait_until_rpc_defined',)
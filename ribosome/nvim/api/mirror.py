@@ -0,0 +1,116 @@
+'''opt-in mirror of frequently read editor state, like the current window or global options.
+Values are stored in the `Comm` when they are first requested and invalidated by autocmds that notify the host when
+the editor state changes, so that reads of a valid entry need no round trip.
+Any request that may change the editor state, i.e. everything but the `get`, `list` and message api functions,
+invalidates the entire mirror.
+Since the notifications are asynchronous, a change made by the user is visible to the host only after the
+notification has been received.
+Window sizes changed with commands like `:resize` are reported by `WinResized`, or by `WinScrolled` in nvim versions
+that don't have that event.
+'''
+from threading import Lock
+from typing import Any, TypeVar, Tuple
+
+from amino import Maybe, Lists, Nothing
+
+A = TypeVar('A')
+ui_mirror_method = 'ribosome_ui_mirror_invalidate'
+query_prefixes = (
+    'nvim_get_',
+    'nvim_list_',
+    'nvim_win_get_',
+    'nvim_buf_get_',
+    'nvim_tabpage_get_',
+)
+read_only_prefixes = query_prefixes + (
+    'nvim_out_write',
+    'nvim_err_write',
+)
+event_categories = dict(
+    WinEnter=('current_window', 'current_buffer', 'window_buffer', 'window_height', 'option'),
+    BufEnter=('current_buffer', 'window_buffer', 'option'),
+    TabEnter=('current_tabpage', 'current_window', 'current_buffer', 'window_buffer', 'window_height'),
+    OptionSet=('option', 'window_height'),
+    VimResized=('window_height',),
+    WinResized=('window_height',),
+    WinScrolled=('window_height',),
+)
+ui_mirror_events = Lists.wrap(event_categories.keys())
+optional_events = dict(WinResized=None, WinScrolled='WinResized')
+
+
+def ui_mirror_autocmd(channel: int, event: str) -> str:
+    '''`WinScrolled` fires on every scroll, so it is only used if `WinResized` isn't available.
+    '''
+    cmd = f"autocmd {event} * call rpcnotify({channel}, '{ui_mirror_method}', '{event}')"
+    if event not in optional_events:
+        return cmd
+    preferred = optional_events[event]
+    condition = f"exists('##{event}')" + ('' if preferred is None else f" && !exists('##{preferred}')")
+    return f'if {condition} | execute "{cmd}" | endif'
+
+
+def read_only_request(method: str) -> bool:
+    return method.startswith(read_only_prefixes)
+
+
+def query_request(method: str) -> bool:
+    return method.startswith(query_prefixes)
+
+
+class UiMirror:
+    '''stores values by keys of the shape `(category, *args)`.
+    Every invalidation increments `generation`; a value is only stored if no invalidation happened since its request
+    was started, so that a response that was overtaken by an event notification doesn't end up in the mirror.
+    '''
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.values: dict = dict()
+        self.generation = 0
+        self.lock = Lock()
+
+    def lookup(self, key: Tuple[str, ...]) -> Maybe[Any]:
+        if not self.enabled:
+            return Nothing
+        with self.lock:
+            return Maybe.optional(self.values.get(key))
+
+    def store(self, key: Tuple[str, ...], generation: int, value: A) -> A:
+        with self.lock:
+            if self.enabled and generation == self.generation:
+                self.values[key] = value
+        return value
+
+    def invalidate(self, event: str) -> None:
+        categories = event_categories.get(event)
+        with self.lock:
+            self.generation += 1
+            if categories is None:
+                self.values.clear()
+            else:
+                for key in [a for a in self.values if a[0] in categories]:
+                    del self.values[key]
+
+    def clear(self) -> None:
+        with self.lock:
+            self.generation += 1
+            self.values.clear()
+
+    def observe(self, method: str) -> None:
+        '''invalidates everything if `method` may change the editor state.
+        '''
+        if self.enabled and not read_only_request(method):
+            self.clear()
+
+    def enable(self) -> None:
+        self.clear()
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+        self.clear()
+
+
+__all__ = ('UiMirror', 'ui_mirror_method', 'ui_mirror_events', 'read_only_request', 'ui_mirror_autocmd',
+           'query_request',)
@@ -6,13 +6,14 @@ from ribosome.nvim.io.compute import NvimIO
 from ribosome.nvim.api.util import cons_decode_str, cons_decode_str_list, cons_decode_str_list_option, cons_int
 from ribosome.nvim.api.data import Buffer
 from ribosome.nvim.io.api import N
+from ribosome.nvim.api.ui import mirrored
 
 A = TypeVar('A')
 B = TypeVar('B')
 
 
 def option(name: str, cons: Callable[[A], Either[str, B]]) -> NvimIO[B]:
-    return N.read_cons_strict('nvim_get_option', cons, name)
+    return mirrored(('option', name, cons), N.read_cons_strict('nvim_get_option', cons, name))
 
 
 def option_str(name: str) -> NvimIO[str]:
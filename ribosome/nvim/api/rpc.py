@@ -1,4 +1,4 @@
-from typing import Tuple, Any
+from typing import Tuple, Any, TypeVar
 
 from amino import _, Either, Map, Left, Right, do, Do
 from amino.state import State
@@ -8,6 +8,9 @@ from ribosome.nvim.io.api import N
 from ribosome.nvim.api.function import nvim_call_function, nvim_call_tpe
 from ribosome.nvim.api.command import nvim_command
 from ribosome import NvimApi
+from ribosome.nvim.api.session import SessionCache, NvimSession, cons_nvim_session
+
+A = TypeVar('A')
 
 
 def plugin_name() -> NvimIO[str]:
@@ -30,10 +33,31 @@ def api_info() -> NvimIO[Tuple[int, dict]]:
     return N.read_cons_strict('nvim_get_api_info', cons)
 
 
-@do(NvimIO[int])
-def channel_id() -> Do:
+def session_cached(name: str, io: NvimIO[A]) -> NvimIO[A]:
+    '''executes `io` only if the api's session cache doesn't contain a value for `name` yet.
+    Apis without a cache execute it every time.
+    '''
+    @do(NvimIO[A])
+    def fetch(cache: SessionCache) -> Do:
+        value = yield io
+        return cache.store(name, value)
+    def cached(cache: SessionCache) -> NvimIO[A]:
+        return cache.lookup(name).map(N.pure).get_or(fetch, cache)
+    return N.suspend(lambda vim: vim.session_cache.map(cached) | io)
+
+
+@do(NvimIO[NvimSession])
+def fetch_nvim_session() -> Do:
     channel, metadata = yield api_info()
-    return channel
+    return cons_nvim_session(channel, metadata)
+
+
+def nvim_session() -> NvimIO[NvimSession]:
+    return session_cached('session', fetch_nvim_session())
+
+
+def channel_id() -> NvimIO[int]:
+    return nvim_session().map(_.channel)
 
 
 def rpcrequest(channel: int, method: str, *args: str) -> NvimIO[Any]:
@@ -55,8 +79,8 @@ def nvim_api() -> NvimIO[NvimApi]:
 
 
 def nvim_pid() -> NvimIO[int]:
-    return nvim_call_tpe(int, 'getpid')
+    return session_cached('pid', nvim_call_tpe(int, 'getpid'))
 
 
 __all__ = ('plugin_name', 'api_info', 'channel_id', 'rpcrequest', 'rpcrequest_current', 'nvim_quit', 'nvim_api',
-           'nvim_pid',)
+           'nvim_pid', 'session_cached', 'nvim_session',)
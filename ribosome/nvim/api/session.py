@@ -0,0 +1,66 @@
+'''metadata of an nvim connection that doesn't change while it is open.
+The values are requested once per connection and stored in the `SessionCache` of the `Comm`, so that helpers like
+`channel_id` don't have to transfer the entire api metadata on every call.
+'''
+from threading import Lock
+from typing import Any, TypeVar
+
+from amino import Dat, Map, Maybe
+
+A = TypeVar('A')
+
+
+class NvimSession(Dat['NvimSession']):
+
+    @staticmethod
+    def cons(
+            channel: int,
+            api_level: Maybe[int],
+            ext_types: Map[str, int],
+            version: Map[str, Any],
+    ) -> 'NvimSession':
+        return NvimSession(channel, api_level, ext_types, version)
+
+    def __init__(self, channel: int, api_level: Maybe[int], ext_types: Map[str, int], version: Map[str, Any]) -> None:
+        self.channel = channel
+        self.api_level = api_level
+        self.ext_types = ext_types
+        self.version = version
+
+
+def cons_ext_types(types: Any) -> Map[str, int]:
+    return Map({
+        name: data['id']
+        for name, data in types.items()
+        if isinstance(data, dict) and isinstance(data.get('id'), int)
+    }) if isinstance(types, dict) else Map()
+
+
+def cons_nvim_session(channel: int, metadata: Map[str, Any]) -> NvimSession:
+    version = metadata.lift('version').filter(lambda a: isinstance(a, dict)) | {}
+    types = metadata.lift('types') | {}
+    return NvimSession.cons(channel, Map(version).lift('api_level'), cons_ext_types(types), Map(version))
+
+
+class SessionCache:
+    '''stores values by name, computing each of them only once.
+    '''
+
+    def __init__(self) -> None:
+        self.values: dict = dict()
+        self.lock = Lock()
+
+    def lookup(self, name: str) -> Maybe[Any]:
+        return Maybe.optional(self.values.get(name))
+
+    def store(self, name: str, value: A) -> A:
+        with self.lock:
+            self.values.setdefault(name, value)
+        return value
+
+    def clear(self) -> None:
+        with self.lock:
+            self.values.clear()
+
+
+__all__ = ('NvimSession', 'SessionCache', 'cons_nvim_session',)
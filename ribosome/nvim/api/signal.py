@@ -0,0 +1,37 @@
+'''notifications that nvim sends to the host when a condition a waiter depends on may have changed, like a watched
+variable being assigned.
+Waiters block on the `Signals` of the `Comm` instead of polling nvim, and re-check their condition when the signal
+arrives.
+'''
+from threading import Condition
+
+signal_method = 'ribosome_signal'
+rpc_defined_event = 'RibosomeRpcDefined'
+
+
+class Signals:
+    '''counts the notifications per key.
+    A waiter reads the count before checking its condition and then waits for it to change, so that a signal that
+    arrives between the check and the wait is not lost.
+    '''
+
+    def __init__(self) -> None:
+        self.counts: dict = dict()
+        self.condition = Condition()
+
+    def generation(self, key: str) -> int:
+        return self.counts.get(key, 0)
+
+    def notify(self, key: str) -> None:
+        with self.condition:
+            self.counts[key] = self.counts.get(key, 0) + 1
+            self.condition.notify_all()
+
+    def wait(self, key: str, generation: int, timeout: float) -> bool:
+        '''blocks until the signal `key` has been sent after `generation` was read, or `timeout` seconds have passed.
+        '''
+        with self.condition:
+            return self.condition.wait_for(lambda: self.generation(key) != generation, timeout)
+
+
+__all__ = ('Signals', 'signal_method', 'rpc_defined_event',)
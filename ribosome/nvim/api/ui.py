@@ -1,29 +1,70 @@
-from typing import Tuple
+from typing import Tuple, TypeVar, Any
 
 from amino import List, I, do, Do, Path
 from amino.logging import module_log
 
 from ribosome.nvim.io.compute import NvimIO
-from ribosome.nvim.api.data import Tabpage, Window, Buffer
+from ribosome.nvim.api.data import Tabpage, Window, Buffer, NvimApi
 from ribosome.nvim.api.util import (cons_ext, cons_ext_list, cons_checked_list, cons_checked_e, extract_int_pair,
                                     cons_decode_bool)
-from ribosome.nvim.api.command import nvim_command
+from ribosome.nvim.api.command import nvim_command, nvim_atomic_commands
 from ribosome.nvim.io.api import N
+from ribosome.nvim.io.write_buffer import write_buffer
 from ribosome.nvim.api.function import nvim_call_cons_strict
+from ribosome.nvim.api.mirror import UiMirror, ui_mirror_events, ui_mirror_autocmd
+from ribosome.nvim.api.rpc import channel_id, plugin_name
 
 log = module_log()
+A = TypeVar('A')
+
+
+def mirrored(key: Tuple[Any, ...], io: NvimIO[A]) -> NvimIO[A]:
+    '''executes `io` only if the api's ui mirror is enabled and has no valid value for `key`.
+    Buffered writes have not invalidated the mirror yet, so it is bypassed while there are any.
+    '''
+    def fetch(mirror: UiMirror) -> NvimIO[A]:
+        generation = mirror.generation
+        return io.map(lambda a: mirror.store(key, generation, a))
+    def cached(mirror: UiMirror) -> NvimIO[A]:
+        return mirror.lookup(key).map(N.pure).get_or(fetch, mirror)
+    def read(vim: NvimApi) -> NvimIO[A]:
+        return io if write_buffer.writes else vim.ui_mirror.filter(lambda a: a.enabled).map(cached) | io
+    return N.suspend(read)
+
+
+def ui_mirror_augroup(name: str) -> str:
+    return f'{name}_ui_mirror'
+
+
+@do(NvimIO[None])
+def start_ui_mirror() -> Do:
+    '''defines the autocmds that invalidate the mirror and enables it.
+    '''
+    name = yield plugin_name()
+    channel = yield channel_id()
+    autocmds = ui_mirror_events.map(lambda a: ui_mirror_autocmd(channel, a))
+    yield nvim_atomic_commands(List(f'augroup {ui_mirror_augroup(name)}', 'autocmd!') + autocmds + List('augroup END'))
+    yield N.delay(lambda vim: vim.ui_mirror.foreach(lambda a: a.enable()))
+
+
+@do(NvimIO[None])
+def stop_ui_mirror() -> Do:
+    name = yield plugin_name()
+    yield N.delay(lambda vim: vim.ui_mirror.foreach(lambda a: a.disable()))
+    group = ui_mirror_augroup(name)
+    yield nvim_atomic_commands(List(f'augroup {group}', 'autocmd!', 'augroup END', f'augroup! {group}'))
 
 
 def current_tabpage() -> NvimIO[Tabpage]:
-    return N.read_tpe('nvim_get_current_tabpage', cons_ext(Tabpage))
+    return mirrored(('current_tabpage',), N.read_cons_strict('nvim_get_current_tabpage', cons_ext(Tabpage)))
 
 
 def current_window() -> NvimIO[Window]:
-    return N.read_cons_strict('nvim_get_current_win', cons_ext(Window))
+    return mirrored(('current_window',), N.read_cons_strict('nvim_get_current_win', cons_ext(Window)))
 
 
 def current_buffer() -> NvimIO[Buffer]:
-    return N.read_cons_strict('nvim_get_current_buf', cons_ext(Buffer))
+    return mirrored(('current_buffer',), N.read_cons_strict('nvim_get_current_buf', cons_ext(Buffer)))
 
 
 def tabpages() -> NvimIO[List[Tabpage]]:
@@ -39,7 +80,10 @@ def buffers() -> NvimIO[List[Buffer]]:
 
 
 def window_buffer(window: Window) -> NvimIO[Buffer]:
-    return N.read_cons_strict('nvim_win_get_buf', cons_ext(Buffer), window.data)
+    return mirrored(
+        ('window_buffer', window.data),
+        N.read_cons_strict('nvim_win_get_buf', cons_ext(Buffer), window.data),
+    )
 
 
 def set_buffer_lines(
@@ -190,7 +234,7 @@ def echo(text: str) -> Do:
 
 
 def window_height(window: Window) -> NvimIO[int]:
-    return N.read_tpe('nvim_win_get_height', int, window.data)
+    return mirrored(('window_height', window.data), N.read_tpe('nvim_win_get_height', int, window.data))
 
 
 def window_set_height(window: Window, height: int) -> NvimIO[None]:
@@ -225,4 +269,4 @@ __all__ = ('current_tabpage', 'current_window', 'current_buffer', 'tabpages', 'w
            'focus_window', 'buffer_name', 'window_buffer_name', 'current_buffer_name', 'set_cursor', 'set_line',
            'set_local_cursor', 'current_window_number', 'send_input', 'edit_file', 'echo', 'window_number',
            'window_height', 'current_window_height', 'close_window', 'set_buffer_name', 'window_focus', 'wincmd',
-           'set_local_line',)
+           'set_local_line', 'mirrored', 'start_ui_mirror', 'stop_ui_mirror',)
@@ -1,4 +1,3 @@
-import time
 from typing import Callable, TypeVar, Type, Any, List as TList, Tuple
 
 from msgpack import ExtType
@@ -101,7 +100,7 @@ def nvimio_repeat_timeout(
         interval: float=None,
 ) -> Do:
     effective_interval = .01 if interval is None else interval
-    start = yield N.simple(time.time)
+    start = yield N.now()
     @do(NvimIO[None])
     def wait_and_recurse() -> Do:
         yield N.sleep(effective_interval)
@@ -110,11 +109,12 @@ def nvimio_repeat_timeout(
     def recurse() -> Do:
         result = yield thunk()
         done = check(result)
+        now = yield N.now()
         yield (
             N.pure(result)
             if done else
             N.error(error)
-            if time.time() - start > timeout else
+            if now - start > timeout else
             wait_and_recurse()
         )
     yield recurse()
@@ -132,7 +132,7 @@ def nvimio_await_success(
         interval: float=.01,
         **kw: Any,
 ) -> Do:
-    start = yield N.simple(time.time)
+    start = yield N.now()
     @do(NvimIO[None])
     def wait_and_recurse() -> Do:
         yield N.sleep(interval)
@@ -140,9 +140,10 @@ def nvimio_await_success(
     @do(NvimIO[None])
     def recurse() -> Do:
         result = yield nvimio_result(thunk, *a, **kw)
+        now = yield N.now()
         yield (
             lift_n_result.match(result)
-            if isinstance(result, NSuccess) or time.time() - start > timeout else
+            if isinstance(result, NSuccess) or now - start > timeout else
             wait_and_recurse()
         )
     yield recurse()
@@ -5,12 +5,15 @@ from amino import Either, do, Do, Left, I
 from amino.logging import module_log
 
 from ribosome.nvim.io.compute import NvimIO
-from ribosome.nvim.api.rpc import plugin_name
+from ribosome.nvim.api.rpc import plugin_name, channel_id
 from ribosome.nvim.api.util import cons_decode_str, cons_checked_e
 from ribosome.nvim.api.data import Buffer
 from ribosome.nvim.request import nvim_nonfatal_request, data_cons_request_nonfatal, nvim_request
 from ribosome.nvim.io.api import N
-from ribosome.nvim.api.exists import wait_until_valid
+from ribosome.nvim.api.exists import wait_for_signal
+from ribosome.nvim.api.signal import signal_method
+from ribosome.nvim.api.function import nvim_call_function
+from ribosome.nvim.api.command import nvim_command
 
 log = module_log()
 A = TypeVar('A')
@@ -83,12 +86,50 @@ def var_equals(target: Any) -> Callable[[str], NvimIO[bool]]:
     return var_equals
 
 
-def var_becomes(name: str, value: Any, timeout: float=3, interval: float=.01) -> NvimIO[None]:
-    return wait_until_valid(name, var_equals(value), timeout=timeout, interval=interval, desc=f'become {value}')
+def var_watcher(channel: int) -> str:
+    return f'RibosomeSignalVar{channel}'
+
+
+def var_signal(name: str) -> str:
+    return f'var:{name}'
+
+
+@do(NvimIO[None])
+def watch_var(name: str) -> Do:
+    '''makes nvim send the signal `var:<name>` to this host whenever `g:<name>` is assigned.
+    '''
+    channel = yield channel_id()
+    watcher = var_watcher(channel)
+    yield nvim_call_function('execute', [
+        f'function! {watcher}(dict, key, change)',
+        f"call rpcnotify({channel}, '{signal_method}', 'var:' . a:key)",
+        'endfunction',
+        f"call dictwatcheradd(g:, '{name}', '{watcher}')",
+    ])
+
+
+@do(NvimIO[None])
+def unwatch_var(name: str) -> Do:
+    channel = yield channel_id()
+    yield nvim_command(f"call dictwatcherdel(g:, '{name}', '{var_watcher(channel)}')")
+
+
+def var_becomes(name: str, value: Any, timeout: float=3, interval: float=None) -> NvimIO[None]:
+    '''waits for `g:<name>` to equal `value`, checking again whenever the variable is assigned.
+    '''
+    return wait_for_signal(
+        var_signal(name),
+        lambda: var_equals(value)(name),
+        watch_var(name),
+        unwatch_var(name),
+        f'{name} did not become {value} within {timeout} seconds',
+        timeout,
+        interval,
+    )
 
 
 @do(NvimIO[None])
-def pvar_becomes(name: str, value: Any, timeout: float=3, interval: float=.01) -> Do:
+def pvar_becomes(name: str, value: Any, timeout: float=3, interval: float=None) -> Do:
     prefix = yield plugin_name()
     yield var_becomes(f'{prefix}_{name}', value, timeout=timeout, interval=interval)
 
@@ -0,0 +1,86 @@
+'''interpreter for `NvimIO` that runs in a coroutine.
+The program is advanced by the synchronous interpreter until it reaches a request, which is then awaited with
+`NvimApi.request_aio`, so the event loop can process other coroutines while the response is pending.
+The branches of `NvimIOPar` are run concurrently, each with its own request in flight.
+The synchronous steps are executed in a thread dedicated to the run, since thunks may block, like `N.sleep`, waiting
+for a signal or running a nested program synchronously, which would deadlock if it waited for a response that the
+loop has to receive.
+Using the same thread for all steps preserves the thread-local context, like the program reported to request hooks,
+between them; the request id is passed to the thread explicitly.
+'''
+from asyncio import gather, get_event_loop
+from concurrent.futures import ThreadPoolExecutor
+from typing import TypeVar, Tuple, Any, Optional
+
+from amino import List, Lists, Right, Nil
+from amino.logging import module_log
+
+from ribosome.nvim.api.data import NvimApi
+from ribosome.nvim.io.compute import NvimIO, NvimIORequest, NvimIOPar, NvimIOPure, NvimIOFatal, advance_nvim_io
+from ribosome.nvim.io.trace import NvimIOException
+from ribosome.nvim.io.data import NResult
+from ribosome.tracing import span, tracer, carry_request
+from ribosome.nvim.io.hooks import request_hooks
+
+log = module_log()
+A = TypeVar('A')
+
+
+async def execute_nvim_request_aio(vim: NvimApi, io: NvimIORequest[A], hook_context: Optional[tuple]
+                                   ) -> Tuple[NvimApi, NvimIO[Any]]:
+    '''`hook_context` is the program and frame of the step thread, if request hooks are enabled.
+    '''
+    params = io.params
+    hooked = hook_context is not None
+    start = request_hooks.now() if hooked else 0.
+    if tracer.enabled:
+        with span(io.method, 'nvim', sync=params.sync, aio=True):
+            response = await vim.request_aio(io.method, io.args, params.sync, params.timeout)
+    else:
+        response = await vim.request_aio(io.method, io.args, params.sync, params.timeout)
+    if hooked:
+        request_hooks.report(io.method, io.args, response.map(lambda a: a[1]), start, hook_context)
+    if response.is_right:
+        updated_vim, result = response.value
+        return updated_vim, NvimIOPure(Right(result))
+    return vim, NvimIOPure(response)
+
+
+async def interpret_par_aio(vim: NvimApi, ios: List[NvimIO[A]]) -> Tuple[NvimApi, NvimIO[List[NResult[A]]]]:
+    results = await gather(*[interpret_nvim_io_aio(io, vim) for io in ios])
+    updated_vim = results[-1][0] if results else vim
+    return updated_vim, NvimIOPure(Lists.wrap([result for v, result in results]))
+
+
+def advance_step(vim: NvimApi, io: NvimIO[A], stack: list) -> Tuple[NvimApi, Any, Optional[tuple]]:
+    vim, step = advance_nvim_io(vim, io, stack, True)
+    return vim, step, request_hooks.context if request_hooks.enabled else None
+
+
+async def interpret_nvim_io_aio(io: NvimIO[A], vim: NvimApi) -> Tuple[NvimApi, NResult[A]]:
+    '''failures of the awaited operations are fed back into the program, so they can be recovered from like in the
+    synchronous interpreter.
+    '''
+    loop = get_event_loop()
+    executor = ThreadPoolExecutor(1, thread_name_prefix='ribosome_aio')
+    advance = carry_request(advance_step)
+    stack: list = []
+    current: NvimIO[Any] = io
+    try:
+        while True:
+            vim, step, hook_context = await loop.run_in_executor(executor, advance, vim, current, stack)
+            tpe = type(step)
+            try:
+                if tpe is NvimIORequest:
+                    vim, current = await execute_nvim_request_aio(vim, step, hook_context)
+                elif tpe is NvimIOPar:
+                    vim, current = await interpret_par_aio(vim, step.ios)
+                else:
+                    return vim, step
+            except Exception as e:
+                current = NvimIOFatal(NvimIOException('', Nil, e, None))
+    finally:
+        executor.shutdown(wait=False)
+
+
+__all__ = ('interpret_nvim_io_aio',)
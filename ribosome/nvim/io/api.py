@@ -1,18 +1,17 @@
-import time
-from typing import TypeVar, Callable, Any, Type, Tuple
+from typing import TypeVar, Callable, Any, Type, Tuple, Iterable
 from threading import Thread
 
 from msgpack import ExtType
 
-from amino import Either, IO, Maybe, List, Boolean, do, Do
+from amino import Either, IO, Maybe, List, Boolean, do, Do, Lists
 from amino.func import CallByName
 
 from ribosome.nvim.api.data import NvimApi
-from ribosome.nvim.io.compute import NvimIORequest, NvimIOPure, NvimIOFatal, NvimIOError, NvimIO, NRParams
+from ribosome.nvim.io.compute import NvimIORequest, NvimIOPure, NvimIOFatal, NvimIOError, NvimIO, NRParams, NvimIOPar
 from ribosome.nvim.request import typechecked_request, data_cons_request_strict, nvim_request, data_cons_request
-from ribosome.nvim.io.cons import (nvimio_delay, nvimio_recover_error, nvimio_recover_fatal, nvimio_wrap_either,
-                                   nvimio_from_either, nvimio_suspend, nvimio_recover_failure, nvimio_ensure,
-                                   nvimio_intercept)
+from ribosome.nvim.io.cons import (nvimio_delay_from, nvimio_recover_error, nvimio_recover_fatal, nvimio_from_either,
+                                   nvimio_suspend_from, nvimio_recover_failure, nvimio_ensure, nvimio_intercept,
+                                   nvimio_par, nvimio_flush, nvimio_traverse)
 from ribosome.nvim.io.data import NResult, NError, NFatal
 
 A = TypeVar('A')
@@ -29,7 +28,7 @@ class NMeta(type):
         return NvimIOPure(a)
 
     def wrap_either(self, f: Callable[[NvimApi], Either[B, A]]) -> NvimIO[A]:
-        return nvimio_wrap_either(f)
+        return nvimio_suspend_from(1, lambda v: f(v).cata(NvimIOError, NvimIOPure))
 
     def from_either(self, e: Either[str, A]) -> NvimIO[A]:
         return nvimio_from_either(e)
@@ -53,19 +52,19 @@ class NMeta(type):
         return NvimIOError(msg)
 
     def from_io(self, io: IO[A]) -> NvimIO[A]:
-        return N.delay(lambda a: io.attempt.get_or_raise())
+        return nvimio_delay_from(1, lambda a: io.attempt.get_or_raise())
 
     def delay(self, f: Callable[..., A], *a: Any, **kw: Any) -> NvimIO[A]:
-        return nvimio_delay(f, *a, **kw)
+        return nvimio_delay_from(1, f, *a, **kw)
 
     def request(self, method: str, args: List[str], params: NRParams=NRParams.cons()) -> NvimIO[A]:
         return NvimIORequest(method, args, params)
 
     def simple(self, f: Callable[..., A], *a: Any, **kw: Any) -> NvimIO[A]:
-        return N.delay(lambda v: f(*a, **kw))
+        return nvimio_delay_from(1, lambda v: f(*a, **kw))
 
     def suspend(self, f: Callable[..., NvimIO[A]], *a: Any, **kw: Any) -> NvimIO[A]:
-        return nvimio_suspend(f, *a, **kw)
+        return nvimio_suspend_from(1, f, *a, **kw)
 
     def read_tpe(self, cmd: str, tpe: Type[A], *args: Any) -> NvimIO[A]:
         return typechecked_request(cmd, tpe, *args)
@@ -140,13 +139,40 @@ class NMeta(type):
         api1, result = yield N.to_io(fa, api)
         return result
 
+    def traverse(self, items: Iterable[B], f: Callable[[B], NvimIO[A]]) -> NvimIO[List[A]]:
+        '''sequential traversal in constant stack and linear time, unlike the generic `traverse` of `List`, which
+        builds a nested bind chain as long as the list.
+        '''
+        return nvimio_traverse(items, f)
+
+    def par(self, *ios: NvimIO[A]) -> NvimIO[List[A]]:
+        '''runs independent programs in lockstep, sending their requests in one `nvim_call_atomic` per step.
+        '''
+        return nvimio_par(Lists.wrap(ios))
+
+    def par_safe(self, ios: List[NvimIO[A]]) -> NvimIO[List[NResult[A]]]:
+        return NvimIOPar(ios)
+
+    def traverse_par(self, items: List[B], f: Callable[[B], NvimIO[A]]) -> NvimIO[List[A]]:
+        return nvimio_par(items.map(f))
+
+    def flush(self) -> NvimIO[None]:
+        '''sends the buffered writes immediately, e.g. to display a message before a long computation.
+        '''
+        return nvimio_flush()
+
     def sleep(self, duration: float) -> NvimIO[None]:
-        return N.delay(lambda v: time.sleep(duration))
+        return N.flush().flat_map(lambda a: N.delay(lambda v: v.clock.sleep(duration)))
+
+    def now(self) -> NvimIO[float]:
+        '''the current time of the api's clock.
+        '''
+        return nvimio_delay_from(1, lambda v: v.clock.now())
 
     def fork(self, f: Callable[..., NvimIO[None]], *a: Any, daemon: bool=True, **kw: Any) -> NvimIO[Thread]:
         def fork(v: NvimApi) -> NvimIO[Thread]:
             return N.from_io(IO.fork(lambda: f(*a, **kw).unsafe(v), daemon=daemon))
-        return N.suspend(fork)
+        return nvimio_suspend_from(1, fork)
 
 
 class N(metaclass=NMeta):
@@ -1,16 +1,19 @@
-from typing import TypeVar, Callable, Generic, Tuple, cast
+from typing import TypeVar, Callable, Generic, Tuple, cast, Optional, Any, Union
 
 from amino.tc.base import F, ImplicitsMeta, Implicits
-from amino import Either, List, options, Do, Boolean, Dat
+from amino import Either, List, options, Do, Boolean, Dat, Nil, Right, Left, Lists
 from amino.state import State
 from amino.do import do
 from amino.dat import ADT, ADTMeta
-from amino.case import Case, CaseRec, Term, RecStep
+from amino.case import Case
 from amino.logging import module_log
 
 from ribosome.nvim.api.data import NvimApi
 from ribosome.nvim.io.trace import NvimIOException
 from ribosome.nvim.io.data import NFatal, NResult, NSuccess, NError, Thunk, eval_thunk
+from ribosome.tracing import span, tracer
+from ribosome.nvim.io.write_buffer import write_buffer, WriteBuffer, unbuffered_methods
+from ribosome.nvim.io.hooks import request_hooks
 
 log = module_log()
 A = TypeVar('A')
@@ -35,11 +38,11 @@ class NvimIO(
     def eval(self) -> State[NvimApi, NResult[A]]:
         return eval_nvim_io(self)
 
+    def flat_map(self, f: Callable[[A], 'NvimIO[B]']) -> 'NvimIO[B]':
+        return flat_map_nvim_io(self, f)
+
     def run(self, vim: NvimApi) -> Tuple[NvimApi, NResult[A]]:
-        try:
-            return self.eval().run(vim).value
-        except NvimIOException as e:
-            return vim, NFatal(e)
+        return interpret_nvim_io(self, vim)
 
     def run_s(self, vim: NvimApi) -> NvimApi:
         return self.run(vim)[0]
@@ -104,7 +107,7 @@ class NvimIOSuspend(Generic[A], NvimIO[A]):
 
     @staticmethod
     def cons(thunk: State[NvimApi, NvimIO[A]]) -> 'NvimIOSuspend[A]':
-        return NvimIOSuspend(Thunk.cons(thunk))
+        return NvimIOSuspend(Thunk.cons(thunk, depth=1))
 
     def __init__(self, thunk: Thunk[NvimApi, NvimIO[A]]) -> None:
         self.thunk = thunk
@@ -121,6 +124,16 @@ class NvimIOBind(Generic[A, B], NvimIO[B]):
         self.kleisli = kleisli
 
 
+class NvimIOFlatMap(Generic[A, B], NvimIO[B]):
+    '''created by `flat_map` for every variant that doesn't short-circuit.
+    The interpreter pushes `kleisli` onto its continuation stack, so left-nested binds are never re-associated.
+    '''
+
+    def __init__(self, io: NvimIO[A], kleisli: Callable[[A], NvimIO[B]]) -> None:
+        self.io = io
+        self.kleisli = kleisli
+
+
 class NvimIOError(Generic[A], NvimIO[A]):
 
     def __init__(self, error: str) -> None:
@@ -146,6 +159,17 @@ class NvimIORecover(Generic[A], NvimIO[A]):
         self.recoverable = recoverable
 
 
+class NvimIOPar(Generic[A], NvimIO[List[NResult[A]]]):
+    '''independent programs that are interpreted in lockstep.
+    In each round, every branch is run until it reaches a request, and the requests of all branches are sent to nvim as
+    a single `nvim_call_atomic`.
+    The result contains the individual outcome of each branch.
+    '''
+
+    def __init__(self, ios: List[NvimIO[A]]) -> None:
+        self.ios = ios
+
+
 class lift_n_result(Case[NResult[A], NvimIO[A]], alg=NResult):
 
     def n_success(self, result: NSuccess[A]) -> NvimIO[A]:
@@ -158,97 +182,259 @@ class lift_n_result(Case[NResult[A], NvimIO[A]], alg=NResult):
         return NvimIOFatal(result.exception)
 
 
-@do(State[NvimApi, NvimIO[A]])
-def execute_nvim_request(io: NvimIORequest[A]) -> Do:
-    def make_request(vim: NvimApi) -> Tuple[NvimApi, NvimIO[A]]:
-        response = vim.request(io.method, io.args, io.params.sync, io.params.timeout)
-        updated_vim = response.map2(lambda v, a: v) | vim
-        result = response.map2(lambda v, a: a)
-        return updated_vim, NvimIOPure(result)
-    updated_vim, result = yield State.inspect(make_request)
-    yield State.reset(updated_vim, result)
-
-
-@do(State[NvimApi, NvimIO[Either[List[str], A]]])
-def execute_nvim_recover(io: NvimIORecover[A]) -> Do:
-    def execute_wrapped(vim: NvimApi) -> Tuple[NvimApi, Either[List[str], A]]:
-        updated_vim, result = io.io.run(vim)
-        return updated_vim, (
-            io.recover(result)
-            if io.recoverable(result) else
-            lift_n_result.match(result)
-        )
-    updated_vim, result = yield State.inspect(execute_wrapped)
-    yield State.reset(updated_vim, result)
-
-
-class flat_map_nvim_io(Case[Callable[[A], NvimIO[B]], NvimIO[B]], alg=NvimIO):
-
-    def __init__(self, f: Callable[[A], NvimIO[B]]) -> None:
-        self.f = f
-
-    def nvim_io_pure(self, io: NvimIOPure[A]) -> NvimIO[B]:
-        thunk = State.delay(self.f, io.value)
-        return NvimIOSuspend.cons(thunk)
-
-    def nvim_io_suspend(self, io: NvimIOSuspend[A]) -> NvimIO[B]:
-        return NvimIOBind(io.thunk, self.f)
-
-    def nvim_io_request(self, io: NvimIORequest[A]) -> NvimIO[B]:
-        return NvimIOBind(Thunk.cons(execute_nvim_request(io)), self.f)
-
-    def nvim_io_bind(self, io: NvimIOBind[C, A]) -> NvimIO[B]:
-        return NvimIOSuspend.cons(State.pure(NvimIOBind(io.thunk, lambda a: io.kleisli(a).flat_map(self.f))))
-
-    def nvim_io_error(self, io: NvimIOError[A]) -> NvimIO[B]:
-        return cast(NvimIO[B], io)
-
-    def nvim_io_fatal(self, io: NvimIOFatal[A]) -> NvimIO[B]:
-        return cast(NvimIO[B], io)
-
-    def nvim_io_recover(self, io: NvimIORecover[A]) -> NvimIO[B]:
-        return NvimIOBind(Thunk.cons(execute_nvim_recover(io)), self.f)
-
-
-EvalRes = RecStep[NvimIO[A], Tuple[NvimApi, NResult[A]]]
-
-
-class eval_step(CaseRec[NvimIO[A], NResult[A]], alg=NvimIO):
-
-    def __init__(self, vim: NvimApi) -> None:
-        self.vim = vim
-
-    def nvim_io_pure(self, io: NvimIOPure[A]) -> EvalRes:
-        return Term((self.vim, NSuccess(io.value)))
-
-    def nvim_io_request(self, io: NvimIORequest[A]) -> EvalRes:
-        thunk = Thunk.cons(execute_nvim_request(io))
-        return self(NvimIOSuspend(thunk))
-
-    def nvim_io_suspend(self, io: NvimIOSuspend[A]) -> EvalRes:
-        vim, next = eval_thunk(self.vim, io.thunk)
-        return eval_step(vim)(next)
-
-    def nvim_io_bind(self, io: NvimIOBind[B, A]) -> EvalRes:
-        vim, next = eval_thunk(self.vim, io.thunk)
-        return eval_step(vim)(next.flat_map(io.kleisli))
-
-    def nvim_io_error(self, io: NvimIOError[A]) -> EvalRes:
-        return Term((self.vim, NError(io.error)))
-
-    def nvim_io_fatal(self, io: NvimIOFatal[A]) -> EvalRes:
-        return Term((self.vim, NFatal(io.exception)))
-
-    def nvim_io_recover(self, io: NvimIORecover[A]) -> NvimIO[B]:
-        '''calls `map` to shift the recover execution to flat_map_nvim_io
-        '''
-        return eval_step(self.vim)(io.map(lambda a: a))
+def execute_nvim_request(vim: NvimApi, io: NvimIORequest[A]) -> Tuple[NvimApi, NvimIO[A]]:
+    params = io.params
+    hooked = request_hooks.enabled
+    start = request_hooks.now() if hooked else 0.
+    if tracer.enabled:
+        with span(io.method, 'nvim', sync=params.sync):
+            response = vim.request(io.method, io.args, params.sync, params.timeout)
+    else:
+        response = vim.request(io.method, io.args, params.sync, params.timeout)
+    if hooked:
+        request_hooks.report(io.method, io.args, response.map(lambda a: a[1]), start)
+    if response.is_right:
+        updated_vim, result = response.value
+        return updated_vim, NvimIOPure(Right(result))
+    return vim, NvimIOPure(response)
+
+
+def flat_map_nvim_io(fa: NvimIO[A], f: Callable[[A], NvimIO[B]]) -> NvimIO[B]:
+    '''failures short-circuit, every other variant is wrapped in a constant-time `NvimIOFlatMap`.
+    '''
+    return cast(NvimIO[B], fa) if type(fa) in (NvimIOError, NvimIOFatal) else NvimIOFlatMap(fa, f)
+
+
+def unwind(stack: list, result: NResult[A]) -> Optional[NvimIO[A]]:
+    '''drops continuations until a recover frame is found that accepts the failed `result`.
+    Returns `None` if the stack was exhausted.
+    '''
+    while stack:
+        frame = stack.pop()
+        if type(frame) is NvimIORecover and frame.recoverable(result):
+            return frame.recover(result)
+    return None
+
+
+def atomic_error(request: NvimIORequest[A], error: Any) -> Either[str, A]:
+    message = error[2] if isinstance(error, list) and len(error) == 3 else error
+    return Left(f'atomic call of `{request.method}` failed: {message}')
+
+
+def atomic_responses(requests: list, atomic: NvimIORequest[Any], response: Either[str, Any]) -> list:
+    '''distributes the result of an `nvim_call_atomic` to the requests it consists of.
+    nvim aborts the batch at the first failing call, so the requests following it are returned unchanged, to be sent
+    again in the next round.
+    '''
+    if response.is_left:
+        return [NvimIOPure(response) for r in requests]
+    if not atomic.params.sync:
+        return [NvimIOPure(Right(None)) for r in requests]
+    raw = response.value
+    if not (isinstance(raw, (list, tuple)) and len(raw) == 2):
+        return [NvimIOPure(Left(f'invalid result of atomic call: {raw}')) for r in requests]
+    results, error = raw
+    failed = min(len(results), len(requests))
+    return (
+        [NvimIOPure(Right(result)) for result in results[:failed]] +
+        [NvimIOPure(atomic_error(request, error)) for request in requests[failed:failed + 1]] +
+        requests[failed + 1:]
+    )
+
+
+def send_atomic(vim: NvimApi, requests: list, sync: bool) -> Tuple[NvimApi, list]:
+    atomic: NvimIORequest[Any] = NvimIORequest(
+        'nvim_call_atomic',
+        List([[request.method, list(request.args)] for request in requests]),
+        NRParams.cons(sync=sync, timeout=max(request.params.timeout for request in requests), decode=False),
+    )
+    vim, response = execute_nvim_request(vim, atomic)
+    return vim, atomic_responses(requests, atomic, response.value)
+
+
+def report_write_errors(writes: list, responses: list) -> None:
+    '''logs the buffered writes that couldn't be sent, naming the offending call.
+    '''
+    for write, response in zip(writes, responses):
+        if response.value.is_left:
+            args = ', '.join(map(str, write.args))
+            log.error(f'buffered write `{write.method}({args})` failed: {response.value.value}')
+
+
+def execute_nvim_requests(vim: NvimApi, requests: list) -> Tuple[NvimApi, list]:
+    '''executes `requests` in one round trip, after sending the buffered writes.
+    '''
+    if write_buffer.writes:
+        vim = flush_writes(vim)
+    if not requests:
+        return vim, []
+    elif len(requests) == 1:
+        vim, response = execute_nvim_request(vim, requests[0])
+        return vim, [response]
+    return send_atomic(vim, requests, any(request.params.sync for request in requests))
+
+
+def flush_writes(vim: NvimApi) -> NvimApi:
+    '''sends the buffered writes without waiting for nvim, a single write as a plain notification, multiple writes as
+    an asynchronous `nvim_call_atomic`.
+    nvim processes messages in order, so the writes are executed before any request that is sent afterwards.
+    Errors of the calls are reported by nvim like those of other notifications.
+    '''
+    writes = write_buffer.take()
+    if len(writes) == 1:
+        vim, response = execute_nvim_request(vim, writes[0])
+        responses = [response]
+    elif writes:
+        vim, responses = send_atomic(vim, writes, False)
+    else:
+        responses = []
+    report_write_errors(writes, responses)
+    return vim
+
+
+def interpret_par(vim: NvimApi, ios: List[NvimIO[A]]) -> Tuple[NvimApi, NvimIO[List[NResult[A]]]]:
+    '''advances all branches to their next request and executes the requests in one batch until every branch has
+    terminated.
+    The number of round trips is determined by the longest chain of dependent requests in a branch.
+    '''
+    branches = [[io, []] for io in ios]
+    results: list = [None] * len(branches)
+    active = list(range(len(branches)))
+    while active:
+        pending = []
+        for index in active:
+            current, stack = branches[index]
+            vim, step = advance_nvim_io(vim, current, stack, True)
+            while type(step) is NvimIOPar:
+                vim, nested = interpret_par(vim, step.ios)
+                vim, step = advance_nvim_io(vim, nested, stack, True)
+            if type(step) is NvimIORequest:
+                pending.append((index, step))
+            else:
+                results[index] = step
+        if not pending:
+            break
+        vim, responses = execute_nvim_requests(vim, [request for index, request in pending])
+        active = []
+        for (index, request), response in zip(pending, responses):
+            branches[index][0] = response
+            active.append(index)
+    return vim, NvimIOPure(Lists.wrap(results))
+
+
+write_response: NvimIO[Either[str, None]] = NvimIOPure(Right(None))
+
+
+def advance_nvim_io(vim: NvimApi, io: NvimIO[A], stack: list, batch: bool
+                    ) -> Tuple[NvimApi, Union[NvimIORequest[Any], NResult[A]]]:
+    '''evaluates `io` in a loop, using an explicit stack of continuations.
+    The stack contains the kleisli functions of binds and `NvimIORecover` nodes, whose handlers are consulted when a
+    result reaches them.
+    Variants are dispatched on their exact type, ordered by frequency.
+    Exceptions raised by thunks and continuations are converted to `NFatal` and handled like other failures.
+    If `batch` is true, the loop is suspended at the first request or `NvimIOPar`, which is returned instead of being
+    executed; the computation is resumed by calling this function with the response and the same `stack`.
+    Otherwise, requests with `sync=False` are added to the write buffer and answered with `None` immediately, unless
+    their method is in `unbuffered_methods`.
+    The buffer is flushed before any other request is sent and before a thunk is evaluated, since the thunk may run a
+    nested program with a different api.
+    If request hooks are registered, the frame of each evaluated thunk is recorded as the location of the following
+    requests.
+    '''
+    push = stack.append
+    pop = stack.pop
+    writes = write_buffer.writes
+    buffered = WriteBuffer.enabled
+    hooked = request_hooks.enabled
+    current = io
+    while True:
+        try:
+            tpe = type(current)
+            if tpe is NvimIOFlatMap:
+                push(current.kleisli)
+                current = current.io
+                continue
+            elif tpe is NvimIOPure:
+                if not stack:
+                    return vim, NSuccess(current.value)
+                frame = pop()
+                if type(frame) is NvimIORecover:
+                    result = NSuccess(current.value)
+                    current = frame.recover(result) if frame.recoverable(result) else current
+                else:
+                    current = frame(current.value)
+                continue
+            elif tpe is NvimIORequest:
+                if batch:
+                    return vim, current
+                elif buffered and not current.params.sync and current.method not in unbuffered_methods:
+                    writes.append(current)
+                    current = write_response
+                else:
+                    if writes:
+                        vim = flush_writes(vim)
+                    vim, current = execute_nvim_request(vim, current)
+                continue
+            elif tpe is NvimIOSuspend:
+                if writes:
+                    vim = flush_writes(vim)
+                if hooked:
+                    request_hooks.set_frame(current.thunk.frame)
+                vim, current = eval_thunk(vim, current.thunk)
+                continue
+            elif tpe is NvimIOBind:
+                if writes:
+                    vim = flush_writes(vim)
+                if hooked:
+                    request_hooks.set_frame(current.thunk.frame)
+                vim, next = eval_thunk(vim, current.thunk)
+                push(current.kleisli)
+                current = next
+                continue
+            elif tpe is NvimIORecover:
+                push(current)
+                current = current.io
+                continue
+            elif tpe is NvimIOPar:
+                if batch:
+                    return vim, current
+                vim, current = interpret_par(vim, current.ios)
+                continue
+            elif tpe is NvimIOError:
+                failure = NError(current.error)
+            elif tpe is NvimIOFatal:
+                failure = NFatal(current.exception)
+            else:
+                failure = NFatal(Exception(f'invalid NvimIO: {current}'))
+        except NvimIOException as e:
+            failure = NFatal(e)
+        except Exception as e:
+            failure = NFatal(NvimIOException('', Nil, e, None))
+        try:
+            recovered = unwind(stack, failure)
+        except Exception as e:
+            recovered = NvimIOFatal(NvimIOException('', Nil, e, None))
+        if recovered is None:
+            return vim, failure
+        current = recovered
+
+
+def interpret_nvim_io(io: NvimIO[A], vim: NvimApi) -> Tuple[NvimApi, NResult[A]]:
+    '''runs `io` to completion and flushes the write buffer.
+    '''
+    updated_vim, result = advance_nvim_io(vim, io, [], False)
+    if write_buffer.writes:
+        try:
+            updated_vim = flush_writes(updated_vim)
+        except Exception as e:
+            log.error(f'flushing buffered writes failed: {e}')
+    return updated_vim, cast(NResult[A], result)
 
 
 @do(State[NvimApi, A])
 def eval_nvim_io(io: NvimIO[A]) -> Do:
     vim = yield State.get()
-    updated_vim, result = eval_step(vim)(io).eval()
+    updated_vim, result = interpret_nvim_io(io, vim)
     yield State.set(updated_vim)
     return result
 
@@ -1,23 +1,34 @@
-from typing import TypeVar, Callable, Any
+from typing import TypeVar, Callable, Any, Iterable
 
-from amino import Either, Boolean, do, Do
-from amino.state import State
+from amino import Either, Boolean, do, Do, List, Lists
 from amino.boolean import true
 
 from ribosome.nvim.api.data import NvimApi
-from ribosome.nvim.io.compute import NvimIOSuspend, NvimIOPure, NvimIOError, NvimIO, NvimIORecover, lift_n_result
-from ribosome.nvim.io.data import NError, NFatal, NResult
+from ribosome.nvim.io.compute import (NvimIOSuspend, NvimIOPure, NvimIOError, NvimIO, NvimIORecover, lift_n_result,
+                                      NvimIOPar, NvimIOFatal, flush_writes)
+from ribosome.nvim.io.data import NError, NFatal, NResult, Thunk
 
 A = TypeVar('A')
 B = TypeVar('B')
 
 
+def nvimio_suspend_from(depth: int, f: Callable[..., NvimIO[A]], *a: Any, **kw: Any) -> NvimIO[A]:
+    '''`depth` is the number of frames between the caller of this function and the call site that is captured for
+    error reports.
+    '''
+    return NvimIOSuspend(Thunk.cons(lambda vim: (vim, f(vim, *a, **kw)), depth=depth + 1))
+
+
+def nvimio_delay_from(depth: int, f: Callable[..., A], *a: Any, **kw: Any) -> NvimIO[A]:
+    return NvimIOSuspend(Thunk.cons(lambda vim: (vim, NvimIOPure(f(vim, *a, **kw))), depth=depth + 1))
+
+
 def nvimio_suspend(f: Callable[..., NvimIO[A]], *a: Any, **kw: Any) -> NvimIO[A]:
-    return NvimIOSuspend.cons(State.inspect(lambda vim: f(vim, *a, **kw)))
+    return nvimio_suspend_from(1, f, *a, **kw)
 
 
 def nvimio_delay(f: Callable[..., A], *a: Any, **kw: Any) -> NvimIO[A]:
-    return nvimio_suspend(lambda vim: NvimIOPure(f(vim, *a, **kw)))
+    return nvimio_delay_from(1, f, *a, **kw)
 
 
 def nvimio_recover_error(fa: NvimIO[A], f: Callable[[NResult[A]], NvimIO[A]]) -> NvimIO[A]:
@@ -46,12 +57,56 @@ def nvimio_ensure(fa: NvimIO[A], f: Callable[[NResult[A]], NvimIO[None]], pred:
 
 
 def nvimio_wrap_either(f: Callable[[NvimApi], Either[B, A]]) -> NvimIO[A]:
-    return nvimio_suspend(lambda v: f(v).cata(NvimIOError, NvimIOPure))
+    return nvimio_suspend_from(1, lambda v: f(v).cata(NvimIOError, NvimIOPure))
 
 
 def nvimio_from_either(e: Either[str, A]) -> NvimIO[A]:
     return e.cata(NvimIOError, NvimIOPure)
 
 
+def nvimio_par_results(results: List[NResult[A]]) -> NvimIO[List[A]]:
+    '''fails with the first fatal error, or with the combined errors of all failed branches, prefixed with the branch
+    index.
+    '''
+    fatal = results.find(Boolean.is_a(NFatal))
+    errors = results.with_index.filter(lambda a: isinstance(a[1], NError))
+    return (
+        fatal.map(lambda a: NvimIOFatal(a.exception))
+        .get_or(
+            lambda: NvimIOError(errors.map2(lambda i, a: f'branch {i}: {a.error}').join_comma)
+            if errors else
+            NvimIOPure(results.map(lambda a: a.value))
+        )
+    )
+
+
+def nvimio_par(ios: List[NvimIO[A]]) -> NvimIO[List[A]]:
+    return NvimIOPar(ios).flat_map(nvimio_par_results)
+
+
+def nvimio_traverse(items: Iterable[A], f: Callable[[A], NvimIO[B]]) -> NvimIO[List[B]]:
+    '''evaluates `f` for one element at a time, binding the continuation for the next element only when the previous
+    one is done, so the interpreter's stack stays constant and no intermediate lists are created.
+    The results are accumulated in a list that is created anew for every run.
+    '''
+    def run(vim: NvimApi) -> NvimIO[List[B]]:
+        results: list = []
+        iterator = iter(items)
+        def step(b: B) -> NvimIO[List[B]]:
+            results.append(b)
+            return advance()
+        def advance() -> NvimIO[List[B]]:
+            for a in iterator:
+                return f(a).flat_map(step)
+            return NvimIOPure(Lists.wrap(results))
+        return advance()
+    return nvimio_suspend_from(1, run)
+
+
+def nvimio_flush() -> NvimIO[None]:
+    return NvimIOSuspend(Thunk.cons(lambda vim: (flush_writes(vim), NvimIOPure(None)), depth=1))
+
+
 __all__ = ('nvimio_delay', 'nvimio_wrap_either', 'nvimio_from_either', 'nvimio_suspend', 'nvimio_recover_error',
-           'nvimio_recover_fatal', 'nvimio_recover_failure', 'nvimio_ensure', 'nvimio_intercept')
+           'nvimio_recover_fatal', 'nvimio_recover_failure', 'nvimio_ensure', 'nvimio_intercept', 'nvimio_par',
+           'nvimio_flush', 'nvimio_traverse', 'nvimio_suspend_from', 'nvimio_delay_from',)
@@ -1,12 +1,12 @@
 import abc
-from typing import Generic, TypeVar, Tuple
+from typing import Generic, TypeVar, Tuple, Union, Callable
 from traceback import FrameSummary
 
 from amino import ADT, Either, Right, Left, Dat, Nil
-from amino.util.trace import cframe
-from amino.state import State
+from amino.state import State, StateT
 
 from ribosome.nvim.io.trace import NvimIOException
+from ribosome.nvim.io.frame import frame_capture
 
 A = TypeVar('A')
 B = TypeVar('B')
@@ -49,20 +49,27 @@ class NFatal(Generic[A], NResult[A]):
         return Left(self.exception)
 
 
+ThunkF = Union[State[A, B], Callable[[A], Tuple[A, B]]]
+
+
 class Thunk(Generic[A, B], Dat['Thunk[A, B]']):
+    '''`thunk` is either a `State` or a plain function returning the updated resource and the result, which avoids
+    the allocations of the `State` machinery.
+    '''
 
     @staticmethod
-    def cons(thunk: State[A, B], frame: FrameSummary=None) -> 'Thunk[A, B]':
-        return Thunk(thunk, frame or cframe())
+    def cons(thunk: ThunkF, frame: FrameSummary=None, depth: int=0) -> 'Thunk[A, B]':
+        return Thunk(thunk, frame or frame_capture.capture(depth))
 
-    def __init__(self, thunk: State[A, B], frame: FrameSummary) -> None:
+    def __init__(self, thunk: ThunkF, frame: FrameSummary) -> None:
         self.thunk = thunk
         self.frame = frame
 
 
 def eval_thunk(resource: A, thunk: Thunk[A, B]) -> Tuple[A, B]:
+    f = thunk.thunk
     try:
-        return thunk.thunk.run(resource).value
+        return f.run(resource).value if isinstance(f, StateT) else f(resource)
     except NvimIOException as e:
         raise e
     except Exception as e:
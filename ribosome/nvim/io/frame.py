@@ -0,0 +1,77 @@
+'''capturing of the call site of `Thunk`s, used for error reports when a thunk raises an exception.
+The level is determined by `$RIBOSOME_THUNK_FRAMES`:
+* `off` disables capturing.
+* `code` stores only the code object, line number and globals of the frame that called the `NvimIO` constructor, so
+  no frames are kept alive. Constructors pass the number of their own frames to skip, so no frames need to be
+  inspected to locate the call site.
+* `full` stores the current frame object, which allows complete call site reports, but retains all locals of the stack.
+The default is `full` in spec and debug mode and `code` otherwise.
+'''
+import sys
+from types import CodeType
+from typing import Optional, Any, Callable
+
+from amino import options as amino_options
+
+from ribosome import options
+
+
+class CodeFrame:
+    '''provides the attributes of a frame that are used by `amino.util.trace.callsite_info`.
+    '''
+    __slots__ = ('f_code', 'f_lineno', 'f_globals',)
+    f_back = None
+
+    def __init__(self, f_code: CodeType, f_lineno: int, f_globals: dict) -> None:
+        self.f_code = f_code
+        self.f_lineno = f_lineno
+        self.f_globals = f_globals
+
+    def __repr__(self) -> str:
+        return f'CodeFrame({self.f_code.co_filename}:{self.f_lineno})'
+
+
+def capture_none(depth: int) -> None:
+    return None
+
+
+def capture_code(depth: int) -> Optional[CodeFrame]:
+    '''`depth` is the number of frames above the caller of `Thunk.cons`.
+    '''
+    try:
+        frame = sys._getframe(depth + 2)
+    except ValueError:
+        return None
+    return CodeFrame(frame.f_code, frame.f_lineno, frame.f_globals)
+
+
+def capture_full(depth: int) -> Any:
+    return sys._getframe(1)
+
+
+captures = dict(
+    off=capture_none,
+    code=capture_code,
+    full=capture_full,
+)
+
+
+def default_level() -> str:
+    debug = options.spec.exists or options.development.exists or amino_options.io_debug.exists
+    return options.thunk_frames.value.filter(captures.__contains__) | ('full' if debug else 'code')
+
+
+class FrameCapture:
+
+    def __init__(self, level: str) -> None:
+        self.set(level)
+
+    def set(self, level: str) -> None:
+        self.level = level
+        self.capture: Callable[[int], Any] = captures.get(level, capture_code)
+
+
+frame_capture = FrameCapture(default_level())
+
+
+__all__ = ('CodeFrame', 'FrameCapture', 'frame_capture',)
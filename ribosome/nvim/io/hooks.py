@@ -0,0 +1,203 @@
+'''hooks that are called with the timing of every request sent to nvim.
+Hooks can be added and removed at any time, for example with the internal programs `enable_request_stats` and
+`disable_request_stats`; while none is registered, the interpreter skips the measurements.
+Each report contains the name of the program that issued the request and the location of the thunk that was evaluated
+last before it, which is the closest call site available in a lazily evaluated program.
+'''
+import time
+import threading
+from typing import Callable, Any, Tuple, Optional
+
+import msgpack
+
+from amino import Dat, Maybe, List, Lists, Either
+from amino.logging import module_log
+
+log = module_log()
+
+
+class RequestTiming(Dat['RequestTiming']):
+
+    def __init__(
+            self,
+            method: str,
+            args_size: int,
+            response_size: int,
+            duration: float,
+            program: Maybe[str],
+            location: Maybe[str],
+    ) -> None:
+        self.method = method
+        self.args_size = args_size
+        self.response_size = response_size
+        self.duration = duration
+        self.program = program
+        self.location = location
+
+
+RequestHook = Callable[[RequestTiming], None]
+
+
+def payload_size(data: Any) -> int:
+    '''the size of the msgpack encoding of `data`, which approximates the number of bytes on the wire.
+    '''
+    try:
+        return len(msgpack.packb(data, use_bin_type=True))
+    except Exception:
+        return len(str(data))
+
+
+def frame_location(frame: Any) -> Maybe[str]:
+    code = getattr(frame, 'f_code', None)
+    return Maybe.optional(code).map(lambda a: f'{a.co_filename}:{frame.f_lineno}')
+
+
+class RequestHooks:
+    '''the registered hooks are stored in a tuple that is replaced on every change, so that the interpreter can iterate
+    it without locking.
+    The current program and the frame of the last evaluated thunk are stored thread-locally.
+    '''
+
+    def __init__(self) -> None:
+        self.hooks: Tuple[RequestHook, ...] = ()
+        self.lock = threading.Lock()
+        self.local = threading.local()
+
+    @property
+    def enabled(self) -> bool:
+        return len(self.hooks) > 0
+
+    def add(self, hook: RequestHook) -> None:
+        with self.lock:
+            if hook not in self.hooks:
+                self.hooks = self.hooks + (hook,)
+
+    def remove(self, hook: RequestHook) -> None:
+        with self.lock:
+            self.hooks = tuple(a for a in self.hooks if a is not hook)
+
+    @property
+    def program(self) -> Optional[str]:
+        return getattr(self.local, 'program', None)
+
+    def set_program(self, name: Optional[str]) -> None:
+        self.local.program = name
+
+    def set_frame(self, frame: Any) -> None:
+        self.local.frame = frame
+
+    @property
+    def context(self) -> Tuple[Optional[str], Any]:
+        '''the current thread's program and frame, for reporting a request that is executed in another thread.
+        '''
+        return self.program, getattr(self.local, 'frame', None)
+
+    def now(self) -> float:
+        return time.perf_counter()
+
+    def report(self, method: str, args: List[Any], response: Either[str, Any], start: float,
+               context: Tuple[Optional[str], Any]=None) -> None:
+        duration = self.now() - start
+        program, frame = self.context if context is None else context
+        timing = RequestTiming(
+            method,
+            payload_size(list(args)),
+            payload_size(response.value),
+            duration,
+            Maybe.optional(program),
+            frame_location(frame),
+        )
+        for hook in self.hooks:
+            try:
+                hook(timing)
+            except Exception as e:
+                log.error(f'request hook {hook} failed: {e}')
+
+
+request_hooks = RequestHooks()
+
+
+class CallStats(Dat['CallStats']):
+
+    def __init__(self, method: str, count: int, duration: float, max: float, args_size: int, response_size: int
+                 ) -> None:
+        self.method = method
+        self.count = count
+        self.duration = duration
+        self.max = max
+        self.args_size = args_size
+        self.response_size = response_size
+
+
+class RequestStats:
+    '''a hook that accumulates the number, duration and payload sizes of the requests per method.
+    '''
+
+    def __init__(self) -> None:
+        self.calls: dict = dict()
+        self.lock = threading.Lock()
+
+    def __call__(self, timing: RequestTiming) -> None:
+        with self.lock:
+            count, duration, max_duration, args_size, response_size = self.calls.get(timing.method, (0, 0., 0., 0, 0))
+            self.calls[timing.method] = (
+                count + 1,
+                duration + timing.duration,
+                max(max_duration, timing.duration),
+                args_size + timing.args_size,
+                response_size + timing.response_size,
+            )
+
+    def top(self, count: int) -> List[CallStats]:
+        with self.lock:
+            calls = list(self.calls.items())
+        return (
+            Lists.wrap(calls)
+            .map(lambda a: CallStats(a[0], *a[1]))
+            .sort_by(lambda a: a.duration)
+            .reversed
+            .take(count)
+        )
+
+    def clear(self) -> None:
+        with self.lock:
+            self.calls.clear()
+
+
+class SlowRequestLog:
+    '''a hook that logs requests taking longer than `threshold` seconds.
+    '''
+
+    def __init__(self, threshold: float) -> None:
+        self.threshold = threshold
+
+    def __call__(self, timing: RequestTiming) -> None:
+        if timing.duration >= self.threshold:
+            program = timing.program.map(lambda a: f' in `{a}`').get_or_strict('')
+            location = timing.location.map(lambda a: f' after {a}').get_or_strict('')
+            log.warning(f'slow nvim request `{timing.method}`{program}: {timing.duration * 1e3:.1f}ms{location}')
+
+
+call_stats = RequestStats()
+slow_request_log = SlowRequestLog(0.)
+
+
+def start_request_stats(slow: float) -> None:
+    '''collects `call_stats` and, if `slow` is positive, logs requests taking longer than `slow` seconds.
+    '''
+    request_hooks.add(call_stats)
+    slow_request_log.threshold = slow
+    if slow > 0:
+        request_hooks.add(slow_request_log)
+    else:
+        request_hooks.remove(slow_request_log)
+
+
+def stop_request_stats() -> None:
+    request_hooks.remove(call_stats)
+    request_hooks.remove(slow_request_log)
+    call_stats.clear()
+
+
+__all__ = ('RequestTiming', 'RequestHooks', 'request_hooks', 'RequestStats', 'SlowRequestLog', 'CallStats',
+           'call_stats', 'start_request_stats', 'stop_request_stats',)
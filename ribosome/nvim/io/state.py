@@ -1,4 +1,10 @@
-from typing import Generic, TypeVar, Callable, Tuple, cast, Type, Any
+'''`NvimIOState` programs are trees of state operations that are evaluated by `advance_nvim_io_state`.
+The interpreter threads the state directly through a single loop with an explicit stack of continuations, so that
+`inspect`, `modify`, `zoom` and binds don't allocate intermediate `NvimIO` nodes and result tuples.
+Only effectful operations (`lift`, `apply`) hand control back to the `NvimIO` interpreter, which resumes the loop with
+their result.
+'''
+from typing import Generic, TypeVar, Callable, Tuple, cast, Type, Any, Iterable
 
 from lenses import UnboundLens
 
@@ -6,16 +12,17 @@ from amino.tc.base import ImplicitsMeta, Implicits
 from amino.tc.monad import Monad
 from amino.tc.zip import Zip
 from amino.instances.list import ListTraverse
-from amino import List, curried
+from amino import List, Lists
 from amino.util.string import ToStr
 from amino.state.base import StateT
-from ribosome.nvim.io.compute import NvimIO
+from ribosome.nvim.io.compute import NvimIO, NvimIOPure, NvimIOFlatMap
 
 import abc
 from amino.tc.base import TypeClass, tc_prop
 from amino.state import State, EitherState
 from ribosome.nvim.api.data import NvimApi
 from ribosome.nvim.io.api import N
+from ribosome.nvim.io.cons import nvimio_delay_from, nvimio_suspend_from
 from amino import IO, Maybe, Either
 from amino.func import CallByName
 E = TypeVar('E')
@@ -27,157 +34,136 @@ R = TypeVar('R')
 ST1 = TypeVar('ST1')
 
 
-monad: Monad = cast(Monad, Monad.fatal(NvimIO))
-
-
 class NvimIOStateCtor(Generic[S]):
 
     def inspect(self, f: Callable[[S], A]) -> 'NvimIOState[S, A]':
-        def g(s: S) -> NvimIO[Tuple[S, A]]:
-            return monad.pure((s, f(s)))
-        return NvimIOState.apply(g)
+        return NvimIOState.inspect(f)
 
     def inspect_f(self, f: Callable[[S], NvimIO[A]]) -> 'NvimIOState[S, A]':
-        def g(s: S) -> NvimIO[Tuple[S, A]]:
-            return f(s).map(lambda a: (s, a))
-        return NvimIOState.apply(g)
+        return NvimIOState.inspect_f(f)
 
     def pure(self, a: A) -> 'NvimIOState[S, A]':
-        return NvimIOState.apply(lambda s: monad.pure((s, a)))
-
-    def delay(self, fa: Callable[..., A], *a: Any, **kw: Any) -> 'NvimIOState[S, A]':
-        return NvimIOState.apply(lambda s: monad.pure((s, fa(*a, **kw))))
+        return NvimIOState.pure(a)
 
     def lift(self, fa: NvimIO[A]) -> 'NvimIOState[S, A]':
-        def g(s: S) -> NvimIO[Tuple[S, A]]:
-            return fa.map(lambda a: (s, a))
-        return NvimIOState.apply(g)
+        return NvimIOState.lift(fa)
 
     def modify(self, f: Callable[[S], S]) -> 'NvimIOState[S, None]':
-        return NvimIOState.apply(lambda s: monad.pure((f(s), None)))
+        return NvimIOState.modify(f)
 
     def modify_f(self, f: Callable[[S], NvimIO[S]]) -> 'NvimIOState[S, None]':
-        return NvimIOState.apply(lambda s: f(s).map(lambda a: (a, None)))
+        return NvimIOState.modify_f(f)
 
     def get(self) -> 'NvimIOState[S, S]':
-        return self.inspect(lambda a: a)
+        return NvimIOState.get()
 
     @property
     def unit(self) -> 'NvimIOState[S, None]':
-        return NvimIOState.pure(None)
+        return NvimIOState.unit
 
     def io(self, f: Callable[[NvimApi], A]) -> 'NvimIOState[S, A]':
-        return NvimIOState.lift(N.delay(f))
+        return NvimIOState.io(f)
 
     def delay(self, f: Callable[[NvimApi], A]) -> 'NvimIOState[S, A]':
-        return NvimIOState.lift(N.delay(f))
+        return NvimIOState.delay(f)
 
     def suspend(self, f: Callable[[NvimApi], NvimIO[A]]) -> 'NvimIOState[S, A]':
-        return NvimIOState.lift(N.suspend(f))
+        return NvimIOState.suspend(f)
 
     def from_io(self, io: IO[A]) -> 'NvimIOState[S, A]':
-        return NvimIOState.lift(N.wrap_either(lambda v: io.attempt))
+        return NvimIOState.from_io(io)
 
     def from_id(self, st: State[S, A]) -> 'NvimIOState[S, A]':
-        return st.transform_f(NvimIOState, lambda s: N.pure(s.value))
+        return NvimIOState.from_id(st)
 
     def from_maybe(self, a: Maybe[B], err: CallByName) -> 'NvimIOState[S, B]':
-        return NvimIOState.lift(N.from_maybe(a, err))
+        return NvimIOState.from_maybe(a, err)
 
     m = from_maybe
 
     def from_either(self, e: Either[str, A]) -> 'NvimIOState[S, A]':
-        return NvimIOState.lift(N.from_either(e))
+        return NvimIOState.from_either(e)
 
     e = from_either
 
     def from_either_state(self, st: EitherState[E, S, A]) -> 'NvimIOState[S, A]':
-        return st.transform_f(NvimIOState, lambda s: N.from_either(s))
+        return NvimIOState.from_either_state(st)
 
     def failed(self, e: str) -> 'NvimIOState[S, A]':
-        return NvimIOState.lift(N.failed(e))
+        return NvimIOState.failed(e)
 
     def error(self, e: str) -> 'NvimIOState[S, A]':
-        return NvimIOState.lift(N.error(e))
+        return NvimIOState.error(e)
 
     def inspect_maybe(self, f: Callable[[S], Maybe[A]], err: CallByName) -> 'NvimIOState[S, A]':
-        return NvimIOState.inspect_f(lambda s: N.from_maybe(f(s), err))
+        return NvimIOState.inspect_maybe(f, err)
 
     def inspect_either(self, f: Callable[[S], Either[str, A]]) -> 'NvimIOState[S, A]':
-        return NvimIOState.inspect_f(lambda s: N.from_either(f(s)))
+        return NvimIOState.inspect_either(f)
 
     def simple(self, f: Callable[..., A], *a: Any, **kw: Any) -> 'NvimIOState[S, A]':
-        return NS.lift(N.simple(f, *a, **kw))
+        return NvimIOState.simple(f, *a, **kw)
 
     def sleep(self, duration: float) -> 'NvimIOState[S, None]':
-        return NS.lift(N.sleep(duration))
+        return NvimIOState.sleep(duration)
 
 
 class NvimIOStateMeta(ImplicitsMeta):
 
     def cons(self, run_f: NvimIO[Callable[[S], NvimIO[Tuple[S, A]]]]) -> 'NvimIOState[S, A]':
-        return self(run_f)
+        return self.apply_f(run_f)
 
     def apply(self, f: Callable[[S], NvimIO[Tuple[S, A]]]) -> 'NvimIOState[S, A]':
-        return self.cons(monad.pure(f))
+        return NSApply(f)
 
     def apply_f(self, run_f: NvimIO[Callable[[S], NvimIO[Tuple[S, A]]]]) -> 'NvimIOState[S, A]':
-        return self.cons(run_f)
+        return NSFlatMap(NSLift(run_f), NSApply)
 
     def inspect(self, f: Callable[[S], A]) -> 'NvimIOState[S, A]':
-        def g(s: S) -> NvimIO[Tuple[S, A]]:
-            return monad.pure((s, f(s)))
-        return self.apply(g)
+        return NSInspect(f)
 
     def inspect_f(self, f: Callable[[S], NvimIO[A]]) -> 'NvimIOState[S, A]':
-        def g(s: S) -> NvimIO[Tuple[S, A]]:
-            return f(s).map(lambda a: (s, a))
-        return self.apply(g)
+        return NSInspectF(f)
 
     def pure(self, a: A) -> 'NvimIOState[S, A]':
-        return self.apply(lambda s: monad.pure((s, a)))
+        return NSPure(a)
 
     def reset(self, s: S, a: A) -> 'NvimIOState[S, A]':
-        return self.apply(lambda _: monad.pure((s, a)))
+        return NSFlatMap(NSModify(lambda _: s), lambda _: NSPure(a))
 
     def reset_t(self, t: Tuple[S, A]) -> 'NvimIOState[S, A]':
-        return self.apply(lambda _: monad.pure(t))
-
-    def delay(self, fa: Callable[..., A], *a: Any, **kw: Any) -> 'NvimIOState[S, A]':
-        return self.apply(lambda s: monad.pure((s, fa(*a, **kw))))
+        return self.reset(*t)
 
     def lift(self, fa: NvimIO[A]) -> 'NvimIOState[S, A]':
-        def g(s: S) -> NvimIO[Tuple[S, A]]:
-            return fa.map(lambda a: (s, a))
-        return self.apply(g)
+        return NSLift(fa)
 
     def modify(self, f: Callable[[S], S]) -> 'NvimIOState[S, None]':
-        return self.apply(lambda s: monad.pure((f(s), None)))
+        return NSModify(f)
 
     def modify_f(self, f: Callable[[S], NvimIO[S]]) -> 'NvimIOState[S, None]':
-        return self.apply(lambda s: f(s).map(lambda a: (a, None)))
+        return NSApply(lambda s: f(s).map(lambda a: (a, None)))
 
     def set(self, s: S) -> 'NvimIOState[S, None]':
-        return self.modify(lambda s0: s)
+        return NSModify(lambda s0: s)
 
     def get(self) -> 'NvimIOState[S, S]':
-        return self.inspect(lambda a: a)
+        return NSInspect(lambda a: a)
 
     @property
     def unit(self) -> 'NvimIOState[S, None]':
-        return NvimIOState.pure(None)
+        return ns_unit
 
     def s(self, tpe: Type[S]) -> NvimIOStateCtor[S]:
         return NvimIOStateCtor()
 
     def io(self, f: Callable[[NvimApi], A]) -> 'NvimIOState[S, A]':
-        return NvimIOState.lift(N.delay(f))
+        return NvimIOState.lift(nvimio_delay_from(1, f))
 
     def delay(self, f: Callable[[NvimApi], A]) -> 'NvimIOState[S, A]':
-        return NvimIOState.lift(N.delay(f))
+        return NvimIOState.lift(nvimio_delay_from(1, f))
 
     def suspend(self, f: Callable[[NvimApi], NvimIO[A]]) -> 'NvimIOState[S, A]':
-        return NvimIOState.lift(N.suspend(f))
+        return NvimIOState.lift(nvimio_suspend_from(1, f))
 
     def from_io(self, io: IO[A]) -> 'NvimIOState[S, A]':
         return NvimIOState.lift(N.wrap_either(lambda v: io.attempt))
@@ -211,23 +197,48 @@ class NvimIOStateMeta(ImplicitsMeta):
         return NvimIOState.inspect_f(lambda s: N.from_either(f(s)))
 
     def simple(self, f: Callable[..., A], *a: Any, **kw: Any) -> 'NvimIOState[S, A]':
-        return NS.lift(N.simple(f, *a, **kw))
+        return NS.lift(nvimio_delay_from(1, lambda v: f(*a, **kw)))
 
     def sleep(self, duration: float) -> 'NvimIOState[S, None]':
         return NS.lift(N.sleep(duration))
 
+    def traverse(self, items: Iterable[B], f: Callable[[B], 'NvimIOState[S, A]']) -> 'NvimIOState[S, List[A]]':
+        '''like `N.traverse`, threading the state from one element to the next.
+        '''
+        def start(u: None) -> 'NvimIOState[S, List[A]]':
+            results: list = []
+            iterator = iter(items)
+            def step(a: A) -> 'NvimIOState[S, List[A]]':
+                results.append(a)
+                return advance()
+            def advance() -> 'NvimIOState[S, List[A]]':
+                for b in iterator:
+                    return NSFlatMap(f(b), step)
+                return NSPure(Lists.wrap(results))
+            return advance()
+        return NSFlatMap(ns_unit, start)
+
 
 class NvimIOState(Generic[S, A], StateT, ToStr, Implicits, implicits=True, auto=True, metaclass=NvimIOStateMeta):
 
-    def __init__(self, run_f: NvimIO[Callable[[S], NvimIO[Tuple[S, A]]]]) -> None:
-        self.run_f = run_f
+    def __new__(cls, *a: Any, **kw: Any) -> 'NvimIOState[S, A]':
+        '''bypasses the argument checks of `Generic.__new__`, since nodes are created for every operation.
+        '''
+        return object.__new__(cls)
 
     @property
     def cls(self) -> Type['NvimIOState[S, A]']:
-        return type(self)
+        return NvimIOState
+
+    @property
+    def run_f(self) -> NvimIO[Callable[[S], NvimIO[Tuple[S, A]]]]:
+        return NvimIOPure(self.run)
 
     def run(self, s: S) -> NvimIO[Tuple[S, A]]:
-        return self.run_f.flat_map(lambda f: f(s))
+        '''the loop is started by the `NvimIO` interpreter, so that exceptions raised by state functions are converted
+        to `NFatal`.
+        '''
+        return NvimIOFlatMap(NvimIOPure(s), lambda s0: advance_nvim_io_state(self, s0, None, [], False))
 
     def run_s(self, s: S) -> NvimIO[S]:
         return self.run(s).map(lambda a: a[0])
@@ -235,28 +246,14 @@ class NvimIOState(Generic[S, A], StateT, ToStr, Implicits, implicits=True, auto=
     def run_a(self, s: S) -> NvimIO[S]:
         return self.run(s).map(lambda a: a[1])
 
-    def _arg_desc(self) -> List[str]:
-        return List(str(self.run_f))
-
     def flat_map_f(self, f: Callable[[A], NvimIO[B]]) -> 'NvimIOState[S, B]':
-        def h(s: S, a: A) -> NvimIO[Tuple[S, B]]:
-            return f(a).map(lambda b: (s, b))
-        def g(fsa: NvimIO[Tuple[S, A]]) -> NvimIO[Tuple[S, B]]:
-            return fsa.flat_map2(h)
-        run_f1 = self.run_f.map(lambda sfsa: lambda a: g(sfsa(a)))
-        return self.cls.apply_f(run_f1)
+        return NSFlatMap(self, lambda a: NSLift(f(a)))
 
     def transform(self, f: Callable[[Tuple[S, A]], Tuple[S, B]]) -> 'NvimIOState[S, B]':
-        def g(fsa: NvimIO[Tuple[S, A]]) -> NvimIO[Tuple[S, B]]:
-            return fsa.map2(f)
-        run_f1 = self.run_f.map(lambda sfsa: lambda a: g(sfsa(a)))
-        return self.cls.apply_f(run_f1)
+        return NSTransform(self, f)
 
     def transform_s(self, f: Callable[[R], S], g: Callable[[R, S], R]) -> 'NvimIOState[R, A]':
-        def trans(sfsa: Callable[[S], NvimIO[Tuple[S, A]]], r: R) -> NvimIO[Tuple[R, A]]:
-            s = f(r)
-            return sfsa(s).map2(lambda s, a: (g(r, s), a))
-        return self.cls.apply_f(self.run_f.map(curried(trans)))
+        return NSTransformS(self, f, g)
 
     def transform_f(self, tpe: Type[ST1], f: Callable[[NvimIO[Tuple[S, A]]], Any]) -> ST1:
         def trans(s: S) -> Any:
@@ -274,37 +271,189 @@ class NvimIOState(Generic[S, A], StateT, ToStr, Implicits, implicits=True, auto=
     transform_s_lens_read = read_zoom
 
     def flat_map(self, f: Callable[[A], 'NvimIOState[S, B]']) -> 'NvimIOState[S, B]':
-        return Monad_NvimIOState.flat_map(self, f)
+        return NSFlatMap(self, f)
+
+
+class NSPure(Generic[S, A], NvimIOState[S, A]):
+
+    def __init__(self, value: A) -> None:
+        self.value = value
+
+    def _arg_desc(self) -> List[str]:
+        return List(str(self.value))
+
+
+class NSInspect(Generic[S, A], NvimIOState[S, A]):
+
+    def __init__(self, f: Callable[[S], A]) -> None:
+        self.f = f
+
+    def _arg_desc(self) -> List[str]:
+        return List(str(self.f))
+
+
+class NSModify(Generic[S], NvimIOState[S, None]):
+
+    def __init__(self, f: Callable[[S], S]) -> None:
+        self.f = f
+
+    def _arg_desc(self) -> List[str]:
+        return List(str(self.f))
 
 
-def run_function(s: NvimIOState[S, A]) -> NvimIO[Callable[[S], NvimIO[Tuple[S, A]]]]:
-    try:
-        return s.run_f
-    except Exception as e:
-        if not isinstance(s, NvimIOState):
-            raise TypeError(f'flatMapped {s} into NvimIOState')
-        else:
-            raise
+class NSLift(Generic[S, A], NvimIOState[S, A]):
+
+    def __init__(self, io: NvimIO[A]) -> None:
+        self.io = io
+
+    def _arg_desc(self) -> List[str]:
+        return List(str(self.io))
+
+
+class NSInspectF(Generic[S, A], NvimIOState[S, A]):
+
+    def __init__(self, f: Callable[[S], NvimIO[A]]) -> None:
+        self.f = f
+
+    def _arg_desc(self) -> List[str]:
+        return List(str(self.f))
+
+
+class NSApply(Generic[S, A], NvimIOState[S, A]):
+
+    def __init__(self, f: Callable[[S], NvimIO[Tuple[S, A]]]) -> None:
+        self.f = f
+
+    def _arg_desc(self) -> List[str]:
+        return List(str(self.f))
+
+
+class NSFlatMap(Generic[S, A, B], NvimIOState[S, B]):
+
+    def __init__(self, fa: NvimIOState[S, A], f: Callable[[A], NvimIOState[S, B]]) -> None:
+        self.fa = fa
+        self.f = f
+
+    def _arg_desc(self) -> List[str]:
+        return List(str(self.fa), str(self.f))
+
+
+class NSMap(Generic[S, A, B], NvimIOState[S, B]):
+
+    def __init__(self, fa: NvimIOState[S, A], f: Callable[[A], B]) -> None:
+        self.fa = fa
+        self.f = f
+
+    def _arg_desc(self) -> List[str]:
+        return List(str(self.fa), str(self.f))
+
+
+class NSTransform(Generic[S, A, B], NvimIOState[S, B]):
+
+    def __init__(self, fa: NvimIOState[S, A], f: Callable[[Tuple[S, A]], Tuple[S, B]]) -> None:
+        self.fa = fa
+        self.f = f
+
+    def _arg_desc(self) -> List[str]:
+        return List(str(self.fa), str(self.f))
+
+
+class NSTransformS(Generic[R, S, A], NvimIOState[R, A]):
+
+    def __init__(self, fa: NvimIOState[S, A], f: Callable[[R], S], g: Callable[[R, S], R]) -> None:
+        self.fa = fa
+        self.f = f
+        self.g = g
+
+    def _arg_desc(self) -> List[str]:
+        return List(str(self.fa), str(self.f), str(self.g))
+
+
+class RestoreState:
+    '''continuation of `NSTransformS` that converts the inner state back, using the outer state it was derived from.
+    '''
+    __slots__ = ('g', 'outer',)
+
+    def __init__(self, g: Callable[[R, S], R], outer: R) -> None:
+        self.g = g
+        self.outer = outer
+
+
+ns_unit: NvimIOState[Any, None] = NSPure(None)
+
+
+def advance_nvim_io_state(current: NvimIOState[S, Any], s: S, value: Any, stack: list, resume: bool
+                          ) -> NvimIO[Tuple[S, A]]:
+    '''evaluates `current` with the state `s` in a loop, using an explicit stack of continuations.
+    The stack contains bind, map and transformation nodes as well as `RestoreState` frames.
+    Pure `NvimIO`s are unwrapped in place.
+    When an operation needs to run any other `NvimIO`, it is returned with a continuation that calls this function with
+    its result, the current state and the same stack, with `resume` set, which causes the loop to start by passing
+    `value` to the topmost continuation.
+    The stack is shared by these continuations, which is safe because the `NvimIO` interpreter invokes each of them at
+    most once.
+    '''
+    push = stack.append
+    pop = stack.pop
+    while True:
+        if not resume:
+            tpe = type(current)
+            if tpe is NSFlatMap or tpe is NSMap or tpe is NSTransform:
+                push(current)
+                current = current.fa
+                continue
+            elif tpe is NSInspect:
+                value = current.f(s)
+            elif tpe is NSModify:
+                s = current.f(s)
+                value = None
+            elif tpe is NSPure:
+                value = current.value
+            elif tpe is NSTransformS:
+                push(RestoreState(current.g, s))
+                s = current.f(s)
+                current = current.fa
+                continue
+            elif tpe is NSLift or tpe is NSInspectF:
+                io = current.io if tpe is NSLift else current.f(s)
+                if type(io) is not NvimIOPure:
+                    return io.flat_map(lambda a: advance_nvim_io_state(None, s, a, stack, True))
+                value = io.value
+            elif tpe is NSApply:
+                return current.f(s).flat_map(lambda sa: advance_nvim_io_state(None, sa[0], sa[1], stack, True))
+            else:
+                raise TypeError(f'flatMapped {current} into NvimIOState')
+        resume = False
+        while True:
+            if not stack:
+                return NvimIOPure((s, value))
+            frame = pop()
+            tpe = type(frame)
+            if tpe is NSFlatMap:
+                current = frame.f(value)
+                break
+            elif tpe is NSMap:
+                value = frame.f(value)
+            elif tpe is RestoreState:
+                s = frame.g(frame.outer, s)
+            else:
+                s, value = frame.f((s, value))
 
 
 class NvimIOStateMonad(Monad, tpe=NvimIOState):
 
     def pure(self, a: A) -> NvimIOState[S, A]:  # type: ignore
-        return NvimIOState.pure(a)
+        return NSPure(a)
 
     def flat_map(  # type: ignore
             self,
             fa: NvimIOState[S, A],
             f: Callable[[A], NvimIOState[S, B]]
     ) -> NvimIOState[S, B]:
-        def h(s: S, a: A) -> NvimIO[Tuple[S, B]]:
-            return f(a).run(s)
-        def g(fsa: NvimIO[Tuple[S, A]]) -> NvimIO[Tuple[S, B]]:
-            return fsa.flat_map2(h)
-        def i(sfsa: Callable[[S], NvimIO[Tuple[S, A]]]) -> Callable[[S], NvimIO[Tuple[S, B]]]:
-            return lambda a: g(sfsa(a))
-        run_f1 = run_function(fa).map(i)
-        return NvimIOState.apply_f(run_f1)
+        return NSFlatMap(fa, f)
+
+    def map(self, fa: NvimIOState[S, A], f: Callable[[A], B]) -> NvimIOState[S, B]:  # type: ignore
+        return NSMap(fa, f)
 
 
 Monad_NvimIOState = NvimIOStateMonad()
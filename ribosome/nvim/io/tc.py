@@ -28,7 +28,7 @@ class NvimIOMonad(Monad):
         return NvimIOPure(a)
 
     def flat_map(self, fa: NvimIO[A], f: Callable[[A], NvimIO[B]]) -> NvimIO[B]:
-        return flat_map_nvim_io(f)(fa)
+        return flat_map_nvim_io(fa, f)
 
 
 class NvimIOMonoid(Monoid):
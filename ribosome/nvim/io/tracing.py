@@ -0,0 +1,41 @@
+from typing import Any, TypeVar, Tuple
+
+from amino import do, Do
+
+from ribosome.nvim.io.compute import NvimIO
+from ribosome.nvim.io.api import N
+from ribosome.nvim.io.state import NS
+from ribosome.tracing import tracer
+from ribosome.nvim.io.hooks import request_hooks
+
+A = TypeVar('A')
+S = TypeVar('S')
+
+
+def trace_nvim_io(name: str, cat: str, io: NvimIO[A], **args: Any) -> NvimIO[A]:
+    @do(NvimIO[A])
+    def traced() -> Do:
+        start = yield N.simple(tracer.now)
+        yield N.ensure(io, lambda r: N.simple(tracer.complete, name, cat, start, args))
+    return traced() if tracer.enabled else io
+
+
+def trace_ns(name: str, cat: str, st: NS[S, A], **args: Any) -> NS[S, A]:
+    return NS.apply(lambda s: trace_nvim_io(name, cat, st.run(s), **args)) if tracer.enabled else st
+
+
+def attach_program(name: str, st: NS[S, A]) -> NS[S, A]:
+    '''sets the program that is reported to the request hooks for the requests executed by `st`.
+    Whether hooks are registered is checked when the program is run, since programs may be built before.
+    '''
+    def run(s: S) -> NvimIO[Tuple[S, A]]:
+        @do(NvimIO[Tuple[S, A]])
+        def attached() -> Do:
+            previous = yield N.simple(lambda: request_hooks.program)
+            yield N.simple(request_hooks.set_program, name)
+            yield N.ensure(st.run(s), lambda r: N.simple(request_hooks.set_program, previous))
+        return attached() if request_hooks.enabled else st.run(s)
+    return NS.apply(run)
+
+
+__all__ = ('trace_nvim_io', 'trace_ns', 'attach_program',)
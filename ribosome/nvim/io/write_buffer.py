@@ -0,0 +1,35 @@
+'''buffer for requests with `sync=False`.
+Instead of sending each notification on its own, the interpreter collects them and sends them in one asynchronous
+`nvim_call_atomic` before the next request or thunk, or when the program terminates.
+The buffer is thread-local; since it is flushed before a thunk is evaluated, a nested interpreter run starts with an
+empty buffer and sends its writes through its own api.
+Commands are never buffered, since they may trigger autocommands that call back into the plugin.
+Buffering can be disabled by setting `$RIBOSOME_UNBUFFERED_WRITES`.
+'''
+import threading
+
+from ribosome import options
+
+unbuffered_methods = frozenset(('nvim_command',))
+
+
+class WriteBuffer(threading.local):
+    '''`enabled` is a class attribute, so it applies to all threads.
+    '''
+    enabled = not options.unbuffered_writes.exists
+
+    def __init__(self) -> None:
+        self.writes: list = []
+
+    def take(self) -> list:
+        '''removes all writes from the buffer without replacing the list, since the interpreter keeps a reference to it.
+        '''
+        writes = list(self.writes)
+        self.writes.clear()
+        return writes
+
+
+write_buffer = WriteBuffer()
+
+
+__all__ = ('WriteBuffer', 'write_buffer', 'unbuffered_methods',)
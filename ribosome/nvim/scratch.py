@@ -2,12 +2,13 @@ from amino import do, Do, List, Maybe, Dat, Just, Nothing
 from amino.logging import module_log
 
 from ribosome.nvim.io.compute import NvimIO
-from ribosome.nvim.api.ui import (current_tabpage, current_window, window_buffer, set_buffer_content,
-                                  current_window_height, set_buffer_name, window_focus)
+from ribosome.nvim.api.ui import (window_buffer, set_buffer_content, current_window_height, set_buffer_name,
+                                  window_focus)
 from ribosome.nvim.api.data import Window, Buffer, Tabpage
 from ribosome.nvim.api.option import option_buffer_set
-from ribosome.nvim.api.command import nvim_command
-from ribosome.nvim.io.api import N
+from ribosome.nvim.api.command import nvim_command_line
+from ribosome.nvim.api.atomic import AtomicBatch
+from ribosome.nvim.api.util import cons_ext
 
 log = module_log()
 
@@ -27,28 +28,6 @@ class ScratchBuffer(Dat['ScratchBuffer']):
         self.ui = ui
 
 
-@do(NvimIO[Tabpage])
-def create_scratch_tab() -> Do:
-    yield nvim_command('tabnew')
-    yield current_tabpage()
-
-
-@do(NvimIO[Window])
-def create_scratch_window(vertical: bool, size: Maybe[int]) -> Do:
-    cmd = 'vnew' if vertical else 'new'
-    size_prefix = size.cata(str, '')
-    yield nvim_command(f'{size_prefix}{cmd}')
-    yield current_window()
-
-
-@do(NvimIO[ScratchUi])
-def create_scratch_ui(use_tab: bool, vertical: bool, size: Maybe[int]) -> Do:
-    current = yield current_window()
-    tab = yield create_scratch_tab() / Just if use_tab else N.pure(Nothing)
-    window = yield current_window() if use_tab else create_scratch_window(vertical, size)
-    return ScratchUi(window, current, tab)
-
-
 @do(NvimIO[None])
 def configure_scratch_buffer(buffer: Buffer, name: str) -> Do:
     yield option_buffer_set(buffer, 'buftype', 'nofile')
@@ -99,11 +78,28 @@ class CreateScratchBufferOptions(Dat['CreateScratchBufferOptions']):
         self.name = name
 
 
+def scratch_ui_batch(use_tab: bool, vertical: bool, size: Maybe[int]) -> AtomicBatch:
+    '''reads the current window, opens the scratch window and reads its window, tab and buffer in one round trip.
+    '''
+    window_cmd = 'vnew' if vertical else 'new'
+    cmd = 'tabnew' if use_tab else f'{size.cata(str, "")}{window_cmd}'
+    return (
+        AtomicBatch.cons()
+        .read_cons('nvim_get_current_win', cons_ext(Window))
+        .write('nvim_command', nvim_command_line(cmd))
+        .read_cons('nvim_get_current_tabpage', cons_ext(Tabpage))
+        .read_cons('nvim_get_current_win', cons_ext(Window))
+        .read_cons('nvim_get_current_buf', cons_ext(Buffer))
+    )
+
+
 @do(NvimIO[ScratchBuffer])
 def create_scratch_buffer(options: CreateScratchBufferOptions) -> Do:
-    ui = yield create_scratch_ui(options.tab.get_or_strict(False), options.vertical.get_or_strict(False), options.size)
-    buffer = yield setup_scratch_buffer(ui, options.name)
-    return ScratchBuffer(buffer, ui)
+    use_tab = options.tab.get_or_strict(False)
+    batch = scratch_ui_batch(use_tab, options.vertical.get_or_strict(False), options.size)
+    previous, cmd, tab, window, buffer = yield batch.io
+    yield configure_scratch_buffer(buffer, options.name)
+    return ScratchBuffer(buffer, ScratchUi(window, previous, Just(tab) if use_tab else Nothing))
 
 
 @do(NvimIO[None])
@@ -6,5 +6,9 @@ file_log_level = EnvOption('RIBOSOME_FILE_LOG_LEVEL')
 file_log_fmt = EnvOption('RIBOSOME_FILE_LOG_FMT')
 nvim_log_file = EnvOption('NVIM_PYTHON_LOG_FILE')
 ribo_log_file = EnvOption('RIBOSOME_LOG_FILE')
+trace_file = EnvOption('RIBOSOME_TRACE_FILE')
+thunk_frames = EnvOption('RIBOSOME_THUNK_FRAMES')
+unbuffered_writes = EnvOption('RIBOSOME_UNBUFFERED_WRITES')
 
-__all__ = ('development', 'spec', 'file_log_level', 'file_log_fmt', 'nvim_log_file', 'ribo_log_file')
+__all__ = ('development', 'spec', 'file_log_level', 'file_log_fmt', 'nvim_log_file', 'ribo_log_file',
+           'trace_file', 'thunk_frames', 'unbuffered_writes',)
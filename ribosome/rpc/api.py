@@ -24,6 +24,7 @@ class RpcOptions(Dat['RpcOptions']):
             help: DocBlock=None,
             params_help: List[str]=None,
             json_help: Map[str, str]=None,
+            optimistic: bool=False,
     ) -> 'RpcOptions':
         return RpcOptions(
             Maybe.optional(name),
@@ -34,6 +35,7 @@ class RpcOptions(Dat['RpcOptions']):
             help or DocBlock.empty(),
             Maybe.optional(params_help),
             Maybe.optional(json_help),
+            optimistic,
         )
 
 
@@ -47,6 +49,7 @@ class RpcOptions(Dat['RpcOptions']):
             help: DocBlock,
             params_help: Maybe[List[str]],
             json_help: Maybe[Map[str, str]],
+            optimistic: bool,
     ) -> None:
         self.name = name
         self.methods = methods
@@ -56,6 +59,7 @@ class RpcOptions(Dat['RpcOptions']):
         self.help = help
         self.params_help = params_help
         self.json_help = json_help
+        self.optimistic = optimistic
 
 
 class RpcProgram(Generic[A], Dat['RpcProgram[A]']):
@@ -91,6 +95,13 @@ class RpcApi:
     def read(self, program: Program[A]) -> RpcProgram[A]:
         return RpcProgram.cons(program, RpcOptions.cons(write=False))
 
+    def optimistic(self, program: Program[A]) -> RpcProgram[A]:
+        '''a writing program that doesn't lock the state while running and is retried if another program changed the
+        same component's data in the meantime.
+        Since it may run several times, it can only query nvim; other requests are rejected.
+        '''
+        return RpcProgram.cons(program, RpcOptions.cons(optimistic=True))
+
     def autocmd(self, program: Program[A], pattern: str=None, sync: bool=False) -> RpcProgram[A]:
         method = AutocmdMethod.cons(pattern, sync)
         return RpcProgram.cons(program, RpcOptions.cons(methods=List(method))).conf(prefix=Plain())
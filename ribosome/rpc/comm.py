@@ -1,14 +1,21 @@
-from typing import Any, Callable, TypeVar, Generic, Optional
+import threading
+from asyncio import AbstractEventLoop
+from typing import Any, Callable, TypeVar, Generic, Optional, FrozenSet, Hashable, Tuple
 from threading import Lock
 
-from amino import Dat, List, IO, do, Do, Try
+from amino import Dat, List, IO, do, Do, Try, Maybe
 from amino.logging import module_log
 
 from ribosome.nvim.io.api import N
 from ribosome.nvim.io.state import NS
-from ribosome.nvim.io.compute import NvimIO, lift_n_result
-from ribosome.nvim.io.data import NResult
+from ribosome.nvim.io.compute import NvimIO, lift_n_result, NvimIOSuspend, NvimIOPure
+from ribosome.nvim.io.data import NResult, Thunk
 from ribosome.rpc.concurrency import RpcConcurrency, OnMessage, OnError
+from ribosome.nvim.io.tracing import trace_nvim_io
+from ribosome.nvim.api.session import SessionCache
+from ribosome.nvim.api.mirror import UiMirror
+from ribosome.nvim.api.signal import Signals
+from ribosome.nvim.api.data import NvimApi, ReadOnlyNvimApi
 
 A = TypeVar('A')
 B = TypeVar('B')
@@ -26,12 +33,14 @@ class RpcComm(Dat['RpcComm']):
             send: Callable[[bytes], None],
             join: Callable[[], IO[None]],
             exit: Callable[[], None],
+            loop: Maybe[AbstractEventLoop],
     ) -> None:
         self.start_processing = start_processing
         self.stop_processing = stop_processing
         self.send = send
         self.join = join
         self.exit = exit
+        self.loop = loop
 
 
 class Comm(Dat['Comm']):
@@ -41,34 +50,69 @@ class Comm(Dat['Comm']):
             request_handler: Exec,
             rpc: RpcComm,
             concurrency: RpcConcurrency=None,
+            session: SessionCache=None,
+            ui_mirror: UiMirror=None,
+            signals: Signals=None,
     ) -> 'Comm':
-        return Comm(request_handler, rpc, concurrency or RpcConcurrency.cons())
+        return Comm(
+            request_handler,
+            rpc,
+            concurrency or RpcConcurrency.cons(),
+            session or SessionCache(),
+            ui_mirror or UiMirror(),
+            signals or Signals(),
+        )
 
     def __init__(
             self,
             request_handler: Exec,
             rpc: RpcComm,
             concurrency: RpcConcurrency,
+            session: SessionCache,
+            ui_mirror: UiMirror,
+            signals: Signals,
     ) -> None:
         self.request_handler = request_handler
         self.rpc = rpc
         self.concurrency = concurrency
+        self.session = session
+        self.ui_mirror = ui_mirror
+        self.signals = signals
 
     @property
     def lock(self) -> Lock:
         return self.concurrency.lock
 
 
+class StateSlots(Generic[A]):
+    '''divides the state into slots that are versioned separately by `StateGuard`, so that optimistic programs only
+    conflict if they write the same slot.
+    '''
+
+    def written(self, snapshot: A, result: A) -> FrozenSet[Hashable]:
+        return frozenset() if result is snapshot else frozenset(['state'])
+
+    def merge(self, current: A, result: A, slots: FrozenSet[Hashable]) -> A:
+        '''combines the `slots` of `result` with the other slots of `current`, which may have been updated by other
+        programs since `result`'s snapshot was taken.
+        '''
+        return result
+
+
 class StateGuard(Generic[A], Dat['StateGuard']):
+    '''`versions` counts the commits to each slot.
+    '''
 
     @staticmethod
-    def cons(state: A, initialized: bool=False) -> 'StateGuard[A]':
-        return StateGuard(state, initialized, Lock())
+    def cons(state: A, initialized: bool=False, slots: StateSlots[A]=None) -> 'StateGuard[A]':
+        return StateGuard(state, initialized, Lock(), slots or StateSlots())
 
-    def __init__(self, state: A, initialized: bool, lock: Lock) -> None:
+    def __init__(self, state: A, initialized: bool, lock: Lock, slots: StateSlots[A]) -> None:
         self.state = state
         self.initialized = initialized
         self.lock = lock
+        self.slots = slots
+        self.versions: dict = dict()
 
     def exclusive(self, f: Callable[..., Any], *a: Any, **kw: Any) -> Any:
         with self.lock:
@@ -76,27 +120,89 @@ class StateGuard(Generic[A], Dat['StateGuard']):
 
     def exclusive_state(self, f: Callable[..., A], *a: Any, **kw: Any) -> None:
         with self.lock:
-            self.state = f(self.state, *a, **kw)
+            self.commit_exclusive(self.state, f(self.state, *a, **kw))
 
     def update(self, state: A) -> None:
-        self.exclusive(setattr, self, 'state', state)
+        with self.lock:
+            self.commit_exclusive(self.state, state)
 
     def init(self, state: A) -> None:
         self.update(state)
         self.exclusive(setattr, self, 'initialized', True)
 
+    def snapshot(self) -> Tuple[A, dict]:
+        with self.lock:
+            return self.state, dict(self.versions)
+
+    def bump(self, slots: FrozenSet[Hashable]) -> None:
+        for slot in slots:
+            self.versions[slot] = self.versions.get(slot, 0) + 1
+
+    def commit_exclusive(self, snapshot: A, result: A) -> None:
+        '''must be called while holding the lock.
+        '''
+        self.bump(self.slots.written(snapshot, result))
+        self.state = result
+
+    def commit(self, snapshot: A, versions: dict, result: A) -> bool:
+        '''stores the slots written by an optimistic program, unless one of them has been committed by another program
+        since `snapshot` was taken.
+        '''
+        slots = self.slots.written(snapshot, result)
+        if not slots:
+            return True
+        with self.lock:
+            if any(self.versions.get(slot, 0) != versions.get(slot, 0) for slot in slots):
+                return False
+            self.state = result if self.state is snapshot else self.slots.merge(self.state, result, slots)
+            self.bump(slots)
+            return True
+
     @do(NvimIO[None])
     def acquire(self) -> Do:
         yield N.simple(self.lock.acquire)
+        yield N.simple(setattr, locked_guard, 'guard', self)
 
     @do(NvimIO[None])
     def release(self, result: Optional[NResult[A]]=None) -> Do:
+        yield N.simple(setattr, locked_guard, 'guard', None)
         yield N.simple(Try, self.lock.release)
         if result:
             log.debug(f'released lock due to error: {result}')
             yield lift_n_result.match(result)
 
 
+class LockedGuard(threading.local):
+    '''the guard whose lock is held by the current thread in `exclusive_ns`.
+    '''
+
+    def __init__(self) -> None:
+        self.guard: Optional[StateGuard] = None
+
+
+locked_guard = LockedGuard()
+
+
+def unlocked(state: A, f: Callable[..., B], *a: Any) -> Tuple[A, B]:
+    '''runs `f` without the state lock if the current thread holds it in `exclusive_ns`, so that other programs aren't
+    blocked while `f` waits.
+    `state` is committed before the lock is released, and the returned state is the one that is current after the lock
+    was reacquired, since other programs may have updated it in the meantime.
+    '''
+    guard = locked_guard.guard
+    if guard is None:
+        return state, f(*a)
+    guard.commit_exclusive(guard.state, state)
+    locked_guard.guard = None
+    guard.lock.release()
+    try:
+        result = f(*a)
+    finally:
+        guard.lock.acquire()
+        locked_guard.guard = guard
+    return guard.state, result
+
+
 def unsafe_update_state(guard: StateGuard[A], state: A) -> None:
     guard.state = state
 
@@ -104,14 +210,72 @@ def unsafe_update_state(guard: StateGuard[A], state: A) -> None:
 @do(NvimIO[B])
 def exclusive_ns(guard: StateGuard[A], desc: str, thunk: Callable[..., NS[A, B]], *a: Any) -> Do:
     '''this is the central unsafe function, using a lock and updating the state in `guard` in-place.
+    The program may release the lock temporarily with `unlocked`, which replaces the state in `guard`, so the result is
+    committed relative to the current state.
     '''
-    yield guard.acquire()
+    yield trace_nvim_io(f'lock {desc}', 'lock', guard.acquire())
     log.debug2(lambda: f'exclusive: {desc}')
     state, response = yield N.ensure_failure(thunk(*a).run(guard.state), guard.release)
-    yield N.delay(lambda v: unsafe_update_state(guard, state))
+    yield N.delay(lambda v: guard.commit_exclusive(guard.state, state))
     yield guard.release()
     log.debug2(lambda: f'release: {desc}')
     yield N.pure(response)
 
 
-__all__ = ('Comm', 'OnError', 'RpcComm', 'StateGuard')
+def restrict_vim(rejected: list) -> NvimIO[None]:
+    return NvimIOSuspend(Thunk.cons(lambda vim: (ReadOnlyNvimApi(vim.name, vim, rejected), NvimIOPure(None))))
+
+
+def unrestricted_vim(vim: NvimApi) -> NvimApi:
+    return vim.vim if isinstance(vim, ReadOnlyNvimApi) else vim
+
+
+def restore_vim(result: NResult[A]) -> NvimIO[None]:
+    return NvimIOSuspend(Thunk.cons(lambda vim: (unrestricted_vim(vim), NvimIOPure(None))))
+
+
+@do(NvimIO[A])
+def read_only(desc: str, io: NvimIO[A]) -> Do:
+    '''runs `io` with an api that rejects nvim requests other than queries, since those may have side effects.
+    Buffered writes are flushed before the api is restored, so they are rejected as well.
+    The program fails if it attempted a write, even if it recovered from the rejection.
+    '''
+    rejected: list = []
+    yield restrict_vim(rejected)
+    result = yield N.ensure(io.flat_map(lambda a: N.flush().map(lambda b: a)), restore_vim)
+    yield (
+        N.error(f'optimistic program `{desc}` sent nvim writes: {", ".join(rejected)}')
+        if rejected else
+        N.pure(result)
+    )
+
+
+optimistic_retries = 3
+
+
+@do(NvimIO[B])
+def optimistic_ns(guard: StateGuard[A], desc: str, thunk: Callable[..., NS[A, B]], *a: Any, attempt: int=0) -> Do:
+    '''runs the program on a snapshot of the state without holding the lock, which is only acquired to commit the
+    result.
+    If another program has committed one of the slots written by this one in the meantime, the program is run again
+    on a new snapshot, and after `optimistic_retries` conflicts exclusively.
+    Since the nvim requests are repeated in that case, the program may only query nvim, which is enforced by
+    `read_only`; the conflict check covers the state slots only.
+    '''
+    snapshot, versions = yield N.simple(guard.snapshot)
+    state, response = yield read_only(desc, thunk(*a).run(snapshot))
+    committed = yield N.simple(guard.commit, snapshot, versions, state)
+    retry = attempt + 1
+    if not committed:
+        log.debug(f'conflict in optimistic program {desc}, attempt {retry}')
+    yield (
+        N.pure(response)
+        if committed else
+        optimistic_ns(guard, desc, thunk, *a, attempt=retry)
+        if retry < optimistic_retries else
+        read_only(desc, exclusive_ns(guard, desc, thunk, *a))
+    )
+
+
+__all__ = ('Comm', 'OnError', 'RpcComm', 'StateSlots', 'StateGuard', 'exclusive_ns', 'optimistic_ns', 'unlocked',
+           'read_only',)
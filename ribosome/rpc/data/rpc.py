@@ -1,4 +1,4 @@
-from typing import Any
+from typing import Any, Optional
 
 from amino import Dat, List, Nil
 
@@ -20,6 +20,10 @@ class Rpc(Dat['Rpc']):
     def sync(self) -> bool:
         return isinstance(self.tpe, BlockingRpc)
 
+    @property
+    def request_id(self) -> Optional[int]:
+        return self.tpe.id if self.sync else None
+
 
 class ActiveRpc(Dat['ActiveRpc']):
 
@@ -8,6 +8,7 @@ from amino.logging import module_log
 from ribosome.nvim.io.compute import NvimIO
 from ribosome.nvim.api.rpc import channel_id
 from ribosome.nvim.api.command import nvim_atomic_commands
+from ribosome.nvim.api.signal import rpc_defined_event
 from ribosome.rpc.api import RpcOptions, RpcProgram
 from ribosome.rpc.data.rpc_method import RpcMethod, CommandMethod, FunctionMethod, AutocmdMethod
 from ribosome.rpc.data.prefix_style import PrefixStyle, Plain, Full, Short
@@ -214,7 +215,7 @@ def define_rpc(progs: List[RpcProgram], name: str, prefix: str) -> Do:
     channel = yield channel_id()
     triggers = rpc_triggers(progs, name, prefix, channel)
     definitions = triggers.flat_map(lambda a: a.definition)
-    yield nvim_atomic_commands(definitions)
+    yield nvim_atomic_commands(definitions.cat(f'silent doautocmd <nomodeline> User {rpc_defined_event}'))
     return triggers
 
 __all__ = ('define_rpc',)
@@ -0,0 +1,65 @@
+'''an index of the rpc programs by their rpc name, built whenever the programs of a plugin change.
+Each entry contains the arg parser and validator of its program, so that a request needs neither a scan of all
+programs nor the construction of a parser.
+'''
+from typing import Any
+
+from amino import Dat, List, Map, Either, Nil, do, Do, Lists
+
+from ribosome.rpc.api import RpcProgram
+from ribosome.rpc.args import ArgValidator, ParamsSpec
+from ribosome.rpc.arg_parser import ArgParser, JsonArgParser, TokenArgParser
+
+
+def arg_parser(rpc_program: RpcProgram, params_spec: ParamsSpec) -> ArgParser:
+    tpe = JsonArgParser if rpc_program.options.json else TokenArgParser
+    return tpe(params_spec)
+
+
+class RpcDispatch(Dat['RpcDispatch']):
+
+    @staticmethod
+    def cons(program: RpcProgram) -> 'RpcDispatch':
+        return RpcDispatch(
+            program,
+            arg_parser(program, program.program.params_spec),
+            ArgValidator(program.program.params_spec),
+        )
+
+    def __init__(self, program: RpcProgram, parser: ArgParser, validator: ArgValidator) -> None:
+        self.program = program
+        self.parser = parser
+        self.validator = validator
+
+    @do(Either[str, List[Any]])
+    def parse(self, args: List[Any]) -> Do:
+        parsed = yield self.parser.parse(args)
+        yield self.validator.either(tuple(parsed), 'rpc program', self.program.rpc_name)
+        return parsed
+
+
+class DispatchIndex(Dat['DispatchIndex']):
+
+    @staticmethod
+    def cons(programs: List[RpcProgram]=Nil) -> 'DispatchIndex':
+        entries: dict = dict()
+        for program in programs:
+            entries.setdefault(program.rpc_name, []).append(RpcDispatch.cons(program))
+        return DispatchIndex(Map({name: Lists.wrap(progs) for name, progs in entries.items()}))
+
+    def __init__(self, entries: Map[str, List[RpcDispatch]]) -> None:
+        self.entries = entries
+
+    def lookup(self, name: str) -> List[RpcDispatch]:
+        return self.entries.get(name, Nil)
+
+    def programs(self, name: str) -> List[RpcProgram]:
+        return self.lookup(name).map(lambda a: a.program)
+
+    def entry(self, program: RpcProgram) -> RpcDispatch:
+        '''the prepared entry for `program`, or a new one if it isn't part of the index.
+        '''
+        return self.lookup(program.rpc_name).find(lambda a: a.program is program).get_or(RpcDispatch.cons, program)
+
+
+__all__ = ('RpcDispatch', 'DispatchIndex', 'arg_parser',)
@@ -10,6 +10,7 @@ from ribosome.rpc.nvim_api import RiboNvimApi
 from ribosome.rpc.data.rpc import Rpc
 from ribosome.nvim.io.data import NFatal, NResult
 from ribosome.rpc.response import validate_rpc_result, report_error
+from ribosome.tracing import trace_request_io
 
 log = module_log()
 
@@ -30,9 +31,13 @@ def execute_rpc_safe(comm: Comm, rpc: Rpc, execute: Exec, plugin_name: str) -> D
 
 
 @do(IO[Any])
-def execute_rpc_from_vim(rpc: Rpc, comm: Comm, execute: Exec, plugin_name: str) -> Do:
+def execute_rpc_and_respond(rpc: Rpc, comm: Comm, execute: Exec, plugin_name: str) -> Do:
     result = yield execute_rpc_safe(comm, rpc, execute, plugin_name)
     yield handle_response.match(result).run(comm)
 
 
+def execute_rpc_from_vim(rpc: Rpc, comm: Comm, execute: Exec, plugin_name: str) -> IO[Any]:
+    return trace_request_io(rpc.method, execute_rpc_and_respond(rpc, comm, execute, plugin_name), sync=rpc.sync)
+
+
 __all__ = ('execute_rpc_from_vim')
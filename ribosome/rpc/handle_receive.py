@@ -13,6 +13,8 @@ from ribosome.rpc.comm import Comm
 from ribosome.rpc.concurrency import Requests, RpcConcurrency
 from ribosome.rpc.data.rpc import Rpc
 from ribosome.rpc.data.rpc_type import BlockingRpc
+from ribosome.nvim.api.mirror import ui_mirror_method
+from ribosome.nvim.api.signal import signal_method
 
 log = module_log()
 A = TypeVar('A')
@@ -58,7 +60,13 @@ class handle_receive(Generic[A], Case[Receive, IO[None]], alg=Receive):
         return self.execute_plugin_rpc(self.comm, Rpc(receive.method, receive.args, BlockingRpc(receive.id)))
 
     def notification(self, receive: ReceiveNotification) -> IO[None]:
-        return self.execute_plugin_rpc(self.comm, Rpc.nonblocking(receive.method, receive.args))
+        return (
+            IO.delay(self.comm.ui_mirror.invalidate, receive.args.head.get_or_strict(''))
+            if receive.method == ui_mirror_method else
+            IO.delay(self.comm.signals.notify, receive.args.head.get_or_strict(''))
+            if receive.method == signal_method else
+            self.execute_plugin_rpc(self.comm, Rpc.nonblocking(receive.method, receive.args))
+        )
 
     def exit(self, receive: ReceiveExit) -> IO[None]:
         log.debug('exiting rpc session')
@@ -2,7 +2,7 @@ from asyncio import new_event_loop
 from typing import Tuple
 from concurrent.futures import Future
 
-from amino import List, IO, do, Do, Path
+from amino import List, IO, do, Do, Path, Just
 from amino.logging import module_log
 
 from ribosome.rpc.comm import RpcComm
@@ -26,6 +26,7 @@ def cons_asyncio(pipes: AsyncioPipes) -> Tuple[Asyncio, RpcComm]:
         asyncio_send(resources),
         lambda: join_asyncio_loop(asio),
         lambda: asyncio_exit(asio),
+        Just(loop),
     )
     return asio, comm
 
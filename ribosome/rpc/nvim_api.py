@@ -1,12 +1,16 @@
+from asyncio import AbstractEventLoop
 from typing import Any, Tuple
 
-from amino import List, do, Either, Do, Left
+from amino import List, do, Either, Do, Left, Maybe, Just
 from amino.logging import module_log
 
 from ribosome import NvimApi
 from ribosome.rpc.comm import Comm
-from ribosome.rpc.to_vim import send_request, send_notification
+from ribosome.rpc.to_vim import send_request, send_notification, initiate_request, await_result
 from ribosome.rpc.data.rpc import Rpc
+from ribosome.nvim.api.session import SessionCache
+from ribosome.nvim.api.mirror import UiMirror
+from ribosome.nvim.api.signal import Signals
 
 log = module_log()
 
@@ -21,13 +25,47 @@ class RiboNvimApi(NvimApi):
     def request(self, method: str, args: List[Any], sync: bool, timeout: float) -> Do:
         sender = send_request if sync else send_notification
         rpc_desc = 'request' if sync else 'notification'
+        self.comm.ui_mirror.observe(method)
         try:
             log.debug1(lambda: f'api: {rpc_desc} `{method}({args.join_tokens})`')
             a = sender(Rpc.nonblocking(method, args), timeout)
             comm, result = yield a.run(self.comm).attempt
-            return self.copy(comm=comm), result
+            return (self if comm is self.comm else self.copy(comm=comm)), result
         except Exception as e:
             yield Left(f'request error: {e}')
 
+    async def request_aio(self, method: str, args: List[Any], sync: bool, timeout: float
+                          ) -> Either[str, Tuple[NvimApi, Any]]:
+        '''sends the request without blocking and suspends the coroutine until the response is published by the rpc
+        loop, so that multiple requests can be in flight at the same time.
+        '''
+        if not sync:
+            return self.request(method, args, sync, timeout)
+        rpc = Rpc.nonblocking(method, args)
+        self.comm.ui_mirror.observe(method)
+        try:
+            log.debug1(lambda: f'api: async request `{method}({args.join_tokens})`')
+            comm, result = initiate_request(rpc).run(self.comm).run()
+        except Exception as e:
+            return Left(f'request error: {e}')
+        response = await await_result(result, timeout, rpc)
+        return response.map(lambda a: ((self if comm is self.comm else self.copy(comm=comm)), a))
+
+    @property
+    def loop(self) -> Maybe[AbstractEventLoop]:
+        return self.comm.rpc.loop
+
+    @property
+    def session_cache(self) -> Maybe[SessionCache]:
+        return Just(self.comm.session)
+
+    @property
+    def ui_mirror(self) -> Maybe[UiMirror]:
+        return Just(self.comm.ui_mirror)
+
+    @property
+    def signals(self) -> Maybe[Signals]:
+        return Just(self.comm.signals)
+
 
 __all__ = ('RiboNvimApi',)
@@ -0,0 +1,127 @@
+'''the thread that runs the programs registered in the plugin state's `Scheduler`.
+Periodic programs are scheduled on a fixed grid starting at the scheduler's start, so that the execution time of the
+programs doesn't accumulate as drift; the jitter only delays the individual run, not the following ticks.
+Deferred programs are run one at a time while no periodic program is due and no request from nvim is in flight, so
+they should be split into small steps that defer each other.
+All programs are run sequentially in the scheduler thread, exclusively like write requests.
+'''
+import time
+import random
+from threading import Thread
+from typing import Any, TypeVar, Optional, Tuple
+
+from amino import Dat, List, Lists
+from amino.logging import module_log
+
+from ribosome.rpc.comm import StateGuard, exclusive_ns
+from ribosome.nvim.io.state import NS
+from ribosome.nvim.io.data import NSuccess
+from ribosome.nvim.api.data import NvimApi
+from ribosome.compute.program import Program
+from ribosome.compute.prog import Prog
+from ribosome.compute.run import run_prog
+from ribosome.data.plugin_state import PluginState
+from ribosome.data.scheduler import Periodic, Scheduler
+
+log = module_log()
+A = TypeVar('A')
+
+
+def next_tick(tick: float, interval: float, now: float, coalesce: bool) -> float:
+    '''the tick following `tick`, or the last tick that has passed at `now` if the ticks in between are coalesced.
+    '''
+    following = tick + interval
+    return following + interval * ((now - following) // interval) if coalesce and following < now else following
+
+
+class Tick(Dat['Tick']):
+    '''`at` is the time the program is run, which is `tick` delayed by jitter.
+    '''
+
+    @staticmethod
+    def cons(periodic: Periodic, tick: float) -> 'Tick':
+        return Tick(periodic, tick, tick + random.uniform(0., periodic.jitter))
+
+    def __init__(self, periodic: Periodic, tick: float, at: float) -> None:
+        self.periodic = periodic
+        self.tick = tick
+        self.at = at
+
+    def next(self, now: float) -> 'Tick':
+        return Tick.cons(self.periodic, next_tick(self.tick, self.periodic.interval, now, self.periodic.coalesce))
+
+
+def run_scheduled(guard: StateGuard[PluginState], vim: NvimApi, program: Program, args: List[Any]) -> None:
+    result = exclusive_ns(guard, program.name, run_prog, program, args).run_a(vim)
+    if not isinstance(result, NSuccess):
+        log.error(f'scheduled program `{program.name}` failed: {result}')
+
+
+def next_job(scheduler: Scheduler, ticks: List[Tick]) -> Optional[Tuple[Optional[int], Program, List[Any]]]:
+    '''waits until a periodic program is due or a deferred program can be run, returning the index of the tick for
+    periodic programs, or `None` when the scheduler has been stopped.
+    '''
+    with scheduler.condition:
+        while scheduler.running:
+            now = time.monotonic()
+            for index, tick in enumerate(ticks):
+                if tick.at <= now:
+                    return index, tick.periodic.program, tick.periodic.args
+            idle = scheduler.next_idle()
+            if idle is not None:
+                return (None,) + idle
+            timeout = ticks.map(lambda a: a.at - now).min.get_or_strict(None)
+            scheduler.condition.wait(timeout)
+    return None
+
+
+def scheduler_loop(guard: StateGuard[PluginState], vim: NvimApi, scheduler: Scheduler) -> None:
+    start = time.monotonic()
+    ticks = scheduler.periodic.map(lambda a: Tick.cons(a, start + a.interval))
+    while True:
+        job = next_job(scheduler, ticks)
+        if job is None:
+            break
+        index, program, args = job
+        try:
+            run_scheduled(guard, vim, program, args)
+        except Exception as e:
+            log.error(f'scheduled program `{program.name}` raised: {e}')
+        if index is not None:
+            ticks = ticks.modify_at(index, lambda a: a.next(time.monotonic())).get_or_strict(ticks)
+
+
+def start_scheduler(guard: StateGuard[PluginState], vim: NvimApi) -> None:
+    scheduler = guard.state.scheduler
+    with scheduler.condition:
+        if scheduler.running:
+            return
+        scheduler.running = True
+        scheduler.thread = Thread(target=scheduler_loop, args=(guard, vim, scheduler), daemon=True,
+                                  name='ribosome_scheduler')
+        scheduler.thread.start()
+
+
+def stop_scheduler(scheduler: Scheduler, timeout: float=1.) -> None:
+    with scheduler.condition:
+        scheduler.running = False
+        scheduler.condition.notify_all()
+        thread = scheduler.thread
+    if thread is not None:
+        thread.join(timeout)
+
+
+def defer(program: Program, args: List[Any]) -> NS[PluginState, None]:
+    return NS.inspect(lambda s: s.scheduler.defer(program, args))
+
+
+defer_program = Program.lift(defer)
+
+
+def idle(program: Program[A], *args: Any) -> Prog[None]:
+    '''schedules `program` to be run with `args` when the plugin is idle.
+    '''
+    return defer_program(program, Lists.wrap(args))
+
+
+__all__ = ('next_tick', 'start_scheduler', 'stop_scheduler', 'idle',)
@@ -9,6 +9,8 @@ from ribosome.config.config import Config
 from ribosome.rpc.handle_receive import rpc_receive
 from ribosome.components.internal.update import init_rpc_plugin
 from ribosome.rpc.state import cons_state
+from ribosome.data.state_slots import PluginStateSlots
+from ribosome.rpc.scheduler import start_scheduler, stop_scheduler
 from ribosome.nvim.io.compute import NvimIO, NvimIOSuspend
 from ribosome.nvim.io.api import N
 from ribosome.nvim.api.variable import variable_set_prefixed
@@ -59,7 +61,7 @@ def plugin_execute_receive_request(guard: StateGuard[A], plugin_name: str) -> Ca
 @do(NvimIO[Tuple[Comm, StateGuard]])
 def setup_comm(config: Config, rpc_comm: RpcComm) -> Do:
     state = cons_state(config)
-    guard = StateGuard.cons(state)
+    guard = StateGuard.cons(state, slots=PluginStateSlots())
     execute_request = plugin_execute_receive_request(guard, config.basic.name)
     comm = yield N.from_io(init_comm(rpc_comm, execute_request))
     api = RiboNvimApi(config.basic.name, comm)
@@ -67,20 +69,24 @@ def setup_comm(config: Config, rpc_comm: RpcComm) -> Do:
     return comm, guard
 
 
-@do(NvimIO[None])
+@do(NvimIO[Tuple[Comm, StateGuard]])
 def start_plugin(config: Config, rpc_comm: RpcComm) -> Do:
     comm, guard = yield setup_comm(config, rpc_comm)
     state = yield init_plugin().run_s(guard.state)
     yield N.delay(lambda v: guard.init(state))
-    return comm
+    yield N.delay(lambda v: start_scheduler(guard, v))
+    return comm, guard
 
 
 @do(IO[None])
 def start_plugin_sync(config: Config, rpc_comm: RpcComm) -> Do:
     start = start_plugin(config, rpc_comm)
     result = yield IO.delay(start.run_a, None)
-    comm = yield IO.from_either(result.to_either)
+    comm, guard = yield IO.from_either(result.to_either)
     yield comm.rpc.join()
+    yield IO.delay(stop_scheduler, guard.state.scheduler)
+    yield IO.delay(guard.state.io_executor.shutdown)
+    yield IO.delay(guard.state.cpu_executor.shutdown)
 
 
 def cannot_execute_request(comm: Comm, rpc: Rpc) -> IO[None]:
@@ -12,6 +12,11 @@ from ribosome.config.component import ComponentConfig
 from ribosome.components.internal.update import init_rpc_plugin
 from ribosome.compute.interpret import ProgIOInterpreter
 from ribosome.compute.program import Program
+from ribosome.data.program_log import ProgramLog
+from ribosome.compute.executor import IoExecutor
+from ribosome.compute.subprocess_pool import SubprocessPool
+from ribosome.compute.cpu import CpuExecutor
+from ribosome.data.scheduler import Scheduler
 
 D = TypeVar('D')
 CC = TypeVar('CC')
@@ -31,6 +36,11 @@ def cons_state(
         data,
         Nil,
         config.init,
+        program_log=ProgramLog.cons(config.basic.program_log_size),
+        io_executor=IoExecutor.cons(config.basic.io_workers.get_or_strict(None)),
+        subprocess_pool=SubprocessPool.cons(config.basic.subprocess_limit.get_or_strict(None)),
+        cpu_executor=CpuExecutor.cons(config.basic.cpu_workers.get_or_strict(None)),
+        scheduler=Scheduler.cons(config.schedule),
         logger=logger,
         io_interpreter=io_interpreter,
         **kw,
@@ -1,9 +1,10 @@
 from queue import Queue
+from asyncio import AbstractEventLoop
 from typing import Any
 
 import msgpack
 
-from amino import Dat, Map, IO
+from amino import Dat, Map, IO, Maybe, Nothing
 
 from ribosome.rpc.comm import OnError
 from ribosome.rpc.concurrency import OnMessage
@@ -21,6 +22,10 @@ class StrictRpc(Dat['StrictRpc']):
         self.queue = queue
         self.running = running
 
+    @property
+    def loop(self) -> Maybe[AbstractEventLoop]:
+        return Nothing
+
     def send(self, data: bytes) -> None:
         self.queue.put(msgpack.unpackb(data))
 
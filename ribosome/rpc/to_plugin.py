@@ -5,41 +5,58 @@ from amino.logging import module_log
 from amino.util.string import decode
 
 from ribosome.nvim.io.compute import NvimIO
-from ribosome.rpc.comm import StateGuard, exclusive_ns
+from ribosome.rpc.comm import StateGuard, exclusive_ns, optimistic_ns
 from ribosome.nvim.io.api import N
 from ribosome.compute.program import Program
 from ribosome.nvim.io.state import NS
 from ribosome.data.plugin_state import PS
 from ribosome.compute.run import run_prog
-from ribosome.compute.api import parse_args
 from ribosome.rpc.api import RpcProgram
 from ribosome.rpc.data.rpc import RpcArgs
 from ribosome.nvim.api.util import nvimio_repeat_timeout
+from ribosome.config.component import Component
+from ribosome.worker.host import run_in_worker
 
 log = module_log()
 A = TypeVar('A')
 
 
 @do(NS[PS, Any])
-def run_program(rpc_program: RpcProgram, args: RpcArgs) -> Do:
-    parsed_args = yield NS.from_either(parse_args(rpc_program, args.args))
+def run_local_program(rpc_program: RpcProgram, args: RpcArgs) -> Do:
+    entry = yield NS.inspect(lambda s: s.dispatch.entry(rpc_program))
+    parsed_args = yield NS.from_either(entry.parse(args.args))
     yield run_prog(rpc_program.program, parsed_args)
 
 
+def run_worker_program(state: PS, component: Component, rpc_program: RpcProgram, args: RpcArgs) -> NvimIO[Any]:
+    return run_in_worker(state.workers, state.basic, component, rpc_program, args)
+
+
+@do(NS[PS, Any])
+def run_program(rpc_program: RpcProgram, args: RpcArgs) -> Do:
+    worker = yield NS.inspect(lambda s: s.worker_component(rpc_program))
+    yield worker.cata(
+        lambda c: NS.inspect_f(lambda s: run_worker_program(s, c, rpc_program, args)),
+        lambda: run_local_program(rpc_program, args),
+    )
+
+
 def run_programs(programs: List[Program], args: RpcArgs) -> NvimIO[List[Any]]:
-    return programs.traverse(lambda a: run_program(a, args), NvimIO)
+    return N.traverse(programs, lambda a: run_program(a, args))
 
 
 def run_program_exclusive(guard: StateGuard[A], program: RpcProgram, args: RpcArgs) -> NvimIO[Any]:
+    write = program.options.write and guard.state.worker_component(program).empty
     return (
-        exclusive_ns(guard, program.program.name, run_program, program, args)
-        if program.options.write else
+        (optimistic_ns if program.options.optimistic else exclusive_ns)(
+            guard, program.program.name, run_program, program, args)
+        if write else
         run_program(program, args).run_a(guard.state)
     )
 
 
 def run_programs_exclusive(guard: StateGuard[A], programs: List[Program], args: RpcArgs) -> NvimIO[List[Any]]:
-    return programs.traverse(lambda a: run_program_exclusive(guard, a, args), NvimIO)
+    return N.traverse(programs, lambda a: run_program_exclusive(guard, a, args))
 
 
 def no_programs_for_rpc(method: str, args: RpcArgs) -> NvimIO[A]:
@@ -65,13 +82,16 @@ def rpc_handler(guard: StateGuard[A]) -> Callable[[str, List[Any]], NvimIO[List[
         args = decode_args(method, raw_args)
         log.debug(f'handling request: {method}({args.args.join_comma})')
         programs = guard.state.programs_by_name(method)
-        yield (
+        scheduler = guard.state.scheduler
+        yield N.simple(scheduler.enter_request)
+        yield N.ensure(
             no_programs_for_rpc(method, args)
             if programs.empty else
-            run_programs_exclusive(guard, programs, args)
+            run_programs_exclusive(guard, programs, args),
+            lambda r: N.simple(scheduler.leave_request),
         )
     return handler
 
 
-__all__ = ('rpc_handler', 'run_program', 'run_programs', 'run_program_exclusive', 'run_programs_exclusive',
-           'no_programs_for_rpc', 'decode_args', 'rpc_handler',)
+__all__ = ('rpc_handler', 'run_local_program', 'run_program', 'run_programs', 'run_program_exclusive',
+           'run_programs_exclusive', 'no_programs_for_rpc', 'decode_args', 'rpc_handler',)
@@ -1,9 +1,10 @@
 from concurrent.futures import Future, TimeoutError
+from asyncio import wait_for, shield, wrap_future, TimeoutError as AsyncioTimeoutError
 from typing import Any, Callable, TypeVar, Union, Tuple
 
 import msgpack
 
-from amino import do, Do, IO, Either
+from amino import do, Do, IO, Either, Left
 from amino.state import IOState
 from amino.lenses.lens import lens
 from amino.logging import module_log
@@ -75,12 +76,33 @@ def wait_for_result(result: Future, timeout: float, rpc: Rpc) -> IO[Any]:
         return IO.from_either(r.lmap(lambda a: f'{rpc} failed: {a}'))
 
 
-@do(IOState[Comm, Either[str, Any]])
-def send_request(rpc: Rpc, timeout: float) -> Do:
+async def await_result(result: Future, timeout: float, rpc: Rpc) -> Either[str, Any]:
+    '''like `wait_for_result`, but suspends the current coroutine instead of blocking the thread.
+    The future is shielded, since cancelling it on timeout would make the response handler fail.
+    '''
+    try:
+        r = await wait_for(shield(wrap_future(result)), timeout)
+    except AsyncioTimeoutError:
+        return Left(f'{rpc} timed out after {timeout}s')
+    except Exception as e:
+        log.caught_exception('awaiting request result future', e)
+        return Left(f'fatal error in {rpc}')
+    else:
+        return r.lmap(lambda a: f'{rpc} failed: {a}')
+
+
+@do(IOState[Comm, Future])
+def initiate_request(rpc: Rpc) -> Do:
     id = yield increment().zoom(lens.concurrency)
     active_rpc = ActiveRpc(rpc, id)
     result = yield IOState.inspect_f(lambda a: register_rpc(a, a.requests.to_vim, active_rpc)).zoom(lens.concurrency)
     yield initiate_rpc([0, id], rpc).zoom(lens.rpc)
+    return result
+
+
+@do(IOState[Comm, Either[str, Any]])
+def send_request(rpc: Rpc, timeout: float) -> Do:
+    result = yield initiate_request(rpc)
     yield IOState.lift(wait_for_result(result, timeout, rpc))
 
 
@@ -105,4 +127,4 @@ class handle_response(Case[RpcResponse, IOState[Comm, None]], alg=RpcResponse):
         return IOState.unit
 
 
-__all__ = ('send_request', 'send_notification', 'handle_response',)
+__all__ = ('send_request', 'send_notification', 'handle_response', 'initiate_request', 'await_result',)
@@ -12,6 +12,7 @@ from ribosome.nvim.io.compute import NvimIO
 from ribosome.compute.interpret import ProgIOInterpreter
 from ribosome.nvim.io.api import N
 from ribosome.test.request import Handler, no_handler
+from ribosome.nvim.api.clock import Clock, real_clock
 
 
 default_config_name = 'spec'
@@ -36,6 +37,7 @@ class TestConfig(Dat['TestConfig']):
             autostart: bool=True,
             config_path: str=None,
             tmux_socket: str=None,
+            clock: Clock=real_clock,
     ) -> 'TestConfig':
         ld = log_dir or temp_dir('log')
         lf = log_file or ld / config.basic.name
@@ -54,6 +56,7 @@ class TestConfig(Dat['TestConfig']):
             autostart,
             Maybe.optional(config_path),
             Maybe.optional(tmux_socket),
+            clock,
         )
 
     def __init__(
@@ -72,6 +75,7 @@ class TestConfig(Dat['TestConfig']):
             autostart: bool,
             config_path: Maybe[str],
             tmux_socket: Maybe[str],
+            clock: Clock,
     ) -> None:
         self.config = config
         self.pre = pre
@@ -87,6 +91,7 @@ class TestConfig(Dat['TestConfig']):
         self.autostart = autostart
         self.config_path = config_path
         self.tmux_socket = tmux_socket
+        self.clock = clock
 
     def with_vars(self, **kw: Any) -> 'TestConfig':
         return self.copy(vars=self.vars ** Map(kw))
@@ -10,6 +10,7 @@ from ribosome.rpc.start import start_external
 from ribosome.rpc.comm import Comm
 from ribosome.test.config import TestConfig
 from ribosome.nvim.io.compute import NvimIO
+from ribosome.nvim.io.api import N
 from ribosome.nvim.api.variable import variable_set
 from ribosome.rpc.nvim_api import RiboNvimApi
 from ribosome.rpc.io.start import cons_asyncio_socket, cons_asyncio_embed
@@ -81,7 +82,7 @@ def setup_test_nvim_socket(config: TestConfig, socket: Path) -> Do:
 
 
 def set_nvim_vars(vars: Map[str, Any]) -> NvimIO[None]:
-    return vars.to_list.traverse2(variable_set, NvimIO)
+    return N.traverse_par(vars.to_list, lambda a: variable_set(*a)).replace(None)
 
 
 __all__ = ('TestNvim', 'setup_test_nvim_embed', 'set_nvim_vars',)
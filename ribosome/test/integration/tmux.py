@@ -1,4 +1,5 @@
 from typing import Callable, Any, Tuple, TypeVar
+import warnings
 import subprocess
 
 from kallikrein import Expectation, k
@@ -131,13 +132,33 @@ def check_screenshot(path: Path, current: List[str]) -> Do:
     return k(current).must(have_lines(recorded))
 
 
+@do(NvimIO[List[str]])
+def settled_screen(settle: float, timeout: float, interval: float=.02) -> Do:
+    '''captures the pane until its content hasn't changed for `settle` seconds, or `timeout` seconds have passed.
+    '''
+    start = yield N.now()
+    @do(NvimIO[List[str]])
+    def recurse(previous: List[str], stable_since: float) -> Do:
+        yield N.sleep(interval)
+        current = yield test_tmux_to_nvim(capture_pane(0, True))
+        now = yield N.now()
+        since = stable_since if current == previous else now
+        yield N.pure(current) if now - since >= settle or now - start >= timeout else recurse(current, since)
+    initial = yield test_tmux_to_nvim(capture_pane(0, True))
+    yield recurse(initial, start)
+
+
 @do(NvimIO[Expectation])
-def screenshot(*segments: str, delay: float=0.5, record: bool=False) -> Do:
+def screenshot(*segments: str, settle: float=.1, timeout: float=3., record: bool=False, delay: float=None) -> Do:
+    '''`delay` is deprecated; it was a fixed wait before the capture and is now used as the timeout.
+    '''
+    if delay is not None:
+        warnings.warn('`screenshot(delay=...)` is deprecated, use `settle` and `timeout`', DeprecationWarning,
+                      stacklevel=3)
     path = fixture_path('screenshots', *segments)
     yield N.from_io(mkdir(path.parent))
     exists = yield N.from_io(IO.delay(path.exists))
-    yield N.sleep(delay)
-    current = yield test_tmux_to_nvim(capture_pane(0, True))
+    current = yield settled_screen(settle, timeout if delay is None else delay)
     yield store_screenshot(path, current) if not exists or record else check_screenshot(path, current)
 
 
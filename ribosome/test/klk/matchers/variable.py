@@ -8,7 +8,7 @@ from ribosome.nvim.api.variable import var_becomes
 from ribosome.test.klk.matchers.nresult import nsuccess
 
 
-def var_must_become(name: str, value: Any, timeout: float=3, interval: float=.2) -> NvimIO[Expectation]:
+def var_must_become(name: str, value: Any, timeout: float=3, interval: float=None) -> NvimIO[Expectation]:
     return N.intercept(var_becomes(name, value, timeout, interval), lambda r: N.pure(k(r).must(nsuccess(True))))
 
 
@@ -35,14 +35,13 @@ def no_matching_program(method: str) -> NS[PS, Any]:
 
 @do(NS[PS, List[Any]])
 def request(method: str, *args: Any, **json_args: Any) -> Do:
-    progs = yield NS.inspect(lambda a: a.programs)
-    matches = progs.filter(lambda a: a.rpc_name == method)
+    matches = yield NS.inspect(lambda a: a.programs_by_name(method))
     json = yield NS.from_either(dump_json(Map(json_args)))
     json_arg = List(json) if json_args else Nil
     yield (
         no_matching_program(method)
         if matches.empty else
-        matches.traverse(program_runner(Lists.wrap(args) + json_arg), NS)
+        NS.traverse(matches, program_runner(Lists.wrap(args) + json_arg))
     )
 
 
@@ -1,6 +1,6 @@
 from typing import Callable, Tuple, Any
 
-from amino import Map, List, Either, Left, Right, do, Do
+from amino import Map, List, Either, Left, Right, do, Do, Lists
 
 from ribosome.nvim.api.data import NvimApi, StrictNvimApi
 
@@ -28,8 +28,18 @@ def pop_first(vim: NvimApi, name: str, args: List[Any]) -> Do:
 
 
 def rh_atomic(vim: NvimApi, name: str, args: List[Any]) -> Either[str, Tuple[NvimApi, Any]]:
-    count = args.head.map(len).get_or_strict(0)
-    return Right((vim, [None] * count))
+    '''dispatches the calls of the batch to the api's request handler, aborting at the first error like nvim does.
+    '''
+    results: list = []
+    for index, (method, call_args) in enumerate(args.head | []):
+        response = vim.request(method, Lists.wrap(call_args), True, 1.)
+        if response.is_left:
+            error = response.value
+            message = error.join_comma if isinstance(error, List) else str(error)
+            return Right((vim, [results, [index, 0, message]]))
+        vim, result = response.value
+        results.append(result)
+    return Right((vim, [results, None]))
 
 
 default_request_handlers = Map({
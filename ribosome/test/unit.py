@@ -18,7 +18,7 @@ from ribosome.test.request import StrictRequestHandler
 
 def setup_strict_test_nvim(config: TestConfig) -> StrictNvimApi:
     handler = StrictRequestHandler(config.request_handler, config.function_handler, config.command_handler)
-    return StrictNvimApi.cons(config.config.basic.name, vars=config.vars, request_handler=handler)
+    return StrictNvimApi.cons(config.config.basic.name, vars=config.vars, request_handler=handler, clock=config.clock)
 
 
 def unit_test(config: TestConfig, io: Callable[..., NS[PS, Expectation]], *a: Any, **kw: Any) -> Expectation:
@@ -0,0 +1,191 @@
+'''spans for the stages of request processing, exported in the Chrome `trace_event` format.
+Tracing is enabled by setting `$RIBOSOME_TRACE_FILE`; each event is appended to that file as soon as it completes,
+using the array variant of the format, which is terminated when the process exits or when `close_trace` is called.
+Since the closing bracket is optional in that variant, the trace of a host that was killed can still be loaded in
+`chrome://tracing` or Perfetto.
+Only the most recent events are kept in memory, for introspection.
+'''
+import os
+import json
+import time
+import atexit
+import threading
+from itertools import count
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator, Optional, TypeVar, Callable, TextIO
+
+from amino import Path, Maybe, IO, do, Do, Nothing
+from amino.logging import module_log
+
+from ribosome import options
+
+log = module_log()
+A = TypeVar('A')
+default_trace_buffer_size = 10000
+
+
+class RequestContext:
+    '''the id of the request that is processed by the current thread or coroutine, which is attached to trace spans
+    and program log entries.
+    Threads don't inherit the value, so code that continues a request in another thread must pass the id along with
+    `carry_request`.
+    '''
+
+    def __init__(self) -> None:
+        self.var: ContextVar[Optional[int]] = ContextVar('ribosome_request', default=None)
+        self.ids = count(1)
+
+    def start(self) -> int:
+        id = next(self.ids)
+        self.var.set(id)
+        return id
+
+    def end(self) -> None:
+        self.var.set(None)
+
+    @property
+    def id(self) -> Optional[int]:
+        return self.var.get()
+
+    @id.setter
+    def id(self, id: Optional[int]) -> None:
+        self.var.set(id)
+
+
+request_context = RequestContext()
+
+
+def carry_request(f: Callable[..., A]) -> Callable[..., A]:
+    '''binds the current thread's request id to `f`, restoring it in the thread that calls it.
+    '''
+    id = request_context.id
+    def run(*a: Any, **kw: Any) -> A:
+        previous = request_context.id
+        request_context.id = id
+        try:
+            return f(*a, **kw)
+        finally:
+            request_context.id = previous
+    return run
+
+
+class Tracer:
+    '''writes complete (`X`) events to the trace file and keeps the most recent ones in a bounded buffer.
+    '''
+
+    def __init__(self, file: Maybe[Path], size: int=default_trace_buffer_size) -> None:
+        self.file = file
+        self.events: deque = deque(maxlen=size)
+        self.lock = threading.Lock()
+        self.stream: Optional[TextIO] = None
+        self.pid = os.getpid()
+
+    @property
+    def enabled(self) -> bool:
+        return self.file.present
+
+    @property
+    def request_id(self) -> Optional[int]:
+        return request_context.id
+
+    def now(self) -> float:
+        return time.perf_counter() * 1e6
+
+    def complete(self, name: str, cat: str, start: float, args: dict) -> None:
+        self.emit(dict(
+            name=name,
+            cat=cat,
+            ph='X',
+            ts=start,
+            dur=self.now() - start,
+            pid=self.pid,
+            tid=threading.get_ident(),
+            args=dict(args, request=self.request_id),
+        ))
+
+    def emit(self, event: dict) -> None:
+        line = json.dumps(event, default=str)
+        with self.lock:
+            self.events.append(event)
+            self.file.foreach(lambda f: self.append(f, line))
+
+    def append(self, file: Path, line: str) -> None:
+        if self.stream is None:
+            self.stream = open(str(file), 'w')
+            self.stream.write('[\n')
+        else:
+            self.stream.write(',\n')
+        self.stream.write(line)
+        self.stream.flush()
+
+    def json(self) -> str:
+        return json.dumps(dict(traceEvents=list(self.events), displayTimeUnit='ms'), default=str)
+
+    def close(self) -> None:
+        '''terminates the trace file and disables tracing.
+        '''
+        with self.lock:
+            if self.stream is not None:
+                self.stream.write('\n]\n')
+                self.stream.close()
+                self.stream = None
+            self.file = Nothing
+
+
+tracer = Tracer(options.trace_file.value.map(Path))
+
+
+@contextmanager
+def span(name: str, cat: str, **args: Any) -> Iterator[None]:
+    if tracer.enabled:
+        start = tracer.now()
+        try:
+            yield
+        finally:
+            tracer.complete(name, cat, start, args)
+    else:
+        yield
+
+
+@contextmanager
+def request_span(name: str, **args: Any) -> Iterator[None]:
+    '''assigns a new request id to the current thread that is attached to all spans and program log entries created
+    until the request is done.
+    '''
+    request_context.start()
+    try:
+        with span(name, 'rpc', **args):
+            yield
+    finally:
+        request_context.end()
+
+
+def finish_request(name: str, start: float, args: dict) -> None:
+    if tracer.enabled:
+        tracer.complete(name, 'rpc', start, args)
+    request_context.end()
+
+
+def trace_request_io(name: str, io: IO[A], **args: Any) -> IO[A]:
+    '''like `request_span`, for an `IO` that is executed later.
+    '''
+    @do(IO[A])
+    def traced() -> Do:
+        yield IO.delay(request_context.start)
+        start = yield IO.delay(tracer.now)
+        yield io.ensure(lambda r: IO.delay(finish_request, name, start, args))
+    return traced()
+
+
+def close_trace() -> IO[None]:
+    return IO.delay(tracer.close)
+
+
+if tracer.enabled:
+    atexit.register(tracer.close)
+
+
+__all__ = ('RequestContext', 'request_context', 'carry_request', 'Tracer', 'tracer', 'span', 'request_span',
+           'trace_request_io', 'close_trace',)
@@ -176,7 +176,7 @@ def process_prompt_update(process: PromptConsumer, action: PromptUpdate[B]) -> D
 
 def update_prompt(process: PromptConsumer) -> Callable[[List[PromptUpdate[B]]], NS[InputResources[A, B], None]]:
     def update_prompt(chars: List[PromptUpdate[B]]) -> NS[InputState[A, B], None]:
-        return chars.traverse(lambda char: process_prompt_update(process, char), NS).replace(None)
+        return NS.traverse(chars, lambda char: process_prompt_update(process, char)).replace(None)
     return update_prompt
 
 
@@ -199,7 +199,7 @@ def pop_actions(s: InputState[A, B]) -> NvimIO[Tuple[InputState[A, B], List[Prom
 @do(NS[InputResources[A, B], None])
 def prompt_recurse(input: List[PromptUpdate[B]]) -> Do:
     stop = yield NS.inspect(lambda a: a.stop)
-    yield input.traverse(process_action.match, NS).zoom(lens.state)
+    yield NS.traverse(input, process_action.match).zoom(lens.state)
     current = yield NS.apply(pop_actions).zoom(lens.state)
     update = yield NS.inspect(lambda s: s.update)
     yield update(current)
@@ -0,0 +1,3 @@
+from ribosome.worker.run import worker_main
+
+worker_main()
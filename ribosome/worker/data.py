@@ -0,0 +1,186 @@
+import os
+from typing import Any, Optional
+from threading import Lock
+from subprocess import Popen
+
+import msgpack
+
+from amino import ADT, Dat, List, Lists, Maybe, Either, Left, Right, Map, do, Do, Try, Just
+
+
+class WorkerMessage(ADT['WorkerMessage']):
+    pass
+
+
+class WorkerInit(WorkerMessage):
+    '''sent by the host right after spawning, containing the json encoded basic config and component.
+    '''
+
+    def __init__(self, basic: str, component: str) -> None:
+        self.basic = basic
+        self.component = component
+
+
+class WorkerRun(WorkerMessage):
+
+    def __init__(self, id: int, method: str, args: List[Any], bang: bool) -> None:
+        self.id = id
+        self.method = method
+        self.args = args
+        self.bang = bang
+
+
+class WorkerNvimRequest(WorkerMessage):
+
+    def __init__(self, id: int, method: str, args: List[Any], sync: bool, timeout: float) -> None:
+        self.id = id
+        self.method = method
+        self.args = args
+        self.sync = sync
+        self.timeout = timeout
+
+
+class WorkerNvimResponse(WorkerMessage):
+
+    def __init__(self, id: int, error: Maybe[str], result: Any) -> None:
+        self.id = id
+        self.error = error
+        self.result = result
+
+
+class WorkerResult(WorkerMessage):
+
+    def __init__(self, id: int, error: Maybe[str], result: Any) -> None:
+        self.id = id
+        self.error = error
+        self.result = result
+
+
+class WorkerExit(WorkerMessage):
+    pass
+
+
+message_tags = List(WorkerInit, WorkerRun, WorkerNvimRequest, WorkerNvimResponse, WorkerResult, WorkerExit)
+
+
+def encode_field(value: Any) -> Any:
+    return (
+        value.get_or_strict(None)
+        if isinstance(value, Maybe) else
+        list(value)
+        if isinstance(value, List) else
+        value
+    )
+
+
+def encode_message(message: WorkerMessage) -> bytes:
+    tag = message_tags.index_of(type(message)).get_or_strict(-1)
+    payload = [encode_field(value) for value in message._dat__values]
+    return msgpack.packb([tag] + payload, use_bin_type=True)
+
+
+@do(Either[str, WorkerMessage])
+def decode_message(data: Any) -> Do:
+    raw = yield Right(Lists.wrap(data)) if isinstance(data, list) else Left(f'worker message is not a list: {data}')
+    tag, payload = yield raw.uncons.to_either(f'empty worker message')
+    tpe = yield message_tags.lift(tag).to_either_f(lambda: f'invalid worker message tag: {tag}')
+    fields = tpe._dat__fields
+    yield (
+        Right(tpe(*fields.zip(payload).map2(decode_field)))
+        if fields.length == payload.length else
+        Left(f'wrong number of fields for {tpe.__name__}: {payload}')
+    )
+
+
+def decode_field(field: Any, value: Any) -> Any:
+    return (
+        Maybe.optional(value)
+        if field.tpe is Maybe or getattr(field.tpe, '__origin__', None) is Maybe else
+        Lists.wrap(value)
+        if field.tpe is List or getattr(field.tpe, '__origin__', None) is List else
+        value
+    )
+
+
+class MessagePipe:
+    '''reads msgpack messages from a raw file descriptor and writes them to a binary stream.
+    `os.read` is used instead of the buffered reader in order to return as soon as a complete message is available.
+    '''
+
+    def __init__(self, read_fd: int, write: Any) -> None:
+        self.read_fd = read_fd
+        self.write = write
+        self.unpacker = msgpack.Unpacker(raw=False)
+
+    def send(self, message: WorkerMessage) -> None:
+        self.write.write(encode_message(message))
+        self.write.flush()
+
+    def send_safe(self, message: WorkerResult) -> None:
+        '''sends a program result, replacing it with an error if the value cannot be serialized.
+        '''
+        Try(self.send, message).leffect(
+            lambda e: self.send(WorkerResult(message.id, Just(f'unserializable result `{message.result}`: {e}'), None))
+        )
+
+    def receive(self) -> Either[str, WorkerMessage]:
+        while True:
+            try:
+                return decode_message(next(self.unpacker))
+            except StopIteration:
+                data = os.read(self.read_fd, 65536)
+                if not data:
+                    return Left('worker pipe closed')
+                self.unpacker.feed(data)
+
+
+class WorkerProcess(Dat['WorkerProcess']):
+    '''a worker subprocess running the programs of a single component.
+    the lock ensures that only one program is executed at a time, since the worker processes its requests in sequence.
+    '''
+
+    def __init__(self, component: str, proc: Popen, pipe: MessagePipe, lock: Lock, ids: Any) -> None:
+        self.component = component
+        self.proc = proc
+        self.pipe = pipe
+        self.lock = lock
+        self.ids = ids
+
+    @property
+    def alive(self) -> bool:
+        return self.proc.poll() is None
+
+    def next_id(self) -> int:
+        return next(self.ids)
+
+    def stop(self) -> None:
+        if self.alive:
+            Try(self.pipe.send, WorkerExit())
+            Try(self.proc.stdin.close)
+            Try(self.proc.wait, 1).lmap(lambda e: self.proc.kill())
+
+
+class Workers(Dat['Workers']):
+    '''mutable registry of worker processes, shared by all copies of the plugin state.
+    '''
+
+    @staticmethod
+    def cons(processes: Optional[dict]=None) -> 'Workers':
+        return Workers(processes or dict(), Lock())
+
+    def __init__(self, processes: dict, lock: Lock) -> None:
+        self.processes = processes
+        self.lock = lock
+
+    def lift(self, component: str) -> Maybe[WorkerProcess]:
+        return Map(self.processes).lift(component).filter(lambda a: a.alive)
+
+    def stop(self) -> None:
+        with self.lock:
+            for worker in self.processes.values():
+                worker.stop()
+            self.processes.clear()
+
+
+__all__ = ('WorkerMessage', 'WorkerInit', 'WorkerRun', 'WorkerNvimRequest', 'WorkerNvimResponse', 'WorkerResult',
+           'WorkerExit', 'encode_message', 'decode_message', 'MessagePipe', 'WorkerProcess', 'Workers',)
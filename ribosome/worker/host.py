@@ -0,0 +1,136 @@
+import os
+import sys
+import atexit
+from itertools import count
+from threading import Lock
+from subprocess import Popen, PIPE
+from typing import Any, TypeVar
+
+from amino import do, Do, IO, Nothing, Just, Either
+from amino.case import Case
+from amino.json import dump_json
+from amino.logging import module_log
+
+from ribosome.nvim.io.compute import NvimIO, NRParams
+from ribosome.nvim.io.api import N
+from ribosome.config.component import Component
+from ribosome.config.basic_config import BasicConfig
+from ribosome.rpc.api import RpcProgram
+from ribosome.rpc.data.rpc import RpcArgs
+from ribosome.worker.data import (WorkerProcess, Workers, MessagePipe, WorkerInit, WorkerMessage, WorkerRun,
+                                  WorkerNvimRequest, WorkerNvimResponse, WorkerResult, WorkerExit)
+
+log = module_log()
+A = TypeVar('A')
+
+
+def worker_env() -> dict:
+    '''prepends the host's `sys.path` to the user's `$PYTHONPATH`, so the worker can import the plugin.
+    '''
+    python_path = [a for a in [os.pathsep.join(sys.path), os.environ.get('PYTHONPATH')] if a]
+    return dict(os.environ, PYTHONPATH=os.pathsep.join(python_path))
+
+
+@do(IO[WorkerProcess])
+def spawn_worker(basic: BasicConfig, component: Component) -> Do:
+    basic_json = yield IO.from_either(dump_json(basic))
+    component_json = yield IO.from_either(dump_json(component))
+    log.debug(f'spawning worker for component `{component.name}`')
+    proc = yield IO.delay(Popen, [sys.executable, '-m', 'ribosome.worker'], stdin=PIPE, stdout=PIPE, env=worker_env())
+    pipe = MessagePipe(proc.stdout.fileno(), proc.stdin)
+    yield IO.delay(pipe.send, WorkerInit(basic_json, component_json))
+    worker = WorkerProcess(component.name, proc, pipe, Lock(), count())
+    yield IO.delay(atexit.register, worker.stop)
+    return worker
+
+
+@do(IO[WorkerProcess])
+def store_worker(workers: Workers, basic: BasicConfig, component: Component) -> Do:
+    worker = yield spawn_worker(basic, component)
+    yield IO.delay(workers.processes.__setitem__, component.name, worker)
+    return worker
+
+
+@do(NvimIO[WorkerProcess])
+def ensure_worker(workers: Workers, basic: BasicConfig, component: Component) -> Do:
+    '''returns the running worker for `component`, starting a new process if there is none or it has terminated.
+    '''
+    def existing_or_spawn() -> IO[WorkerProcess]:
+        return workers.lift(component.name).map(IO.pure).get_or(store_worker, workers, basic, component)
+    yield N.simple(workers.lock.acquire)
+    yield N.ensure(N.from_io(IO.suspend(existing_or_spawn)), lambda r: N.simple(workers.lock.release))
+
+
+def nvim_response(id: int, result: Either[str, Any]) -> WorkerNvimResponse:
+    return result.cata(
+        lambda err: WorkerNvimResponse(id, Just(str(err)), None),
+        lambda a: WorkerNvimResponse(id, Nothing, a),
+    )
+
+
+class serve_worker_message(Case[WorkerMessage, NvimIO[A]], alg=WorkerMessage):
+    '''handles messages from a worker while a program is running.
+    nvim requests are executed with the host's api and answered, which is repeated until the program's result arrives.
+    '''
+
+    def __init__(self, worker: WorkerProcess, id: int) -> None:
+        self.worker = worker
+        self.id = id
+
+    @do(NvimIO[A])
+    def worker_nvim_request(self, message: WorkerNvimRequest) -> Do:
+        params = NRParams.cons(sync=message.sync, timeout=message.timeout, decode=False)
+        result = yield N.request(message.method, message.args, params)
+        yield N.simple(self.worker.pipe.send, nvim_response(message.id, result))
+        yield serve_worker(self.worker, self.id)
+
+    def worker_result(self, message: WorkerResult) -> NvimIO[A]:
+        return (
+            message.error.cata(N.error, lambda: N.pure(message.result))
+            if message.id == self.id else
+            N.error(f'worker `{self.worker.component}` sent result for wrong program: {message}')
+        )
+
+    def invalid(self, message: WorkerMessage) -> NvimIO[A]:
+        return N.error(f'invalid message from worker `{self.worker.component}`: {message}')
+
+    def worker_init(self, message: WorkerInit) -> NvimIO[A]:
+        return self.invalid(message)
+
+    def worker_run(self, message: WorkerRun) -> NvimIO[A]:
+        return self.invalid(message)
+
+    def worker_nvim_response(self, message: WorkerNvimResponse) -> NvimIO[A]:
+        return self.invalid(message)
+
+    def worker_exit(self, message: WorkerExit) -> NvimIO[A]:
+        return self.invalid(message)
+
+
+@do(NvimIO[A])
+def serve_worker(worker: WorkerProcess, id: int) -> Do:
+    message = yield N.delay(lambda v: worker.pipe.receive())
+    yield N.from_either(message).flat_map(serve_worker_message(worker, id))
+
+
+@do(NvimIO[A])
+def call_worker(worker: WorkerProcess, rpc_program: RpcProgram, args: RpcArgs) -> Do:
+    id = worker.next_id()
+    yield N.simple(worker.pipe.send, WorkerRun(id, rpc_program.rpc_name, args.args, args.bang))
+    yield serve_worker(worker, id)
+
+
+@do(NvimIO[A])
+def run_in_worker(workers: Workers, basic: BasicConfig, component: Component, rpc_program: RpcProgram, args: RpcArgs
+                  ) -> Do:
+    '''executes `rpc_program` in the process dedicated to `component`.
+    The plugin state is not involved, so the global lock is not needed; the worker's own lock serializes its programs.
+    The worker keeps its own component state, which is never merged into the host's plugin state, so host programs
+    don't observe its changes, and a worker program can run concurrently with a host program holding the lock.
+    '''
+    worker = yield ensure_worker(workers, basic, component)
+    yield N.simple(worker.lock.acquire)
+    yield N.ensure(call_worker(worker, rpc_program, args), lambda r: N.simple(worker.lock.release))
+
+
+__all__ = ('spawn_worker', 'ensure_worker', 'serve_worker', 'call_worker', 'run_in_worker',)
@@ -0,0 +1,158 @@
+import os
+import sys
+from itertools import count
+from typing import Any, Tuple, TypeVar
+
+from amino import List, Either, Left, Right, Map, Nil, Nothing, Just, do, Do, Try
+from amino.case import Case
+from amino.json import decode_json
+from amino.logging import module_log
+
+from ribosome.nvim.api.data import NvimApi
+from ribosome.worker.data import (MessagePipe, WorkerMessage, WorkerNvimRequest, WorkerNvimResponse, WorkerInit,
+                                  WorkerRun, WorkerResult, WorkerExit)
+from ribosome.data.plugin_state import PluginState
+from ribosome.config.config import Config
+from ribosome.rpc.state import cons_state
+from ribosome.components.internal.update import update_components
+from ribosome.rpc.to_plugin import run_program
+from ribosome.rpc.data.rpc import RpcArgs
+from ribosome.rpc.api import RpcProgram
+from ribosome.nvim.io.data import NResult, NSuccess, NError, NFatal
+
+log = module_log()
+A = TypeVar('A')
+
+
+class WorkerNvimApi(NvimApi):
+    '''forwards all requests through the message pipe to the host process, which executes them on its own api.
+    '''
+
+    def __init__(self, name: str, pipe: MessagePipe, ids: Any) -> None:
+        self.name = name
+        self.pipe = pipe
+        self.ids = ids
+
+    @do(Either[str, Tuple[NvimApi, Any]])
+    def request(self, method: str, args: List[Any], sync: bool, timeout: float) -> Do:
+        id = next(self.ids)
+        yield Try(self.pipe.send, WorkerNvimRequest(id, method, args, sync, timeout)).lmap(str)
+        response = yield self.pipe.receive()
+        yield (
+            Right(response)
+            if isinstance(response, WorkerNvimResponse) and response.id == id else
+            Left(f'unexpected message from host for nvim request {id}: {response}')
+        )
+        yield response.error.cata(Left, lambda: Right((self, response.result)))
+
+
+class result_message(Case[NResult[Tuple[PluginState, A]], Tuple[PluginState, WorkerResult]], alg=NResult):
+
+    def __init__(self, state: PluginState, id: int) -> None:
+        self.state = state
+        self.id = id
+
+    def n_success(self, result: NSuccess[Tuple[PluginState, A]]) -> Tuple[PluginState, WorkerResult]:
+        state, value = result.value
+        return state, WorkerResult(self.id, Nothing, value)
+
+    def n_error(self, result: NError[Tuple[PluginState, A]]) -> Tuple[PluginState, WorkerResult]:
+        return self.state, WorkerResult(self.id, Just(result.error), None)
+
+    def n_fatal(self, result: NFatal[Tuple[PluginState, A]]) -> Tuple[PluginState, WorkerResult]:
+        return self.state, WorkerResult(self.id, Just(f'fatal error in worker: {result.exception}'), None)
+
+
+@do(Either[str, PluginState])
+def worker_state(init: WorkerInit) -> Do:
+    '''creates a plugin state containing only the worker's component.
+    The `worker` flag is removed so that the programs are executed locally.
+    '''
+    basic = yield decode_json(init.basic)
+    component = yield decode_json(init.component)
+    local = component.set.worker(False)
+    local_basic = basic.copy(core_components=List(local.name), default_components=Nil)
+    config = Config(local_basic, Map({local.name: local}), Nil, Nothing, Nil)
+    yield update_components(Nothing).run_s(cons_state(config))
+
+
+def run_in_worker(state: PluginState, api: WorkerNvimApi, run: WorkerRun) -> Tuple[PluginState, WorkerResult]:
+    def execute(rpc_program: RpcProgram) -> Tuple[PluginState, WorkerResult]:
+        api1, result = run_program(rpc_program, RpcArgs(run.args, run.bang)).run(state).run(api)
+        return result_message(state, run.id)(result)
+    return (
+        state.programs_by_name(run.method)
+        .head
+        .map(execute)
+        .get_or(lambda: (state, WorkerResult(run.id, Just(f'no program `{run.method}` in worker'), None)))
+    )
+
+
+class handle_worker_message(Case[WorkerMessage, bool], alg=WorkerMessage):
+    '''processes a message from the host, returning whether the loop should continue.
+    '''
+
+    def __init__(self, worker: 'WorkerLoop') -> None:
+        self.worker = worker
+
+    def worker_run(self, message: WorkerRun) -> bool:
+        self.worker.state, result = run_in_worker(self.worker.state, self.worker.api, message)
+        self.worker.pipe.send_safe(result)
+        return True
+
+    def worker_exit(self, message: WorkerExit) -> bool:
+        return False
+
+    def invalid(self, message: WorkerMessage) -> bool:
+        log.error(f'invalid message for worker: {message}')
+        return True
+
+    def worker_init(self, message: WorkerInit) -> bool:
+        return self.invalid(message)
+
+    def worker_nvim_request(self, message: WorkerNvimRequest) -> bool:
+        return self.invalid(message)
+
+    def worker_nvim_response(self, message: WorkerNvimResponse) -> bool:
+        return self.invalid(message)
+
+    def worker_result(self, message: WorkerResult) -> bool:
+        return self.invalid(message)
+
+
+class WorkerLoop:
+
+    def __init__(self, pipe: MessagePipe, state: PluginState, api: WorkerNvimApi) -> None:
+        self.pipe = pipe
+        self.state = state
+        self.api = api
+
+    def run(self) -> None:
+        while True:
+            message = self.pipe.receive()
+            message.leffect(log.debug)
+            if not message.map(handle_worker_message(self)).get_or_strict(False):
+                break
+
+
+@do(Either[str, WorkerInit])
+def receive_init(pipe: MessagePipe) -> Do:
+    message = yield pipe.receive()
+    yield Right(message) if isinstance(message, WorkerInit) else Left(f'invalid init message: {message}')
+
+
+def worker_main() -> None:
+    '''entry point of the worker process.
+    The protocol uses the original stdout, while `sys.stdout` is redirected to stderr in order to prevent stray output
+    from corrupting the message stream.
+    '''
+    out = os.fdopen(os.dup(sys.stdout.fileno()), 'wb')
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    sys.stdout = sys.stderr
+    pipe = MessagePipe(sys.stdin.fileno(), out)
+    state = receive_init(pipe).flat_map(worker_state)
+    state.leffect(lambda err: log.error(f'failed to initialize worker: {err}'))
+    state.foreach(lambda s: WorkerLoop(pipe, s, WorkerNvimApi(s.basic.name, pipe, count())).run())
+
+
+__all__ = ('WorkerNvimApi', 'worker_state', 'run_in_worker', 'handle_worker_message', 'WorkerLoop', 'worker_main',)
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+'''measures the interpreter overhead per bind for NvimIO programs performing many nvim requests.
+The api answers every request immediately without recording it, so the timings consist almost exclusively of interpreter
+work.
+'''
+
+import sys
+import time
+from typing import Callable, Any, Tuple
+
+from amino import List, Right, Either, do, Do
+
+from ribosome.nvim.api.data import NvimApi
+from ribosome.nvim.io.compute import NvimIO
+from ribosome.nvim.io.api import N
+from ribosome.nvim.io.frame import frame_capture, captures
+
+
+class BenchNvimApi(NvimApi):
+
+    def request(self, method: str, args: List[Any], sync: bool, timeout: float) -> Either[str, Tuple[NvimApi, Any]]:
+        return Right((self, 1))
+
+
+vim = BenchNvimApi('bench')
+
+
+def requests_do(count: int) -> NvimIO[int]:
+    @do(NvimIO[int])
+    def run() -> Do:
+        total = 0
+        for i in range(count):
+            result = yield N.request('nvim_get_var', List('bench'))
+            total += result.value
+        return total
+    return run()
+
+
+def requests_recursive(count: int) -> NvimIO[int]:
+    @do(NvimIO[int])
+    def step(i: int, total: int) -> Do:
+        result = yield N.request('nvim_get_var', List('bench'))
+        yield step(i - 1, total + result.value) if i > 1 else N.pure(total + result.value)
+    return step(count, 0)
+
+
+def delays_do(count: int) -> NvimIO[int]:
+    @do(NvimIO[int])
+    def run() -> Do:
+        total = 0
+        for i in range(count):
+            result = yield N.delay(lambda v: 1)
+            total += result
+        return total
+    return run()
+
+
+def left_nested(count: int) -> NvimIO[int]:
+    io = N.pure(0)
+    for i in range(count):
+        io = io.flat_map(lambda a: N.request('nvim_get_var', List('bench')).map(lambda r: a + r.value))
+    return io
+
+
+def measure(name: str, cons: Callable[[int], NvimIO[int]], count: int) -> None:
+    io = cons(count)
+    start = time.perf_counter()
+    result = io.run_a(vim)
+    duration = time.perf_counter() - start
+    print(f'{name:<20} {count:>6} requests  {duration * 1e3:>9.2f}ms  {duration / count * 1e6:>7.2f}µs/bind  {result}')
+
+
+def bench(count: int) -> None:
+    for level in captures:
+        frame_capture.set(level)
+        print(f'thunk frames: {level}')
+        measure('do', requests_do, count)
+        measure('recursive do', requests_recursive, count)
+        measure('left nested', left_nested, count)
+        measure('delay', delays_do, count)
+
+
+if __name__ == '__main__':
+    bench(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+'''measures the cost per operation of `NS` programs that mostly inspect and modify the state, like the internal
+`update_state` program and the state transformations performed by `eval_prog`.
+The api answers every request immediately without recording it, so the timings consist almost exclusively of interpreter
+work.
+'''
+
+import sys
+import time
+from typing import Callable, Any, Tuple
+
+from amino import List, Right, Either, do, Do, Dat, Just
+from amino.lenses.lens import lens
+
+from ribosome.nvim.api.data import NvimApi
+from ribosome.nvim.io.api import N
+from ribosome.nvim.io.compute import NvimIO
+from ribosome.nvim.io.state import NS
+
+
+class BenchNvimApi(NvimApi):
+
+    def request(self, method: str, args: List[Any], sync: bool, timeout: float) -> Either[str, Tuple[NvimApi, Any]]:
+        return Right((self, 1))
+
+
+vim = BenchNvimApi('bench')
+
+
+class BenchData(Dat['BenchData']):
+
+    def __init__(self, counter: int) -> None:
+        self.counter = counter
+
+
+class BenchState(Dat['BenchState']):
+
+    def __init__(self, data: BenchData, log: List[str]) -> None:
+        self.data = data
+        self.log = log
+
+
+def increment(data: BenchData) -> BenchData:
+    return data.copy(counter=data.counter + 1)
+
+
+def inspect_modify(count: int) -> NS[BenchState, int]:
+    @do(NS[BenchState, int])
+    def run() -> Do:
+        for i in range(count):
+            yield NS.inspect(lambda s: s.data.counter)
+            yield NS.modify(lambda s: s.copy(data=increment(s.data)))
+        yield NS.inspect(lambda s: s.data.counter)
+    return run()
+
+
+@do(NS[BenchState, None])
+def patch_update(i: int) -> Do:
+    lns = yield NS.m(Just(lens.data), 'invalid state update query')
+    yield NS.modify(lns.modify(increment))
+
+
+def update_state(count: int) -> NS[BenchState, int]:
+    @do(NS[BenchState, int])
+    def run() -> Do:
+        for i in range(count):
+            yield patch_update(i)
+        yield NS.inspect(lambda s: s.data.counter)
+    return run()
+
+
+def zoom(count: int) -> NS[BenchState, int]:
+    @do(NS[BenchState, int])
+    def run() -> Do:
+        for i in range(count):
+            yield NS.modify(increment).zoom(lens.data)
+        yield NS.inspect(lambda s: s.data.counter)
+    return run()
+
+
+def transform_s(count: int) -> NS[BenchState, int]:
+    @do(NS[BenchState, int])
+    def run() -> Do:
+        for i in range(count):
+            yield NS.modify(lambda s: s.copy(log=s.log.cons('prog'))).transform_s(lambda s: s, lambda r, s: s)
+            yield NS.modify(increment).transform_s(lambda s: s.data, lambda r, s: r.copy(data=s))
+        yield NS.inspect(lambda s: s.data.counter)
+    return run()
+
+
+def requests(count: int) -> NS[BenchState, int]:
+    @do(NS[BenchState, int])
+    def run() -> Do:
+        for i in range(count):
+            result = yield NS.lift(N.request('nvim_get_var', List('bench')))
+            yield NS.modify(lambda s: s.copy(data=BenchData(s.data.counter + result.value)))
+        yield NS.inspect(lambda s: s.data.counter)
+    return run()
+
+
+def measure(name: str, cons: Callable[[int], NS[BenchState, int]], count: int) -> None:
+    io: NvimIO[int] = cons(count).run_a(BenchState(BenchData(0), List()))
+    start = time.perf_counter()
+    result = io.run_a(vim)
+    duration = time.perf_counter() - start
+    print(f'{name:<20} {count:>6} iterations  {duration * 1e3:>9.2f}ms  {duration / count * 1e6:>7.2f}µs/iteration  '
+          f'{result}')
+
+
+def bench(count: int) -> None:
+    measure('inspect/modify', inspect_modify, count)
+    measure('update_state', update_state, count)
+    measure('zoom', zoom, count)
+    measure('transform_s', transform_s, count)
+    measure('requests', requests, count)
+
+
+if __name__ == '__main__':
+    bench(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+'''compares the generic `traverse` of `List` with the dedicated `N.traverse` and `NS.traverse` for large collections.
+The generic version builds a bind chain as long as the list before evaluating it, which makes its running time grow
+superlinearly.
+'''
+
+import sys
+import time
+from typing import Callable, Any, Tuple
+
+from amino import List, Right, Either
+
+from ribosome.nvim.api.data import NvimApi
+from ribosome.nvim.io.compute import NvimIO
+from ribosome.nvim.io.api import N
+from ribosome.nvim.io.state import NS
+
+
+class BenchNvimApi(NvimApi):
+
+    def request(self, method: str, args: List[Any], sync: bool, timeout: float) -> Either[str, Tuple[NvimApi, Any]]:
+        return Right((self, 1))
+
+
+vim = BenchNvimApi('bench')
+
+
+def request(a: int) -> NvimIO[int]:
+    return N.request('nvim_get_var', List('bench')).map(lambda r: a + r.value)
+
+
+def request_state(a: int) -> NS[int, int]:
+    return NS.lift(request(a)).flat_map(lambda b: NS.modify(lambda s: s + b).replace(b))
+
+
+def generic(items: List[int]) -> NvimIO[int]:
+    return items.traverse(request, NvimIO).map(lambda a: a.length)
+
+
+def dedicated(items: List[int]) -> NvimIO[int]:
+    return N.traverse(items, request).map(lambda a: a.length)
+
+
+def generic_state(items: List[int]) -> NvimIO[int]:
+    return items.traverse(request_state, NS).run_s(0)
+
+
+def dedicated_state(items: List[int]) -> NvimIO[int]:
+    return NS.traverse(items, request_state).run_s(0)
+
+
+def measure(name: str, cons: Callable[[List[int]], NvimIO[int]], count: int) -> None:
+    io = cons(List.range(count))
+    start = time.perf_counter()
+    result = io.run_a(vim)
+    duration = time.perf_counter() - start
+    per_element = duration / count * 1e6
+    print(f'{name:<20} {count:>6} elements  {duration * 1e3:>9.2f}ms  {per_element:>7.2f}µs/element  {result}')
+
+
+def bench(count: int) -> None:
+    measure('List.traverse N', generic, count)
+    measure('N.traverse', dedicated, count)
+    measure('List.traverse NS', generic_state, count)
+    measure('NS.traverse', dedicated_state, count)
+
+
+if __name__ == '__main__':
+    bench(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
@@ -0,0 +1,155 @@
+import time
+import asyncio
+from threading import Thread
+from asyncio import AbstractEventLoop
+from concurrent.futures import Future
+from typing import Any, Tuple
+
+from kallikrein import k, Expectation
+from kallikrein.matchers import contain
+from kallikrein.matchers.comparison import less
+
+from amino.test.spec import SpecBase
+from amino import List, Map, do, Do, Dat, Either, Right, Left, Maybe, Just
+from amino.lenses.lens import lens
+
+from ribosome.config.config import Config, NoData
+from ribosome.compute.api import prog
+from ribosome.compute.aio import AioRibo, run_aio
+from ribosome.config.component import Component
+from ribosome.nvim.io.state import NS
+from ribosome.nvim.io.api import N
+from ribosome.nvim.io.aio import interpret_nvim_io_aio
+from ribosome.nvim.api.data import NvimApi, StrictNvimApi
+from ribosome.nvim.io.data import NError
+from ribosome.nvim.api.variable import variable_num
+from ribosome.rpc.api import rpc
+from ribosome.test.config import TestConfig
+from ribosome.test.prog import request
+from ribosome.test.unit import unit_test
+from ribosome.test.klk.matchers.nresult import nsuccess
+
+
+class AioData(Dat['AioData']):
+
+    @staticmethod
+    def cons(total: int=0) -> 'AioData':
+        return AioData(total)
+
+    def __init__(self, total: int) -> None:
+        self.total = total
+
+
+@prog.aio(AioData)
+async def add_vars(offset: int) -> int:
+    a, b = await asyncio.gather(AioRibo.nvim(variable_num('a')), AioRibo.nvim(variable_num('b')))
+    await AioRibo.modify_comp(lens.total.set(a + b + offset))
+    return await AioRibo.inspect_comp(lambda a: a.total)
+
+
+aio = Component.cons(
+    'aio',
+    rpc=List(rpc.write(add_vars)),
+    state_type=AioData,
+)
+config = Config.cons(
+    'aio',
+    components=Map(aio=aio),
+    core_components=List('aio'),
+)
+test_config = TestConfig.cons(config, vars=Map(a=2, b=3))
+
+
+@do(NS[NoData, Expectation])
+def prog_spec() -> Do:
+    result = yield request('add_vars', 10)
+    data = yield NS.inspect(lambda s: s.data_by_name('aio'))
+    return (k(result) == List(15)) & (k(data.map(lambda a: a.total)).must(contain(15)))
+
+
+class SlowNvimApi(NvimApi):
+
+    def request(self, method: str, args: List[Any], sync: bool, timeout: float) -> Either[str, Tuple[NvimApi, Any]]:
+        time.sleep(.1)
+        return Right((self, 1))
+
+    async def request_aio(self, method: str, args: List[Any], sync: bool, timeout: float
+                          ) -> Either[str, Tuple[NvimApi, Any]]:
+        await asyncio.sleep(.1)
+        return Right((self, 1))
+
+
+class LoopNvimApi(NvimApi):
+
+    def __init__(self, name: str, rpc_loop: AbstractEventLoop) -> None:
+        self.name = name
+        self.rpc_loop = rpc_loop
+
+    def request(self, method: str, args: List[Any], sync: bool, timeout: float) -> Either[str, Tuple[NvimApi, Any]]:
+        response: Future = Future()
+        self.rpc_loop.call_soon_threadsafe(response.set_result, 1)
+        try:
+            return Right((self, response.result(1.)))
+        except Exception:
+            return Left(f'no response for {method}')
+
+    async def request_aio(self, method: str, args: List[Any], sync: bool, timeout: float
+                          ) -> Either[str, Tuple[NvimApi, Any]]:
+        await asyncio.sleep(0)
+        return Right((self, 1))
+
+    @property
+    def loop(self) -> Maybe[AbstractEventLoop]:
+        return Just(self.rpc_loop)
+
+
+def nested_request(vim: NvimApi) -> int:
+    return variable_num('a').unsafe(vim)
+
+
+async def blocking_steps() -> int:
+    await AioRibo.nvim(N.sleep(.01))
+    nested = await AioRibo.nvim(N.delay(nested_request))
+    direct = await AioRibo.nvim(variable_num('b'))
+    return nested + direct
+
+
+async def concurrent_state() -> None:
+    await asyncio.gather(AioRibo.ns(NS.pure(1)), AioRibo.ns(NS.pure(2)))
+
+
+class AioSpec(SpecBase):
+    '''
+    run a coroutine program $prog
+    run the branches of `N.par` concurrently $par
+    run blocking thunks without blocking the rpc loop $blocking
+    reject concurrent state programs $concurrent_state
+    '''
+
+    def prog(self) -> Expectation:
+        return unit_test(test_config, prog_spec)
+
+    def par(self) -> Expectation:
+        io = N.par(*List.range(5).map(lambda i: N.request('nvim_get_var', List('a'))))
+        start = time.time()
+        vim, result = asyncio.run(interpret_nvim_io_aio(io, SlowNvimApi('slow')))
+        duration = time.time() - start
+        return k(result).must(nsuccess(List.range(5).replace(Right(1)))) & k(duration).must(less(.3))
+
+    def blocking(self) -> Expectation:
+        loop = asyncio.new_event_loop()
+        thread = Thread(target=loop.run_forever, daemon=True)
+        thread.start()
+        try:
+            vim, result = run_aio(blocking_steps, (), None, LoopNvimApi('loop', loop))
+        finally:
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join(1)
+        return k(result.run_a(vim)).must(nsuccess((None, 2)))
+
+    def concurrent_state(self) -> Expectation:
+        vim, result = run_aio(concurrent_state, (), None, StrictNvimApi.cons('concurrent'))
+        return k(result.run_a(vim)) == NError('state programs cannot run concurrently in a coroutine')
+
+
+__all__ = ('AioSpec',)
@@ -0,0 +1,61 @@
+from typing import Tuple, Any
+
+from kallikrein import k, Expectation
+from kallikrein.matchers.either import be_right, be_left
+from kallikrein.matchers.start_with import start_with
+
+from amino import List, Right, Either, Left
+from amino.test.spec import SpecBase
+
+from ribosome.nvim.api.data import NvimApi, StrictNvimApi
+from ribosome.nvim.api.atomic import AtomicBatch
+from ribosome.test.request import rh_atomic
+
+
+def handler(vim: StrictNvimApi, method: str, args: List[Any], sync: bool) -> Either[List[str], Tuple[NvimApi, Any]]:
+    return (
+        rh_atomic(vim, method, args)
+        if method == 'nvim_call_atomic' else
+        Right((vim, args.head.get_or_strict(0) * 2))
+        if method == 'double' else
+        Right((vim, 'text'))
+        if method == 'text' else
+        Right((vim, None))
+        if method == 'write' else
+        Left(List(f'no handler for {method}'))
+    )
+
+
+vim = StrictNvimApi.cons('atomic', request_handler=handler)
+
+
+def atomic_requests(vim: StrictNvimApi) -> List[str]:
+    return vim.request_log.map(lambda a: a[0]).filter(lambda a: a == 'nvim_call_atomic')
+
+
+class AtomicSpec(SpecBase):
+    '''
+    decode the results of a batch $typed
+    report the failing call $error
+    report an invalid result $invalid
+    '''
+
+    def typed(self) -> Expectation:
+        batch = AtomicBatch.cons().read_tpe('double', int, 2).write('write', 1).read_tpe('text', str)
+        updated_vim, result = batch.io.run(vim)
+        return (
+            (k(result.to_either).must(be_right((4, None, 'text')))) &
+            (k(atomic_requests(updated_vim)) == List('nvim_call_atomic'))
+        )
+
+    def error(self) -> Expectation:
+        batch = AtomicBatch.cons().write('write', 1).call('fail', 5).read_tpe('double', int, 2)
+        result = batch.io.either(vim).lmap(str)
+        return k(result.value).must(start_with('error of type `0` in atomic call `fail(5)`: no handler for fail'))
+
+    def invalid(self) -> Expectation:
+        batch = AtomicBatch.cons().read_tpe('text', int)
+        return k(batch.io.either(vim)).must(be_left)
+
+
+__all__ = ('AtomicSpec',)
@@ -0,0 +1,153 @@
+import gc
+import time
+import weakref
+from types import SimpleNamespace
+from threading import Thread
+
+from kallikrein import k, Expectation
+
+from amino import List, do, Do, Dat, Map, Right
+from amino.test.spec import SpecBase
+
+from ribosome.compute.api import prog
+from ribosome.compute.run import run_prog
+from ribosome.compute.cache import ProgramCache
+from ribosome.compute.program import Program
+from ribosome.nvim.io.state import NS
+from ribosome.nvim.io.api import N
+from ribosome.nvim.io.compute import NvimIO
+from ribosome.nvim.io.data import NSuccess
+from ribosome.config.config import Config
+from ribosome.test.config import TestConfig
+from ribosome.test.prog import request
+from ribosome.test.unit import unit_test
+from ribosome.data.plugin_state import PS
+from ribosome.rpc.api import rpc
+
+executions = []
+
+
+class CacheData(Dat['CacheData']):
+
+    @staticmethod
+    def cons(factor: int=2) -> 'CacheData':
+        return CacheData(factor)
+
+    def __init__(self, factor: int) -> None:
+        self.factor = factor
+
+
+@prog.cached()
+@do(NS[CacheData, int])
+def lookup(value: int) -> Do:
+    executions.append(value)
+    yield NS.inspect(lambda a: a.factor * value)
+
+
+@prog.cached()
+@do(NS[CacheData, int])
+def slow(value: int) -> Do:
+    executions.append(value)
+    time.sleep(.2)
+    yield NS.pure(value)
+
+
+@prog.cached(timeout=.05)
+@do(NS[CacheData, int])
+def stalled(value: int) -> Do:
+    executions.append(value)
+    time.sleep(.3)
+    yield NS.pure(value)
+
+
+@prog
+@do(NS[CacheData, None])
+def set_factor(factor: int) -> Do:
+    yield NS.modify(lambda a: a.set.factor(factor))
+
+
+config = Config.cons(
+    'cache',
+    state_ctor=CacheData.cons,
+    rpc=List(rpc.read(lookup), rpc.read(slow), rpc.read(stalled), rpc.write(set_factor)),
+)
+test_config = TestConfig.cons(config)
+
+
+@do(NS[PS, Expectation])
+def memoize_spec() -> Do:
+    executions.clear()
+    first = yield request('lookup', 3)
+    second = yield request('lookup', 3)
+    yield request('lookup', 4)
+    yield request('set_factor', 5)
+    third = yield request('lookup', 3)
+    return (
+        (k(first + second + third) == List(6, 6, 15)) &
+        (k(executions) == [3, 4, 3])
+    )
+
+
+def run_concurrently(program: Program, count: int, state: PS) -> NvimIO[list]:
+    def run(vim: object) -> list:
+        results = []
+        threads = [Thread(target=lambda: results.append(run_prog(program, List(1)).run_a(state).either(vim)))
+                   for i in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+        return results
+    return N.delay(run)
+
+
+@do(NS[PS, Expectation])
+def single_flight_spec() -> Do:
+    executions.clear()
+    results = yield NS.inspect_f(lambda s: run_concurrently(slow, 3, s))
+    return (k(results) == [Right(1), Right(1), Right(1)]) & (k(executions) == [1])
+
+
+@do(NS[PS, Expectation])
+def wait_timeout_spec() -> Do:
+    executions.clear()
+    results = yield NS.inspect_f(lambda s: run_concurrently(stalled, 2, s))
+    errors = [str(a.value) for a in results if a.is_left]
+    return (
+        (k(results.count(Right(1))) == 1) &
+        (k(errors) == ['concurrent execution of cached program timed out after 0.05s']) &
+        (k(executions) == [1])
+    )
+
+
+class CacheSpec(SpecBase):
+    '''
+    reuse the result of a cached program until its data changes $memoize
+    execute concurrent identical calls only once $single_flight
+    stop waiting for a concurrent call after the timeout $wait_timeout
+    don't keep the data of outdated entries alive $release_data
+    '''
+
+    def memoize(self) -> Expectation:
+        return unit_test(test_config, memoize_spec)
+
+    def single_flight(self) -> Expectation:
+        return unit_test(test_config, single_flight_spec)
+
+    def wait_timeout(self) -> Expectation:
+        return unit_test(test_config, wait_timeout_spec)
+
+    def release_data(self) -> Expectation:
+        cache = ProgramCache.cons()
+        data = CacheData(1)
+        ref = weakref.ref(data)
+        version = cache.version(SimpleNamespace(data=data, component_data=Map()))
+        execute, future = cache.lookup('key', version)
+        cache.complete('key', version, future, NSuccess((None, 2)))
+        cache.version(SimpleNamespace(data=CacheData(2), component_data=Map()))
+        del data
+        gc.collect()
+        return (k(ref() is None) == True) & (k(cache.keys) == List('key'))
+
+
+__all__ = ('CacheSpec',)
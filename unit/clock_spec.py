@@ -0,0 +1,48 @@
+import time
+import threading
+
+from kallikrein import k, Expectation
+from kallikrein.matchers.either import be_left
+from kallikrein.matchers.comparison import greater_equal, less
+
+from amino import List, Map
+from amino.test.spec import SpecBase
+
+from ribosome.nvim.api.data import StrictNvimApi
+from ribosome.nvim.api.clock import VirtualClock
+from ribosome.nvim.api.util import nvimio_repeat_timeout
+from ribosome.nvim.io.api import N
+
+
+class ClockSpec(SpecBase):
+    '''
+    expire a timeout without waiting $timeout
+    advance the time when all participants are sleeping $participants
+    '''
+
+    def timeout(self) -> Expectation:
+        clock = VirtualClock.cons()
+        vim = StrictNvimApi.cons('clock', vars=Map(), clock=clock)
+        start = time.time()
+        result = nvimio_repeat_timeout(lambda: N.pure(False), lambda a: a, 'timeout', 60., 1.).either(vim)
+        duration = time.time() - start
+        return (
+            k(result).must(be_left) &
+            k(clock.now()).must(greater_equal(60.)) &
+            k(duration).must(less(1.))
+        )
+
+    def participants(self) -> Expectation:
+        clock = VirtualClock.cons(2)
+        wakeups: list = []
+        def sleep(duration: float) -> None:
+            clock.sleep(duration)
+            wakeups.append((duration, clock.now()))
+            clock.leave()
+        threads = List(10., 5.).map(lambda a: threading.Thread(target=sleep, args=(a,), daemon=True))
+        threads.foreach(lambda a: a.start())
+        threads.foreach(lambda a: a.join(1))
+        return k(wakeups) == [(5., 5.), (10., 10.)]
+
+
+__all__ = ('ClockSpec',)
@@ -3,7 +3,7 @@ from kallikrein.matchers.either import be_right
 from kallikrein.matchers import contain
 
 from amino.test.spec import SpecBase
-from amino import List, Map, do, Do, Dat, _
+from amino import List, Map, do, Do, Dat, _, __
 from amino.lenses.lens import lens
 
 from ribosome.config.config import Config, NoData
@@ -16,6 +16,8 @@ from ribosome.test.config import TestConfig
 from ribosome.test.prog import request
 from ribosome.test.integration.embed import plugin_test
 from ribosome.test.unit import unit_test
+from ribosome.compute.ribosome import Ribosome
+from ribosome.compute.ribosome_api import Ribo
 
 
 class CoreData(Dat['CoreData']):
@@ -58,6 +60,15 @@ def extra_fun(a: int) -> Do:
     yield NS.pure(a + 9)
 
 
+@prog
+@do(NS[Ribosome[NoData, CompoComponent, ExtraData], int])
+def ribo_fun() -> Do:
+    initial = yield Ribo.comp()
+    yield Ribo.modify_comp(__.set.y(initial.y + 1))
+    yield Ribo.zoom_comp(NS.modify(lambda a: a.set.y(a.y * 2)))
+    yield Ribo.inspect_comp(_.y)
+
+
 @prog.do(None)
 def switch() -> Do:
     a = yield core_fun(3)
@@ -78,6 +89,7 @@ extra = Component.cons(
     'extra',
     rpc=List(
         rpc.write(extra_fun),
+        rpc.write(ribo_fun),
     ),
     state_type=ExtraData,
 )
@@ -110,10 +122,23 @@ def switch_spec() -> Do:
     )
 
 
+@do(NS[CoreData, Expectation])
+def default_data_spec() -> Do:
+    initial = yield NS.inspect(lambda s: (s.data_by_type(ExtraData), s.data_by_type(ExtraData)))
+    r = yield request('ribo_fun')
+    extra_data = yield NS.inspect(lambda s: s.data_by_type(ExtraData))
+    return (
+        k(initial[0] is initial[1]).true &
+        (k(r) == List(-36)) &
+        (k(extra_data) == ExtraData(-36))
+    )
+
+
 class ComponentSpec(SpecBase):
     '''
     enable a component $enable_component
     switch between components $switch
+    modify the default data of a component $default_data
     '''
 
     def enable_component(self) -> Expectation:
@@ -122,5 +147,8 @@ class ComponentSpec(SpecBase):
     def switch(self) -> Expectation:
         return unit_test(TestConfig.cons(config, components=List('extra')), switch_spec)
 
+    def default_data(self) -> Expectation:
+        return unit_test(TestConfig.cons(config, components=List('extra')), default_data_spec)
+
 
 __all__ = ('ComponentSpec',)
@@ -0,0 +1,142 @@
+import os
+import time
+from typing import Tuple
+
+from kallikrein import k, Expectation
+from kallikrein.matchers.either import be_left
+from kallikrein.matchers.comparison import less
+
+from amino import List, do, Do, Dat, Right
+from amino.test.spec import SpecBase
+
+from ribosome.compute.api import prog
+from ribosome.compute.output import Cpu, Shared
+from ribosome.compute.cpu import CpuExecutor
+from ribosome.nvim.io.state import NS
+from ribosome.nvim.io.api import N
+from ribosome.config.config import Config
+from ribosome.test.config import TestConfig
+from ribosome.test.prog import request
+from ribosome.test.unit import unit_test
+from ribosome.data.plugin_state import PS
+from ribosome.rpc.api import rpc
+
+
+class CpuData(Dat['CpuData']):
+
+    @staticmethod
+    def cons(matches: int=0) -> 'CpuData':
+        return CpuData(matches)
+
+    def __init__(self, matches: int) -> None:
+        self.matches = matches
+
+
+def count_matches(data: memoryview, word: str) -> Tuple[int, int]:
+    return str(data, 'utf-8').count(word), os.getpid()
+
+
+def describe(data: memoryview) -> Tuple[str, bool, int]:
+    return type(data).__name__, data.readonly, data.nbytes
+
+
+def stall(data: memoryview) -> int:
+    time.sleep(30)
+    return 1
+
+
+def fail(data: memoryview) -> int:
+    raise Exception('parse error')
+
+
+@prog.cpu
+@do(NS[CpuData, Cpu[Tuple[int, int]]])
+def count_in_process(word: str) -> Do:
+    lines = List('one two', 'two three', 'two')
+    yield NS.pure(Cpu.cons(count_matches, Shared(lines.join_lines.encode()), word, timeout=60.))
+
+
+@prog.do(None)
+def count(word: str) -> Do:
+    matches, pid = yield count_in_process(word)
+    yield store(matches)
+    return pid
+
+
+@prog
+@do(NS[CpuData, None])
+def store(matches: int) -> Do:
+    yield NS.modify(lambda a: a.set.matches(matches))
+
+
+@prog.cpu
+@do(NS[CpuData, Cpu[int]])
+def failing() -> Do:
+    yield NS.pure(Cpu.cons(fail, Shared(b'data')))
+
+
+config = Config.cons(
+    'cpu',
+    state_ctor=CpuData.cons,
+    rpc=List(rpc.write(count), rpc.write(failing)),
+    cpu_workers=1,
+)
+test_config = TestConfig.cons(config)
+
+
+@do(NS[PS, Expectation])
+def result_spec() -> Do:
+    pid = yield request('count', 'two')
+    matches = yield NS.inspect(lambda a: a.data.matches)
+    yield NS.inspect(lambda a: a.cpu_executor.shutdown())
+    return (k(matches) == 3) & (k(pid.head.contains(os.getpid())) == False)
+
+
+@do(NS[PS, Expectation])
+def error_spec() -> Do:
+    result = yield NS.apply(lambda s: N.recover_failure(request('failing').run(s).map(lambda a: (a[0], None)),
+                                                        lambda r: N.pure((s, r.to_either))))
+    yield NS.inspect(lambda a: a.cpu_executor.shutdown())
+    return k(result).must(be_left)
+
+
+class CpuSpec(SpecBase):
+    '''
+    run a function with shared input in a separate process $result
+    fail the program if the function raises $error
+    pass shared buffers as read-only views $view
+    reject shared values that aren't buffers $reject
+    don't wait for a function that exceeded its timeout when shutting down $shutdown
+    '''
+
+    def result(self) -> Expectation:
+        return unit_test(test_config, result_spec)
+
+    def error(self) -> Expectation:
+        return unit_test(test_config, error_spec)
+
+    def view(self) -> Expectation:
+        executor = CpuExecutor.cons(1)
+        try:
+            results = List(b'data', bytearray(b'\x00' * 3), memoryview(b'abcd')[1:]).map(
+                lambda a: executor.run(Cpu.cons(describe, Shared(a), timeout=60.)))
+        finally:
+            executor.shutdown()
+        return k(results) == List(Right(('memoryview', True, 4)), Right(('memoryview', True, 3)),
+                                  Right(('memoryview', True, 3)))
+
+    def reject(self) -> Expectation:
+        executor = CpuExecutor.cons(1)
+        result = executor.run(Cpu.cons(describe, Shared(List('data')), timeout=60.))
+        executor.shutdown()
+        return k(result).must(be_left)
+
+    def shutdown(self) -> Expectation:
+        executor = CpuExecutor.cons(1)
+        result = executor.run(Cpu.cons(stall, Shared(b'data'), timeout=.5))
+        start = time.time()
+        executor.shutdown()
+        return k(result).must(be_left) & k(time.time() - start).must(less(5.))
+
+
+__all__ = ('CpuSpec',)
@@ -0,0 +1,52 @@
+from kallikrein import k, Expectation
+from kallikrein.matchers.either import be_right, be_left
+
+from amino import List, do, Do, Just
+from amino.test.spec import SpecBase
+
+from ribosome.compute.api import prog
+from ribosome.nvim.io.state import NS
+from ribosome.config.config import NoData
+from ribosome.rpc.api import rpc
+from ribosome.rpc.dispatch import DispatchIndex
+
+
+@prog
+@do(NS[NoData, int])
+def add(a: int, b: int=1) -> Do:
+    yield NS.pure(a + b)
+
+
+@prog
+@do(NS[NoData, int])
+def other() -> Do:
+    yield NS.pure(0)
+
+
+add_rpc = rpc.write(add)
+alias_rpc = rpc.write(other).conf(name=Just('add'))
+index = DispatchIndex.cons(List(add_rpc, rpc.write(other), alias_rpc))
+
+
+class DispatchIndexSpec(SpecBase):
+    '''
+    look up all programs for an rpc name $lookup
+    validate the argument count $validate
+    '''
+
+    def lookup(self) -> Expectation:
+        return (
+            (k(index.programs('add').map(lambda a: a.program.name)) == List('add', 'other')) &
+            (k(index.programs('missing')) == List())
+        )
+
+    def validate(self) -> Expectation:
+        entry = index.entry(add_rpc)
+        return (
+            k(entry.parse(List(1))).must(be_right(List(1))) &
+            k(entry.parse(List())).must(be_left) &
+            k(entry.parse(List(1, 2, 3))).must(be_left)
+        )
+
+
+__all__ = ('DispatchIndexSpec',)
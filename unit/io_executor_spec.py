@@ -0,0 +1,109 @@
+import time
+
+from kallikrein import k, Expectation
+
+from amino import List, do, Do, Map, IO, Right, Dat, Either
+from amino.test.spec import SpecBase
+from amino.io import IOException
+
+from ribosome.compute.api import prog
+from ribosome.compute.executor import IoExecutor
+from ribosome.compute.output import GatherIOsEach
+from ribosome.nvim.io.state import NS
+from ribosome.config.config import Config
+from ribosome.test.config import TestConfig
+from ribosome.test.prog import request
+from ribosome.test.unit import unit_test
+from ribosome.data.plugin_state import PS
+from ribosome.rpc.api import rpc
+from ribosome.nvim.io.api import N
+
+
+class GatherData(Dat['GatherData']):
+
+    @staticmethod
+    def cons(results: List[int]=List()) -> 'GatherData':
+        return GatherData(results)
+
+    def __init__(self, results: List[int]) -> None:
+        self.results = results
+
+
+def delayed(value: int, delay: float) -> IO[int]:
+    return IO.delay(time.sleep, delay).replace(value)
+
+
+@prog
+@do(NS[GatherData, None])
+def store(result: Either[IOException, int]) -> Do:
+    yield NS.modify(lambda a: a.append1.results(result.value))
+
+
+@prog.io.gather_each
+@do(NS[GatherData, GatherIOsEach[int]])
+def gather_each() -> Do:
+    yield NS.pure(GatherIOsEach(List(delayed(1, .2), delayed(2, .0)), 1., store))
+
+
+executed: list = []
+
+
+@prog
+@do(NS[GatherData, None])
+def fail(result: Either[IOException, int]) -> Do:
+    yield NS.error('handler failed')
+
+
+@prog.io.gather_each
+@do(NS[GatherData, GatherIOsEach[int]])
+def gather_each_fail() -> Do:
+    third = IO.delay(executed.append, 3).replace(3)
+    yield NS.pure(GatherIOsEach(List(delayed(1, .1), delayed(2, .3), third), 1., fail))
+
+
+config = Config.cons('gather', state_ctor=GatherData.cons, rpc=List(rpc.write(gather_each)), io_workers=2)
+test_config = TestConfig.cons(config)
+fail_config = Config.cons('gather', state_ctor=GatherData.cons, rpc=List(rpc.write(gather_each_fail)), io_workers=1)
+fail_test_config = TestConfig.cons(fail_config)
+
+
+@do(NS[PS, Expectation])
+def gather_each_spec() -> Do:
+    result = yield request('gather_each')
+    data = yield NS.inspect(lambda a: a.data)
+    return (
+        (k(result) == List(List(Right(2), Right(1)))) &
+        (k(data.results) == List(2, 1))
+    )
+
+
+@do(NS[PS, Expectation])
+def handler_error_spec() -> Do:
+    yield NS.apply(lambda s: N.recover_failure(request('gather_each_fail').run(s), lambda r: N.pure((s, List()))))
+    yield NS.lift(N.simple(time.sleep, .4))
+    return k(executed) == []
+
+
+class IoExecutorSpec(SpecBase):
+    '''
+    cancel items that didn't start before the timeout $cancel
+    store each result as soon as it is available $gather_each
+    cancel the pending items when the handler fails $handler_error
+    '''
+
+    def cancel(self) -> Expectation:
+        executor = IoExecutor.cons(1)
+        executed: list = []
+        second = IO.delay(executed.append, 2).replace(2)
+        results = executor.gather(List(delayed(1, .3), second), .1)
+        time.sleep(.4)
+        return (k(results) == List()) & (k(executed) == [])
+
+    def gather_each(self) -> Expectation:
+        return unit_test(test_config, gather_each_spec)
+
+    def handler_error(self) -> Expectation:
+        return unit_test(fail_test_config, handler_error_spec)
+
+
+__all__ = ('IoExecutorSpec',)
@@ -1,9 +1,13 @@
-from typing import Tuple, Any
+from typing import Tuple, Any, Callable
+from types import FrameType
 
 from kallikrein import k, Expectation, pending
 from kallikrein.matchers.either import be_right
+from kallikrein.matchers.typed import have_type
+from kallikrein.matchers.maybe import be_just
+from kallikrein.matchers.start_with import start_with
 
-from amino import do, List, Right, Nil, Either
+from amino import do, List, Right, Nil, Either, Left, Just
 from amino.do import Do
 from amino.test.spec import SpecBase
 
@@ -11,8 +15,11 @@ from ribosome.nvim.api.data import NvimApi, StrictNvimApi
 from ribosome.nvim.io.compute import NvimIO
 from ribosome.test.klk.expectable import kn
 from ribosome.nvim.io.api import N
-from ribosome.nvim.io.data import NError
+from ribosome.nvim.io.state import NS
+from ribosome.nvim.io.data import NError, NSuccess
 from ribosome.test.klk.matchers.nresult import nsuccess
+from ribosome.nvim.io.frame import frame_capture
+from ribosome.test.request import rh_atomic
 
 
 vars = dict(a=1)
@@ -25,12 +32,43 @@ def handler(vim: StrictNvimApi, method: str, args: List[str], sync: bool) -> Eit
 vim = StrictNvimApi.cons('test', request_handler=handler)
 
 
+def par_handler(vim: StrictNvimApi, method: str, args: List[Any], sync: bool
+                ) -> Either[List[str], Tuple[NvimApi, Any]]:
+    return (
+        rh_atomic(vim, method, args)
+        if method == 'nvim_call_atomic' else
+        Right((vim, args.head.get_or_strict(0) * 2))
+        if method == 'double' else
+        Right((vim, None))
+        if method == 'write' else
+        Left(List(f'no handler for {method}'))
+    )
+
+
+par_vim = StrictNvimApi.cons('par', request_handler=par_handler)
+
+
+@do(NvimIO[int])
+def double_twice(a: int) -> Do:
+    b = yield N.read_tpe('double', int, a)
+    yield N.read_tpe('double', int, b)
+
+
+def atomic_calls(vim: StrictNvimApi) -> List[Tuple[str, List[Any]]]:
+    return vim.request_log.filter(lambda a: a[0] == 'nvim_call_atomic')
+
+
+def methods(vim: StrictNvimApi) -> List[str]:
+    return vim.request_log.map(lambda a: a[0])
+
+
 class NvimIoSpec(SpecBase):
     '''
     suspend $suspend
     delay $delay
     suspend flat_map $suspend_flat_map
     stack safety $stack
+    stack safety of left nested binds $left_nested
     stack safety with fatal recover $stack_recover_fatal
     stack safety with error recover $stack_recover_error
     request $request
@@ -38,6 +76,14 @@ class NvimIoSpec(SpecBase):
     preserve resource state in `recover` $recover
     recover an exception with `recover_failure` $recover_failure
     execute an effect after error $ensure_failure
+    capture the call site of a thunk according to the frame level $frame_levels
+    batch the requests of independent programs $par
+    attribute errors in a batch to their branch $par_error
+    send buffered writes before the next synchronous request $write_buffer
+    send buffered writes without waiting for nvim $write_buffer_async
+    don't buffer commands $write_buffer_command
+    traverse a large list $traverse
+    traverse a large list with state $traverse_state
     '''
 
     def suspend(self) -> Expectation:
@@ -67,6 +113,12 @@ class NvimIoSpec(SpecBase):
                 yield run(b)
         return kn(vim, run, 1).must(nsuccess(1000))
 
+    def left_nested(self) -> Expectation:
+        io = N.pure(0)
+        for i in range(10000):
+            io = io.flat_map(lambda a: N.pure(a + 1))
+        return k(io.either(vim)).must(be_right(10000))
+
     def stack_recover_fatal(self) -> Expectation:
         @do(NvimIO[int])
         def run(a: int) -> Do:
@@ -137,5 +189,107 @@ class NvimIoSpec(SpecBase):
         result = run().run_a(vim)
         return (k(x) == 2) & (k(result) == NError('booze'))
 
+    def frame_levels(self) -> Expectation:
+        def boom(v: NvimApi) -> int:
+            raise Exception('boom')
+        def delay_boom() -> NvimIO[int]:
+            return N.delay(boom)
+        def simple_boom() -> NvimIO[int]:
+            return N.simple(boom, vim)
+        def ns_boom() -> NvimIO[int]:
+            return NS.simple(boom, vim).run_a(None)
+        def frame(level: str, io: Callable[[], NvimIO[int]]=delay_boom) -> Any:
+            previous = frame_capture.level
+            frame_capture.set(level)
+            try:
+                return io().run_a(vim).exception.frame
+            finally:
+                frame_capture.set(previous)
+        def code_name(io: Callable[[], NvimIO[int]]) -> str:
+            return frame('code', io).f_code.co_name
+        return (
+            (k(frame('off')) == None) &  # noqa
+            (k(List(delay_boom, simple_boom, ns_boom).map(code_name)) == List('delay_boom', 'simple_boom', 'ns_boom')) &
+            (k(frame('full')).must(have_type(FrameType)))
+        )
+
+    def par(self) -> Expectation:
+        updated_vim, result = N.traverse_par(List(1, 2, 3), double_twice).run(par_vim)
+        return (
+            (k(result).must(nsuccess(List(4, 8, 12)))) &
+            (k(atomic_calls(updated_vim).length) == 2)
+        )
+
+    def par_error(self) -> Expectation:
+        branches = List(double_twice(1), N.read_tpe('fail', int), double_twice(3))
+        updated_vim, results = N.par_safe(branches).run(par_vim)
+        error = N.par(*branches).run_a(par_vim)
+        return (
+            (k(results.value.lift(0)).must(be_just(NSuccess(4)))) &
+            (k(results.value.lift(1).map(type)).must(be_just(NError))) &
+            (k(results.value.lift(2)).must(be_just(NSuccess(12)))) &
+            (k(error.error).must(start_with('branch 1: ')))
+        )
+
+    def write_buffer(self) -> Expectation:
+        @do(NvimIO[int])
+        def run() -> Do:
+            yield N.write('write', 1)
+            yield N.write('write', 2)
+            a = yield N.read_tpe('double', int, 3)
+            yield N.write('write', 4)
+            yield N.write('write', 5)
+            return a
+        updated_vim, result = run().run(par_vim)
+        return (
+            (k(result).must(nsuccess(6))) &
+            (k(methods(updated_vim)) ==
+             List('nvim_call_atomic', 'write', 'write', 'double', 'nvim_call_atomic', 'write', 'write'))
+        )
+
+    def write_buffer_async(self) -> Expectation:
+        syncs: list = []
+        def handler(vim: StrictNvimApi, method: str, args: List[Any], sync: bool
+                    ) -> Either[List[str], Tuple[NvimApi, Any]]:
+            if method == 'nvim_call_atomic':
+                syncs.append(sync)
+            return par_handler(vim, method, args, sync)
+        @do(NvimIO[int])
+        def run() -> Do:
+            yield N.write('write', 1)
+            yield N.write('write', 2)
+            yield N.read_tpe('double', int, 3)
+        updated_vim, result = run().run(StrictNvimApi.cons('async', request_handler=handler))
+        return (
+            (k(result).must(nsuccess(6))) &
+            (k(syncs) == [False]) &
+            (k(methods(updated_vim)) == List('nvim_call_atomic', 'write', 'write', 'double'))
+        )
+
+    def write_buffer_command(self) -> Expectation:
+        def handler(vim: StrictNvimApi, method: str, args: List[Any], sync: bool
+                    ) -> Either[List[str], Tuple[NvimApi, Any]]:
+            return Right((vim, None)) if method == 'nvim_command' else par_handler(vim, method, args, sync)
+        @do(NvimIO[None])
+        def run() -> Do:
+            yield N.write('write', 1)
+            yield N.write('nvim_command', 'doautocmd User Changed')
+            yield N.write('write', 2)
+        updated_vim, result = run().run(StrictNvimApi.cons('command', request_handler=handler))
+        return (
+            (k(result).must(nsuccess(None))) &
+            (k(methods(updated_vim)) == List('write', 'nvim_command', 'write'))
+        )
+
+    def traverse(self) -> Expectation:
+        io = N.traverse(range(10000), lambda a: N.read_tpe('double', int, a))
+        return k(io.either(par_vim).map(lambda a: (a.length, a.last))).must(be_right((10000, Just(19998))))
+
+    def traverse_state(self) -> Expectation:
+        def step(a: int) -> NS[int, int]:
+            return NS.modify(lambda s: s + a).replace(a)
+        io = NS.traverse(range(10000), step).run(0)
+        return k(io.either(vim).map(lambda a: (a[0], a[1].length))).must(be_right((49995000, 10000)))
+
 
 __all__ = ('NvimIoSpec',)
@@ -0,0 +1,67 @@
+from kallikrein import k, Expectation
+from kallikrein.matchers.either import be_right, be_left
+
+from amino import do, List, Dat, Map
+from amino.do import Do
+from amino.lenses.lens import lens
+from amino.test.spec import SpecBase
+
+from ribosome.nvim.api.data import StrictNvimApi
+from ribosome.nvim.io.api import N
+from ribosome.nvim.io.state import NS
+
+vim = StrictNvimApi.cons('test', vars=Map(a=5))
+
+
+class Counter(Dat['Counter']):
+
+    def __init__(self, value: int) -> None:
+        self.value = value
+
+
+class Outer(Dat['Outer']):
+
+    def __init__(self, counter: Counter, log: List[str]) -> None:
+        self.counter = counter
+        self.log = log
+
+
+def increment(counter: Counter) -> Counter:
+    return counter.copy(value=counter.value + 1)
+
+
+class NvimIoStateSpec(SpecBase):
+    '''
+    stack safety of left nested binds $left_nested
+    restore the outer state of a zoom after a request $zoom_request
+    convert exceptions in state functions to failures $exception
+    '''
+
+    def left_nested(self) -> Expectation:
+        fa = NS.pure(0)
+        for i in range(10000):
+            fa = fa.flat_map(lambda a: NS.modify(lambda s: s + 1).replace(a + 1))
+        return k(fa.run(0).either(vim)).must(be_right((10000, 10000)))
+
+    def zoom_request(self) -> Expectation:
+        @do(NS[Counter, int])
+        def inner() -> Do:
+            yield NS.modify(increment)
+            a = yield NS.lift(N.read_tpe('nvim_get_var', int, 'a'))
+            yield NS.modify(lambda c: c.copy(value=c.value + a))
+            yield NS.inspect(lambda c: c.value)
+        @do(NS[Outer, int])
+        def outer() -> Do:
+            a = yield inner().zoom(lens.counter)
+            yield NS.modify(lambda s: s.copy(log=s.log.cat('done')))
+            return a
+        result = outer().run(Outer(Counter(0), List())).either(vim)
+        return k(result).must(be_right((Outer(Counter(6), List('done')), 6)))
+
+    def exception(self) -> Expectation:
+        def boom(s: int) -> int:
+            raise Exception('boom')
+        return k(NS.modify(boom).run(0).either(vim)).must(be_left)
+
+
+__all__ = ('NvimIoStateSpec',)
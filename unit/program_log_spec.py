@@ -0,0 +1,84 @@
+from kallikrein import k, Expectation
+
+from amino import List, do, Do, Map, Nothing, Just
+from amino.test.spec import SpecBase
+
+from ribosome.compute.api import prog
+from ribosome.nvim.io.state import NS
+from ribosome.config.config import Config, NoData
+from ribosome.rpc.api import rpc
+from ribosome.test.config import TestConfig
+from ribosome.test.prog import request
+from ribosome.test.unit import unit_test
+from ribosome.data.plugin_state import PS
+from ribosome.config.component import Component
+from ribosome.nvim.io.api import N
+from ribosome.tracing import request_span, request_context
+
+
+@prog
+@do(NS[NoData, int])
+def first() -> Do:
+    yield NS.pure(1)
+
+
+@prog
+@do(NS[NoData, int])
+def second() -> Do:
+    yield NS.pure(2)
+
+
+@prog
+@do(NS[NoData, int])
+def failing() -> Do:
+    yield NS.error('failed')
+
+
+logged = Component.cons(
+    'logged',
+    rpc=List(
+        rpc.write(first),
+        rpc.write(second),
+        rpc.write(failing),
+    ),
+)
+config = Config.cons('log', components=Map(logged=logged), core_components=List('logged'), program_log_size=2)
+test_config = TestConfig.cons(config)
+
+
+@do(NS[PS, Expectation])
+def ring_spec() -> Do:
+    yield request('first')
+    yield request('second')
+    yield NS.apply(lambda s: N.recover_failure(request('failing').run(s), lambda r: N.pure((s, List()))))
+    entries = yield NS.inspect(lambda s: s.program_log.entries)
+    return (
+        (k(entries.map(lambda a: a.name)) == List('second', 'failing')) &
+        (k(entries.map(lambda a: a.outcome)) == List('success', 'error')) &
+        (k(entries.map(lambda a: a.request)) == List(Nothing, Nothing))
+    )
+
+
+@do(NS[PS, Expectation])
+def request_id_spec() -> Do:
+    with request_span('first'):
+        id = request_context.id
+        yield request('first')
+    entries = yield NS.inspect(lambda s: s.program_log.entries)
+    return k(entries.last.map(lambda a: (a.name, a.request))) == Just(('first', Just(id)))
+
+
+class ProgramLogSpec(SpecBase):
+    '''
+    keep the most recent programs with their outcome $ring
+    record the id of the request that executed a program $request_id
+    '''
+
+    def ring(self) -> Expectation:
+        return unit_test(test_config, ring_spec)
+
+    def request_id(self) -> Expectation:
+        return unit_test(test_config, request_id_spec)
+
+
+__all__ = ('ProgramLogSpec',)
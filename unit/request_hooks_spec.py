@@ -0,0 +1,78 @@
+import json
+
+from kallikrein import k, Expectation
+from kallikrein.matchers import contain
+
+from amino.test.spec import SpecBase
+from amino import List, Map, do, Do, Just, Lists
+
+from ribosome.config.config import Config, NoData
+from ribosome.compute.api import prog
+from ribosome.nvim.io.state import NS
+from ribosome.rpc.api import rpc
+from ribosome.test.config import TestConfig
+from ribosome.test.prog import request
+from ribosome.test.unit import unit_test
+from ribosome.nvim.api.variable import variable_num
+from ribosome.nvim.io.hooks import request_hooks
+from ribosome.nvim.io.tracing import attach_program
+from ribosome.nvim.api.data import StrictNvimApi
+
+
+@prog
+@do(NS[NoData, int])
+def read_var() -> Do:
+    yield NS.lift(variable_num('counter'))
+
+
+config = Config.cons(
+    'request_hooks',
+    rpc=List(rpc.write(read_var)),
+)
+test_config = TestConfig.cons(config, vars=Map(counter=7))
+
+
+@do(NS[NoData, Expectation])
+def stats_spec() -> Do:
+    timings: list = []
+    hook = timings.append
+    yield request('enable_request_stats', 0.)
+    request_hooks.add(hook)
+    try:
+        yield request('read_var')
+        yield request('read_var')
+    finally:
+        request_hooks.remove(hook)
+    result = yield request('request_stats')
+    yield request('disable_request_stats')
+    calls = Lists.wrap(timings).map(lambda a: (a.method, a.program))
+    stats = Lists.wrap(json.loads(result.head.get_or_strict('[]'))).map(lambda a: (a['method'], a['count']))
+    return (
+        k(calls).must(contain(('nvim_get_var', Just('read_var')))) &
+        k(stats).must(contain(('nvim_get_var', 2))) &
+        (k(request_hooks.enabled) == False)
+    )
+
+
+class RequestHooksSpec(SpecBase):
+    '''
+    report the timing of requests and collect statistics $stats
+    report the program when the hook is added after the program was built $late_hook
+    '''
+
+    def stats(self) -> Expectation:
+        return unit_test(test_config, stats_spec)
+
+    def late_hook(self) -> Expectation:
+        timings: list = []
+        hook = timings.append
+        st = attach_program('late', NS.lift(variable_num('counter')))
+        request_hooks.add(hook)
+        try:
+            st.run_a(None).unsafe(StrictNvimApi.cons('hooks', vars=Map(counter=7)))
+        finally:
+            request_hooks.remove(hook)
+        return k(Lists.wrap(timings).map(lambda a: (a.method, a.program))) == List(('nvim_get_var', Just('late')))
+
+
+__all__ = ('RequestHooksSpec',)
@@ -0,0 +1,97 @@
+import time
+from typing import Any, Tuple
+
+from kallikrein import k, Expectation
+from kallikrein.matchers.comparison import greater_equal, less_equal
+
+from amino import List, do, Do, Dat, Right, Either
+from amino.test.spec import SpecBase
+
+from ribosome.compute.api import prog
+from ribosome.nvim.io.state import NS
+from ribosome.nvim.api.data import StrictNvimApi, NvimApi
+from ribosome.config.config import Config
+from ribosome.rpc.state import cons_state
+from ribosome.rpc.comm import StateGuard
+from ribosome.rpc.scheduler import next_tick, start_scheduler, stop_scheduler, idle
+from ribosome.data.scheduler import Periodic
+from ribosome.compute.run import run_prog
+
+
+class SchedulerData(Dat['SchedulerData']):
+
+    @staticmethod
+    def cons(ticks: int=0, precomputed: List[int]=List()) -> 'SchedulerData':
+        return SchedulerData(ticks, precomputed)
+
+    def __init__(self, ticks: int, precomputed: List[int]) -> None:
+        self.ticks = ticks
+        self.precomputed = precomputed
+
+
+@prog
+@do(NS[SchedulerData, None])
+def tick() -> Do:
+    yield NS.modify(lambda a: a.set.ticks(a.ticks + 1))
+
+
+@prog
+@do(NS[SchedulerData, None])
+def precompute(value: int) -> Do:
+    yield NS.modify(lambda a: a.append1.precomputed(value))
+
+
+@prog.do(None)
+def defer_precompute(value: int) -> Do:
+    yield idle(precompute, value)
+
+
+def handler(vim: StrictNvimApi, method: str, args: List[Any], sync: bool) -> Either[List[str], Tuple[NvimApi, Any]]:
+    return Right((vim, None))
+
+
+vim = StrictNvimApi.cons('scheduler', request_handler=handler)
+
+
+def cons_guard(config: Config) -> StateGuard:
+    return StateGuard.cons(cons_state(config), True)
+
+
+class SchedulerSpec(SpecBase):
+    '''
+    schedule ticks without drift and coalesce missed ticks $ticks
+    run a program periodically $periodic
+    run deferred programs only when no request is in flight $idle
+    '''
+
+    def ticks(self) -> Expectation:
+        return (
+            (k(next_tick(1., 1., 1.7, True)) == 2.) &
+            (k(next_tick(1., 1., 4.5, True)) == 4.) &
+            (k(next_tick(1., 1., 4.5, False)) == 2.)
+        )
+
+    def periodic(self) -> Expectation:
+        config = Config.cons('scheduler', state_ctor=SchedulerData.cons, schedule=List(Periodic.cons(tick, .05)))
+        guard = cons_guard(config)
+        start_scheduler(guard, vim)
+        time.sleep(.33)
+        stop_scheduler(guard.state.scheduler)
+        ticks = guard.state.data.ticks
+        return k(ticks).must(greater_equal(5)) & k(ticks).must(less_equal(6))
+
+    def idle(self) -> Expectation:
+        guard = cons_guard(Config.cons('scheduler', state_ctor=SchedulerData.cons))
+        scheduler = guard.state.scheduler
+        start_scheduler(guard, vim)
+        scheduler.enter_request()
+        run_prog(defer_precompute, List(1)).run_a(guard.state).unsafe(vim)
+        time.sleep(.1)
+        during_request = guard.state.data.precomputed
+        scheduler.leave_request()
+        time.sleep(.1)
+        stop_scheduler(scheduler)
+        return (k(during_request) == List()) & (k(guard.state.data.precomputed) == List(1))
+
+
+__all__ = ('SchedulerSpec',)
@@ -0,0 +1,58 @@
+from typing import Any, Tuple
+
+from kallikrein import k, Expectation
+from kallikrein.matchers.maybe import be_just
+
+from amino import List, Either, Right, Map, Just, Maybe, do, Do
+from amino.test.spec import SpecBase
+
+from ribosome.nvim.api.data import NvimApi
+from ribosome.nvim.api.session import SessionCache, NvimSession
+from ribosome.nvim.api.rpc import channel_id, nvim_session
+from ribosome.nvim.io.compute import NvimIO
+
+metadata = dict(
+    version=dict(major=0, minor=3, api_level=4),
+    types=dict(Buffer=dict(id=0, prefix='nvim_buf_'), Window=dict(id=1, prefix='nvim_win_')),
+)
+
+
+class CachedNvimApi(NvimApi):
+
+    def __init__(self, name: str, cache: SessionCache, requests: list) -> None:
+        self.name = name
+        self.cache = cache
+        self.requests = requests
+
+    def request(self, method: str, args: List[Any], sync: bool, timeout: float) -> Either[str, Tuple[NvimApi, Any]]:
+        self.requests.append(method)
+        return Right((self, (5, metadata)))
+
+    @property
+    def session_cache(self) -> Maybe[SessionCache]:
+        return Just(self.cache)
+
+
+class SessionSpec(SpecBase):
+    '''
+    request the session metadata only once $once
+    '''
+
+    def once(self) -> Expectation:
+        vim = CachedNvimApi('session', SessionCache(), [])
+        @do(NvimIO[Tuple[int, NvimSession]])
+        def run() -> Do:
+            yield channel_id()
+            channel = yield channel_id()
+            session = yield nvim_session()
+            return channel, session
+        channel, session = run().unsafe(vim)
+        return (
+            (k(vim.requests) == ['nvim_get_api_info']) &
+            (k(channel) == 5) &
+            (k(session.api_level).must(be_just(4))) &
+            (k(session.ext_types) == Map(Buffer=0, Window=1))
+        )
+
+
+__all__ = ('SessionSpec',)
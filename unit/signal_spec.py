@@ -0,0 +1,149 @@
+import time
+import threading
+from typing import Tuple, Any, Callable
+
+from kallikrein import k, Expectation
+from kallikrein.matchers.either import be_right, be_left
+from kallikrein.matchers import contain
+from kallikrein.matchers.comparison import greater_equal, less
+
+from amino import List, Right, Either, Left, Maybe, Just, Map, IO, Nothing, Lists
+from amino.test.spec import SpecBase
+
+from ribosome.nvim.api.data import NvimApi, StrictNvimApi
+from ribosome.nvim.api.clock import real_clock, Clock, VirtualClock
+from ribosome.nvim.api.signal import Signals, signal_method
+from ribosome.nvim.api.variable import var_becomes
+from ribosome.test.request import rh_atomic
+from ribosome.rpc.comm import Comm, RpcComm
+from ribosome.rpc.data.rpc import Rpc
+from ribosome.rpc.receive import ReceiveNotification
+from ribosome.rpc.handle_receive import handle_receive
+
+
+class SignalNvimApi(StrictNvimApi):
+
+    def __init__(
+            self,
+            name: str,
+            vars: Map[str, Any],
+            request_handler: Callable,
+            request_log: List[Tuple[str, List[Any]]],
+            clock: Clock,
+            signals_: Signals,
+    ) -> None:
+        super().__init__(name, vars, request_handler, request_log, clock)
+        self.signals_ = signals_
+
+    @property
+    def signals(self) -> Maybe[Signals]:
+        return Just(self.signals_)
+
+
+def cons_handler(values: dict) -> Callable:
+    def handler(vim: StrictNvimApi, method: str, args: List[Any], sync: bool
+                ) -> Either[List[str], Tuple[NvimApi, Any]]:
+        return (
+            rh_atomic(vim, method, args)
+            if method == 'nvim_call_atomic' else
+            Right((vim, [1, {}]))
+            if method == 'nvim_get_api_info' else
+            Right((vim, values.get(args.head.get_or_strict(''))))
+            if method == 'nvim_get_var' else
+            Right((vim, None))
+            if method in ('nvim_call_function', 'nvim_command') else
+            Left(List(f'no handler for {method}'))
+        )
+    return handler
+
+
+def cons_vim(values: dict, clock: Clock=real_clock) -> SignalNvimApi:
+    return SignalNvimApi('signal', Map(), cons_handler(values), List(), clock, Signals())
+
+
+def assign(vim: SignalNvimApi, values: dict, name: str, value: Any) -> None:
+    values[name] = value
+    vim.signals_.notify(f'var:{name}')
+
+
+def var_requests(vim: StrictNvimApi) -> List[str]:
+    return vim.request_log.filter(lambda a: a[0] == 'nvim_get_var')
+
+
+def watcher_lines(vim: StrictNvimApi) -> List[str]:
+    return (
+        vim.request_log
+        .filter(lambda a: a[0] == 'nvim_call_function' and a[1].head.contains('execute'))
+        .flat_map(lambda a: Lists.wrap(a[1][1][0]))
+    )
+
+
+def cons_comm() -> Comm:
+    rpc_comm = RpcComm(
+        lambda on_message, on_error: IO.pure(None),
+        lambda: IO.pure(None),
+        lambda data: None,
+        lambda: IO.pure(None),
+        lambda: None,
+        Nothing,
+    )
+    return Comm.cons(lambda rpc: IO.pure(None), rpc_comm)
+
+
+class SignalSpec(SpecBase):
+    '''
+    check a variable again when it is assigned $var
+    fail when the variable isn't assigned within the timeout $timeout
+    let the timeout expire on a virtual clock $virtual_timeout
+    install a dict watcher that notifies the host when the variable is assigned $watcher
+    route signal notifications to the comm's signals $route
+    '''
+
+    def var(self) -> Expectation:
+        values = dict(counter=0)
+        vim = cons_vim(values)
+        timer = threading.Timer(.1, assign, (vim, values, 'counter', 1))
+        timer.start()
+        updated_vim, result = var_becomes('counter', 1, timeout=3).run(vim)
+        return (
+            k(result.to_either).must(be_right) &
+            (k(var_requests(updated_vim).length) == 2)
+        )
+
+    def timeout(self) -> Expectation:
+        vim = cons_vim(dict(flag=0))
+        return k(var_becomes('flag', 1, timeout=.2).either(vim)).must(be_left)
+
+    def virtual_timeout(self) -> Expectation:
+        clock = VirtualClock.cons()
+        vim = cons_vim(dict(flag=0), clock)
+        start = time.time()
+        result = var_becomes('flag', 1, timeout=60).either(vim)
+        return k(result).must(be_left) & k(clock.now()).must(greater_equal(60.)) & k(time.time() - start).must(less(5.))
+
+    def watcher(self) -> Expectation:
+        vim = cons_vim(dict(watched=1))
+        updated_vim, result = var_becomes('watched', 1, timeout=1).run(vim)
+        lines = watcher_lines(updated_vim)
+        commands = updated_vim.request_log.filter(lambda a: a[0] == 'nvim_command').flat_map(lambda a: a[1])
+        return (
+            k(lines).must(contain(f"call rpcnotify(1, '{signal_method}', 'var:' . a:key)")) &
+            k(lines).must(contain("call dictwatcheradd(g:, 'watched', 'RibosomeSignalVar1')")) &
+            k(commands).must(contain("silent! call dictwatcherdel(g:, 'watched', 'RibosomeSignalVar1')"))
+        )
+
+    def route(self) -> Expectation:
+        comm = cons_comm()
+        executed: list = []
+        def execute(comm: Comm, rpc: Rpc) -> IO[None]:
+            return IO.delay(executed.append, rpc.method)
+        receive = handle_receive(comm, execute)
+        receive(ReceiveNotification(signal_method, List('var:counter'))).attempt
+        receive(ReceiveNotification('plugin_notification', List())).attempt
+        return (
+            (k(comm.signals.generation('var:counter')) == 1) &
+            (k(executed) == ['plugin_notification'])
+        )
+
+
+__all__ = ('SignalSpec',)
@@ -0,0 +1,196 @@
+from threading import Barrier, Thread
+from typing import Hashable, FrozenSet, Tuple, Any, Callable
+
+from kallikrein import k, Expectation
+from kallikrein.matchers.either import be_left
+from kallikrein.matchers.typed import have_type
+
+from amino import do, Do, Dat, List, Right, Either
+from amino.test.spec import SpecBase
+
+from ribosome.rpc.comm import StateGuard, StateSlots, optimistic_ns, exclusive_ns, unlocked
+from ribosome.nvim.io.state import NS
+from ribosome.nvim.io.api import N
+from ribosome.nvim.api.data import StrictNvimApi, NvimApi
+from ribosome.nvim.api.variable import variable_set
+from ribosome.config.config import Config
+from ribosome.rpc.state import cons_state
+from ribosome.data.plugin_state import PS
+from ribosome.data.state_slots import PluginStateSlots
+
+
+class Counters(Dat['Counters']):
+
+    def __init__(self, a: int, b: int) -> None:
+        self.a = a
+        self.b = b
+
+
+class CounterSlots(StateSlots[Counters]):
+
+    def written(self, snapshot: Counters, result: Counters) -> FrozenSet[Hashable]:
+        return frozenset(name for name in ('a', 'b') if getattr(snapshot, name) != getattr(result, name))
+
+    def merge(self, current: Counters, result: Counters, slots: FrozenSet[Hashable]) -> Counters:
+        return current.copy(**dict((name, getattr(result, name)) for name in slots))
+
+
+def handler(vim: StrictNvimApi, method: str, args: List[Any], sync: bool) -> Either[List[str], Tuple[NvimApi, Any]]:
+    return Right((vim, None))
+
+
+vim = StrictNvimApi.cons('guard', request_handler=handler)
+
+
+def cons_guard() -> StateGuard[Counters]:
+    return StateGuard.cons(Counters(0, 0), True, CounterSlots())
+
+
+@do(NS[Counters, int])
+def increment(name: str, barrier: Barrier) -> Do:
+    yield NS.simple(barrier.wait)
+    yield NS.modify(lambda s: s.copy(**{name: getattr(s, name) + 1}))
+    yield NS.simple(barrier.wait)
+    yield NS.inspect(lambda s: getattr(s, name))
+
+
+def run_concurrently(guard: StateGuard[Counters], names: List[str]) -> None:
+    barrier = Barrier(names.length)
+    threads = names.map(lambda a: Thread(target=optimistic_ns(guard, a, increment, a, barrier).unsafe, args=(vim,)))
+    threads.foreach(lambda a: a.start())
+    threads.foreach(lambda a: a.join(5))
+
+
+class MainData(Dat['MainData']):
+
+    def __init__(self, value: int) -> None:
+        self.value = value
+
+
+class CompData(Dat['CompData']):
+
+    def __init__(self, value: int) -> None:
+        self.value = value
+
+
+def increment_main(state: PS) -> PS:
+    return state.set.data(MainData(state.data.value + 1))
+
+
+def increment_comp(state: PS) -> PS:
+    return state.update_component_data(CompData(state.data_by_type(CompData).value + 1))
+
+
+def cons_plugin_guard() -> StateGuard[PS]:
+    state = cons_state(Config.cons('guard', state_ctor=lambda: MainData(0))).update_component_data(CompData(0))
+    return StateGuard.cons(state, True, PluginStateSlots())
+
+
+@do(NS[PS, None])
+def update_plugin_state(name: str, f: Callable[[PS], PS], barrier: Barrier, attempts: list) -> Do:
+    '''waits for the other program only in the first attempt, so that both snapshots are taken before either commits.
+    '''
+    attempts.append(name)
+    yield NS.modify(f)
+    if attempts.count(name) == 1:
+        yield NS.simple(barrier.wait, 5)
+
+
+def run_plugin_state_updates(guard: StateGuard[PS], updates: List[Tuple[str, Callable[[PS], PS]]]) -> list:
+    barrier = Barrier(updates.length)
+    attempts: list = []
+    def thread(name: str, f: Callable[[PS], PS]) -> Thread:
+        io = optimistic_ns(guard, name, update_plugin_state, name, f, barrier, attempts)
+        return Thread(target=io.unsafe, args=(vim,))
+    threads = updates.map2(thread)
+    threads.foreach(lambda a: a.start())
+    threads.foreach(lambda a: a.join(5))
+    return attempts
+
+
+class StateGuardSpec(SpecBase):
+    '''
+    merge optimistic commits of different slots $merge
+    retry an optimistic program when its slot was committed concurrently $conflict
+    don't hold the lock while the program is running $unlocked
+    merge commits of main and component data of the plugin state $plugin_merge
+    retry when the same plugin state slot was committed concurrently $plugin_conflict
+    release the lock temporarily in an exclusive program $release
+    reject nvim writes in an optimistic program $write
+    '''
+
+    def merge(self) -> Expectation:
+        guard = cons_guard()
+        run_concurrently(guard, List('a', 'b'))
+        return (k(guard.state) == Counters(1, 1)) & (k(guard.versions) == dict(a=1, b=1))
+
+    def conflict(self) -> Expectation:
+        guard = cons_guard()
+        attempts = []
+        @do(NS[Counters, int])
+        def interfere() -> Do:
+            attempts.append(1)
+            if len(attempts) == 1:
+                yield NS.simple(guard.update, Counters(5, 0))
+            yield NS.modify(lambda s: s.copy(a=s.a + 1))
+            yield NS.inspect(lambda s: s.a)
+        result = optimistic_ns(guard, 'interfere', interfere).unsafe(vim)
+        return (k(result) == 6) & (k(guard.state) == Counters(6, 0)) & (k(len(attempts)) == 2)
+
+    def unlocked(self) -> Expectation:
+        guard = cons_guard()
+        @do(NS[Counters, bool])
+        def locked() -> Do:
+            yield NS.modify(lambda s: s.copy(b=1))
+            yield NS.simple(guard.lock.locked)
+        result = optimistic_ns(guard, 'locked', locked).unsafe(vim)
+        return (k(result) == False) & (k(guard.state) == Counters(0, 1))
+
+    def plugin_merge(self) -> Expectation:
+        guard = cons_plugin_guard()
+        attempts = run_plugin_state_updates(guard, List(('main', increment_main), ('comp', increment_comp)))
+        return (
+            (k(guard.state.data) == MainData(1)) &
+            (k(guard.state.data_by_type(CompData)) == CompData(1)) &
+            (k(len(attempts)) == 2)
+        )
+
+    def plugin_conflict(self) -> Expectation:
+        guard = cons_plugin_guard()
+        attempts = run_plugin_state_updates(guard, List(('first', increment_main), ('second', increment_main)))
+        return (
+            (k(guard.state.data) == MainData(2)) &
+            (k(guard.state.data_by_type(CompData)) == CompData(0)) &
+            (k(len(attempts)) == 3)
+        )
+
+    def release(self) -> Expectation:
+        guard = cons_guard()
+        def interfere() -> bool:
+            guard.update(guard.state.copy(b=5))
+            return guard.lock.locked()
+        @do(NS[Counters, bool])
+        def pause() -> Do:
+            yield NS.modify(lambda s: s.copy(a=1))
+            locked = yield NS.apply(lambda s: N.delay(lambda v: unlocked(s, interfere)))
+            yield NS.modify(lambda s: s.copy(a=s.a + 1))
+            return locked
+        result = exclusive_ns(guard, 'pause', pause).unsafe(vim)
+        return (k(result) == False) & (k(guard.state) == Counters(2, 5)) & (k(guard.lock.locked()) == False)
+
+    def write(self) -> Expectation:
+        guard = cons_guard()
+        @do(NS[Counters, None])
+        def write() -> Do:
+            yield NS.modify(lambda s: s.copy(a=1))
+            yield NS.lift(variable_set('counter', 1))
+        updated_vim, result = optimistic_ns(guard, 'write', write).run(vim)
+        return (
+            k(result.to_either).must(be_left) &
+            (k(guard.state) == Counters(0, 0)) &
+            (k(updated_vim.request_log) == List()) &
+            (k(updated_vim).must(have_type(StrictNvimApi)))
+        )
+
+
+__all__ = ('StateGuardSpec',)
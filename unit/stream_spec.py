@@ -0,0 +1,144 @@
+from typing import Any, Tuple, Iterator
+
+from kallikrein import k, Expectation
+
+from amino import List, do, Do, Dat, Either, Right, Left, Just
+from amino.test.spec import SpecBase
+
+from ribosome.compute.api import prog
+from ribosome.compute.output import Stream, StreamBuffer, StreamProgress
+from ribosome.nvim.io.state import NS
+from ribosome.nvim.io.api import N
+from ribosome.nvim.io.data import NError
+from ribosome.nvim.api.data import NvimApi, StrictNvimApi
+from ribosome.config.config import Config
+from ribosome.test.config import TestConfig
+from ribosome.test.prog import request
+from ribosome.test.unit import unit_test
+from ribosome.data.plugin_state import PS
+from ribosome.rpc.api import rpc
+from ribosome.nvim.api.clock import VirtualClock
+
+
+class StreamData(Dat['StreamData']):
+
+    @staticmethod
+    def cons(received: List[Tuple[str, int]]=List()) -> 'StreamData':
+        return StreamData(received)
+
+    def __init__(self, received: List[Tuple[str, int]]) -> None:
+        self.received = received
+
+
+def sent_lines(vim: NvimApi) -> int:
+    return vim.request_log.filter(lambda a: a[0] == 'nvim_buf_set_lines').length
+
+
+@prog
+@do(NS[StreamData, None])
+def store(chunk: str) -> Do:
+    sent = yield NS.lift(N.delay(sent_lines))
+    yield NS.modify(lambda a: a.append1.received((chunk, sent)))
+
+
+@prog.stream
+@do(NS[StreamData, Stream[str]])
+def search() -> Do:
+    yield NS.pure(Stream.cons((str(i) for i in range(3)), StreamBuffer(1), store))
+
+
+@prog.stream
+@do(NS[StreamData, Stream[int]])
+def count() -> Do:
+    yield NS.pure(Stream.cons(range(1000), StreamProgress('found', 0.)))
+
+
+@prog.stream
+@do(NS[StreamData, Stream[int]])
+def throttled() -> Do:
+    yield NS.pure(Stream.cons(range(100), StreamProgress('found', 1.)))
+
+
+def broken_chunks() -> Iterator[str]:
+    yield 'first'
+    raise Exception('broken')
+
+
+@prog.stream
+@do(NS[StreamData, Stream[str]])
+def broken() -> Do:
+    yield NS.pure(Stream.cons(broken_chunks(), StreamBuffer(1)))
+
+
+def handler(vim: StrictNvimApi, method: str, args: List[Any]) -> Either[str, Tuple[NvimApi, Any]]:
+    return Right((vim, None)) if method == 'nvim_buf_set_lines' else Left(f'no handler for {method}')
+
+
+config = Config.cons(
+    'stream',
+    state_ctor=StreamData.cons,
+    rpc=List(rpc.write(search), rpc.write(count), rpc.write(throttled), rpc.write(broken)),
+)
+test_config = TestConfig.cons(config, request_handler=handler)
+virtual_config = TestConfig.cons(config, request_handler=handler, clock=VirtualClock.cons())
+
+
+@do(NS[PS, Expectation])
+def buffer_spec() -> Do:
+    result = yield request('search')
+    data = yield NS.inspect(lambda a: a.data)
+    return (
+        (k(result) == List(List('0', '1', '2'))) &
+        (k(data.received) == List(('0', 1), ('1', 2), ('2', 3)))
+    )
+
+
+@do(NS[PS, Expectation])
+def progress_spec() -> Do:
+    result = yield request('count')
+    echoes = yield NS.lift(N.delay(lambda v: v.request_log.filter(lambda a: a[0] == 'nvim_out_write')))
+    return (
+        (k(result.head.map(lambda a: a.length)) == Just(1000)) &
+        (k(echoes.length) == 1001) &
+        (k(echoes.last.map(lambda a: a[1])) == Just(List('found: 1000\n')))
+    )
+
+
+@do(NS[PS, Expectation])
+def throttle_spec() -> Do:
+    result = yield request('throttled')
+    echoes = yield NS.lift(N.delay(lambda v: v.request_log.filter(lambda a: a[0] == 'nvim_out_write')))
+    return (
+        (k(result.head.map(lambda a: a.length)) == Just(100)) &
+        (k(echoes.map(lambda a: a[1])) == List(List('found: 1\n'), List('found: 100\n')))
+    )
+
+
+@do(NS[PS, Expectation])
+def error_spec() -> Do:
+    result = yield NS.apply(lambda s: N.recover_failure(request('broken').run(s), lambda r: N.pure((s, r))))
+    return k(result) == NError('broken')
+
+
+class StreamSpec(SpecBase):
+    '''
+    append each chunk to a buffer before handling the next one $buffer
+    report the progress of a long stream $progress
+    throttle progress reports with the api's clock $throttle
+    fail with the message of an exception raised by the chunk iterator $error
+    '''
+
+    def buffer(self) -> Expectation:
+        return unit_test(test_config, buffer_spec)
+
+    def progress(self) -> Expectation:
+        return unit_test(test_config, progress_spec)
+
+    def throttle(self) -> Expectation:
+        return unit_test(virtual_config, throttle_spec)
+
+    def error(self) -> Expectation:
+        return unit_test(test_config, error_spec)
+
+
+__all__ = ('StreamSpec',)
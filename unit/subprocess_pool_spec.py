@@ -0,0 +1,97 @@
+import time
+import threading
+
+from kallikrein import k, Expectation
+from kallikrein.matchers.comparison import greater_equal, less
+
+from amino import List, Nothing, do, Do, Right
+from amino.test.spec import SpecBase
+
+from ribosome.compute.api import prog
+from ribosome.compute.subprocess_pool import SubprocessPool
+from ribosome.process import Subprocess, SubprocessResult
+from ribosome.nvim.io.state import NS
+from ribosome.config.config import Config, NoData
+from ribosome.test.config import TestConfig
+from ribosome.test.prog import request
+from ribosome.test.unit import unit_test
+from ribosome.data.plugin_state import PS
+from ribosome.rpc.api import rpc
+
+
+def sleep(data: int, duration: float=.2) -> Subprocess[int]:
+    return Subprocess('sleep', List(str(duration)), data, 3.)
+
+
+@prog.subproc
+@do(NS[NoData, Subprocess[str]])
+def echo() -> Do:
+    yield NS.pure(Subprocess('echo', List('output'), 'data', 1.))
+
+
+config = Config.cons('subproc', rpc=List(rpc.write(echo)), subprocess_limit=1)
+test_config = TestConfig.cons(config)
+
+
+@do(NS[PS, Expectation])
+def echo_spec() -> Do:
+    result = yield request('echo')
+    return k(result) == List(SubprocessResult(0, List('output'), List(), 'data'))
+
+
+class SubprocessPoolSpec(SpecBase):
+    '''
+    limit the number of concurrent processes $limit
+    start queued processes in round-robin order over requests $fair
+    kill a process when its timeout expires $timeout
+    execute a subprocess program $program
+    pass the environment to the process $env
+    '''
+
+    def limit(self) -> Expectation:
+        pool = SubprocessPool.cons(2)
+        start = time.time()
+        results = pool.execute_gather(Nothing, List.range(4).map(sleep), 3.)
+        duration = time.time() - start
+        return (
+            (k(results.map(lambda a: a.map(lambda r: r.data).value)) == List(0, 1, 2, 3)) &
+            k(duration).must(greater_equal(.4)) &
+            (k(pool.running) == 0)
+        )
+
+    def fair(self) -> Expectation:
+        pool = SubprocessPool.cons(1)
+        finished: list = []
+        def gather() -> None:
+            pool.execute_gather(Nothing, List.range(4).map(lambda a: sleep(a, .1)), 3.)
+            finished.append('gather')
+        def single() -> None:
+            pool.execute(Nothing, sleep(-1, .1))
+            finished.append('single')
+        threads = List(threading.Thread(target=gather), threading.Thread(target=single))
+        threads[0].start()
+        time.sleep(.05)
+        threads[1].start()
+        threads.foreach(lambda a: a.join(3))
+        return k(finished) == ['single', 'gather']
+
+    def timeout(self) -> Expectation:
+        pool = SubprocessPool.cons(1)
+        start = time.time()
+        result = pool.execute(Nothing, Subprocess('sleep', List('3'), None, .1))
+        return (
+            k(result.is_left).true &
+            k(time.time() - start).must(less(1.)) &
+            (k(pool.running) == 0)
+        )
+
+    def program(self) -> Expectation:
+        return unit_test(test_config, echo_spec)
+
+    def env(self) -> Expectation:
+        pool = SubprocessPool.cons(1)
+        result = pool.execute(Nothing, Subprocess('sh', List('-c', 'echo $RIBO_VAR'), None, 1., env=dict(RIBO_VAR='x')))
+        return k(result.map(lambda a: a.stdout)) == Right(List('x'))
+
+
+__all__ = ('SubprocessPoolSpec',)
@@ -0,0 +1,157 @@
+import os
+import sys
+import json
+import threading
+import subprocess
+from typing import Any, Callable
+
+from kallikrein import k, Expectation
+from kallikrein.matchers import contain
+
+from amino.test.spec import SpecBase
+from amino import List, Map, do, Do, Just, Nothing, Lists, IO, Path
+from amino.test import temp_file
+
+from ribosome.config.config import Config, NoData
+from ribosome.compute.api import prog
+from ribosome.nvim.io.state import NS
+from ribosome.rpc.api import rpc
+from ribosome.test.config import TestConfig
+from ribosome.test.prog import request
+from ribosome.test.unit import unit_test
+from ribosome.nvim.api.variable import variable_num
+from ribosome.tracing import tracer, request_span, span, request_context, carry_request
+from ribosome.nvim.io.api import N
+from ribosome.nvim.io.compute import NvimIO
+from ribosome.rpc.comm import Comm, RpcComm
+from ribosome.rpc.data.rpc import Rpc
+from ribosome.rpc.data.rpc_type import BlockingRpc
+from ribosome.rpc.from_vim import execute_rpc_from_vim
+
+
+@prog
+@do(NS[NoData, int])
+def read_var() -> Do:
+    yield NS.lift(variable_num('counter'))
+
+
+@prog.do(None)
+def traced() -> Do:
+    yield read_var()
+
+
+config = Config.cons(
+    'tracing',
+    rpc=List(rpc.write(traced)),
+    internal_component=False,
+)
+test_config = TestConfig.cons(config, vars=Map(counter=7))
+
+
+@do(NS[NoData, Expectation])
+def spans_spec() -> Do:
+    with request_span('traced'):
+        yield request('traced')
+    events = Lists.wrap(json.loads(tracer.json())['traceEvents'])
+    names = events.map(lambda a: (a['cat'], a['name']))
+    requests = events.map(lambda a: a['args']['request']).distinct
+    return (
+        k(names).must(contain(('prog', 'read_var'))) &
+        k(names).must(contain(('nvim', 'nvim_get_var'))) &
+        k(names).must(contain(('rpc', 'traced'))) &
+        (k(requests.length) == 1)
+    )
+
+
+def handle(method: str, args: List[Any]) -> NvimIO[List[Any]]:
+    def run() -> List[Any]:
+        with span('handle', 'prog'):
+            return List(method)
+    return N.simple(run)
+
+
+def run_traced_rpc(kill: bool=False) -> None:
+    '''executed in a subprocess with `$RIBOSOME_TRACE_FILE` set, which terminates the trace when it exits, unless it is
+    killed.
+    '''
+    sent: list = []
+    rpc_comm = RpcComm(
+        lambda on_message, on_error: IO.pure(None),
+        lambda: IO.pure(None),
+        sent.append,
+        lambda: IO.pure(None),
+        lambda: None,
+        Nothing,
+    )
+    comm = Comm.cons(handle, rpc_comm)
+    execute_rpc_from_vim(Rpc('traced', List(), BlockingRpc(1)), comm, handle, 'tracing').attempt.get_or_raise()
+    if not sent:
+        raise Exception('no response was sent')
+    if kill:
+        os._exit(0)
+
+
+def run_traced_subprocess(kill: bool) -> List[dict]:
+    file = temp_file('ribosome', 'rpc_trace.json')
+    if file.exists():
+        file.unlink()
+    env = dict(os.environ, RIBOSOME_TRACE_FILE=str(file), PYTHONPATH=str(Path(__file__).absolute().parent.parent))
+    subprocess.run(
+        [sys.executable, '-c', f'from unit.tracing_spec import run_traced_rpc; run_traced_rpc({kill})'],
+        env=env,
+        check=True,
+        timeout=30,
+    )
+    text = file.read_text()
+    return Lists.wrap(json.loads(text + ']' if kill else text))
+
+
+def rpc_trace_expectation(events: List[dict]) -> Expectation:
+    request = events.find(lambda a: a['cat'] == 'rpc').map(lambda a: (a['name'], a['ph'], a['args']))
+    handler = events.find(lambda a: a['cat'] == 'prog')
+    return (
+        (k(request) == Just(('traced', 'X', dict(sync=True, request=1)))) &
+        (k(handler.map(lambda a: (a['name'], a['args']['request']))) == Just(('handle', 1)))
+    )
+
+
+class TracingSpec(SpecBase):
+    '''
+    record spans for programs and nvim requests $spans
+    write the spans of an rpc request to the file set in the environment $trace_file
+    keep the spans that were written before the process was killed $killed
+    pass the request id to another thread $thread
+    '''
+
+    def spans(self) -> Expectation:
+        tracer.file = Just(temp_file('ribosome', 'trace.json'))
+        try:
+            return unit_test(test_config, spans_spec)
+        finally:
+            tracer.close()
+            tracer.events.clear()
+
+    def trace_file(self) -> Expectation:
+        return rpc_trace_expectation(run_traced_subprocess(False))
+
+    def killed(self) -> Expectation:
+        return rpc_trace_expectation(run_traced_subprocess(True))
+
+    def thread(self) -> Expectation:
+        requests: list = []
+        def record() -> None:
+            requests.append(request_context.id)
+        def run(target: Callable[[], None]) -> None:
+            thread = threading.Thread(target=target)
+            thread.start()
+            thread.join()
+        request_context.id = 3
+        try:
+            run(carry_request(record))
+            run(record)
+        finally:
+            request_context.id = None
+        return k(requests) == [3, None]
+
+
+__all__ = ('TracingSpec',)
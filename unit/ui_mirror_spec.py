@@ -0,0 +1,122 @@
+from typing import Tuple, Any
+
+from msgpack import ExtType
+
+from kallikrein import k, Expectation
+from kallikrein.matchers.either import be_right
+
+from amino import List, Right, Either, Left, Maybe, Just, do, Do, Map
+from amino.test.spec import SpecBase
+
+from ribosome.nvim.api.data import NvimApi, StrictNvimApi
+from ribosome.nvim.api.clock import real_clock
+from ribosome.nvim.api.mirror import UiMirror, ui_mirror_autocmd
+from ribosome.nvim.api.ui import current_window, current_window_height
+from ribosome.nvim.api.option import option_str
+from ribosome.nvim.api.command import nvim_command
+from ribosome.nvim.io.compute import NvimIO
+from ribosome.test.request import rh_atomic
+
+mirror = UiMirror()
+
+
+class MirrorNvimApi(StrictNvimApi):
+
+    def request(self, method: str, args: List[Any], sync: bool, timeout: float) -> Either[str, Tuple[NvimApi, Any]]:
+        mirror.observe(method)
+        return super().request(method, args, sync, timeout)
+
+    @property
+    def ui_mirror(self) -> Maybe[UiMirror]:
+        return Just(mirror)
+
+
+def handler(vim: StrictNvimApi, method: str, args: List[Any], sync: bool) -> Either[List[str], Tuple[NvimApi, Any]]:
+    return (
+        rh_atomic(vim, method, args)
+        if method == 'nvim_call_atomic' else
+        Right((vim, ExtType(1, b'\x01')))
+        if method == 'nvim_get_current_win' else
+        Right((vim, 20))
+        if method == 'nvim_win_get_height' else
+        Right((vim, 'utf-8'))
+        if method == 'nvim_get_option' else
+        Right((vim, None))
+        if method == 'nvim_command' else
+        Left(List(f'no handler for {method}'))
+    )
+
+
+vim = MirrorNvimApi('mirror', Map(), handler, List(), real_clock)
+
+
+@do(NvimIO[str])
+def reads() -> Do:
+    yield current_window_height()
+    yield current_window_height()
+    yield option_str('encoding')
+    yield option_str('encoding')
+
+
+@do(NvimIO[None])
+def switch_window() -> Do:
+    yield current_window()
+    yield nvim_command('wincmd', 'w')
+    yield current_window()
+
+
+def requests(vim: StrictNvimApi) -> List[str]:
+    return vim.request_log.map(lambda a: a[0])
+
+
+class UiMirrorSpec(SpecBase):
+    '''
+    answer repeated reads from the mirror $cached
+    invalidate entries on events $event
+    invalidate all entries on requests that change the editor state $write
+    query nvim every time if the mirror is disabled $disabled
+    invalidate window heights when a window is resized $resized
+    '''
+
+    def setup(self) -> None:
+        mirror.enable()
+
+    def cached(self) -> Expectation:
+        updated_vim, result = reads().run(vim)
+        return (
+            k(result.to_either).must(be_right('utf-8')) &
+            (k(requests(updated_vim)) == List('nvim_get_current_win', 'nvim_win_get_height', 'nvim_get_option'))
+        )
+
+    def event(self) -> Expectation:
+        updated_vim, result = current_window().run(vim)
+        mirror.invalidate('VimResized')
+        updated_vim, result = current_window_height().run(updated_vim)
+        mirror.invalidate('WinEnter')
+        updated_vim, result = current_window().run(updated_vim)
+        return k(requests(updated_vim)) == List('nvim_get_current_win', 'nvim_win_get_height', 'nvim_get_current_win')
+
+    def write(self) -> Expectation:
+        updated_vim, result = switch_window().run(vim)
+        return k(requests(updated_vim).filter(lambda a: a == 'nvim_get_current_win').length) == 2
+
+    def disabled(self) -> Expectation:
+        mirror.disable()
+        updated_vim, result = reads().run(vim)
+        return k(requests(updated_vim).length) == 6
+
+    def resized(self) -> Expectation:
+        updated_vim, result = current_window_height().run(vim)
+        mirror.invalidate('WinResized')
+        updated_vim, result = current_window_height().run(updated_vim)
+        scrolled = ui_mirror_autocmd(1, 'WinScrolled')
+        return (
+            (k(requests(updated_vim).filter(lambda a: a == 'nvim_win_get_height').length) == 2) &
+            (k(scrolled) ==
+             "if exists('##WinScrolled') && !exists('##WinResized') | "
+             "execute \"autocmd WinScrolled * call rpcnotify(1, 'ribosome_ui_mirror_invalidate', 'WinScrolled')\" "
+             "| endif")
+        )
+
+
+__all__ = ('UiMirrorSpec',)
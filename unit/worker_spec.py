@@ -0,0 +1,112 @@
+import os
+
+from kallikrein import k, Expectation
+from kallikrein.matchers import contain
+from kallikrein.matchers.length import have_length
+
+from amino.test.spec import SpecBase
+from amino import List, Map, do, Do, Dat, _
+from amino.lenses.lens import lens
+
+from ribosome.config.config import Config, NoData
+from ribosome.compute.api import prog
+from ribosome.config.component import Component, ComponentData
+from ribosome.nvim.io.state import NS
+from ribosome.config.resources import Resources
+from ribosome.rpc.api import rpc
+from ribosome.test.config import TestConfig
+from ribosome.test.prog import request
+from ribosome.test.unit import unit_test
+from ribosome.nvim.api.variable import variable_num
+
+
+class WorkData(Dat['WorkData']):
+
+    @staticmethod
+    def cons(count: int=0) -> 'WorkData':
+        return WorkData(count)
+
+    def __init__(self, count: int) -> None:
+        self.count = count
+
+
+@prog.result
+@do(NS[Resources[ComponentData[NoData, WorkData], None], int])
+def count() -> Do:
+    yield NS.modify(lens.data.comp.count.modify(_ + 1))
+    yield NS.inspect(_.data.comp.count)
+
+
+@prog
+@do(NS[Resources[ComponentData[NoData, WorkData], None], int])
+def pid() -> Do:
+    yield NS.delay(lambda v: os.getpid())
+
+
+@prog
+@do(NS[Resources[ComponentData[NoData, WorkData], None], int])
+def read_var() -> Do:
+    yield NS.lift(variable_num('counter'))
+
+
+work = Component.cons(
+    'work',
+    rpc=List(
+        rpc.write(count),
+        rpc.write(pid),
+        rpc.write(read_var),
+    ),
+    state_type=WorkData,
+    worker=True,
+)
+
+
+config = Config.cons(
+    'worker',
+    components=Map(work=work),
+    core_components=List('work'),
+)
+test_config = TestConfig.cons(config, vars=Map(counter=23))
+
+
+@do(NS[NoData, Expectation])
+def process_spec() -> Do:
+    worker_pid = yield request('pid')
+    yield NS.inspect(lambda s: s.workers.stop())
+    return k(worker_pid.filter(lambda a: a != os.getpid())).must(have_length(1))
+
+
+@do(NS[NoData, Expectation])
+def state_spec() -> Do:
+    yield request('count')
+    result = yield request('count')
+    data = yield NS.inspect(lambda s: s.data_by_name('work'))
+    yield NS.inspect(lambda s: s.workers.stop())
+    return (k(result) == List(2)) & (k(data.map(_.count)).must(contain(0)))
+
+
+@do(NS[NoData, Expectation])
+def nvim_request_spec() -> Do:
+    result = yield request('read_var')
+    yield NS.inspect(lambda s: s.workers.stop())
+    return k(result) == List(23)
+
+
+class WorkerSpec(SpecBase):
+    '''
+    run a program in a separate process $process
+    keep the component state in the worker $state
+    forward nvim requests from the worker to the host $nvim_request
+    '''
+
+    def process(self) -> Expectation:
+        return unit_test(test_config, process_spec)
+
+    def state(self) -> Expectation:
+        return unit_test(test_config, state_spec)
+
+    def nvim_request(self) -> Expectation:
+        return unit_test(test_config, nvim_request_spec)
+
+
+__all__ = ('WorkerSpec',)